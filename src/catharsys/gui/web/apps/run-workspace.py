@@ -44,6 +44,8 @@ from catharsys.gui.web.pages.product_viewer import CPageProductViewer
 from catharsys.gui.web.pages.login import CLogin, CPageLogin
 from catharsys.gui.web.pages.reset_pw import CPageResetPw
 from catharsys.gui.web.util import paths as guipaths
+from catharsys.gui.web.util.cls_thumbnails import CThumbnails
+from catharsys.gui.web.util.cls_image_tiles import CImageTiles
 
 from nicegui import ui, app, Client, helpers
 
@@ -268,6 +270,8 @@ try:
     CPageResetPw.Register(xLogin)
     CPageWorkspace.Register(wsX, xLogin)
     CPageProductViewer.Register(wsX, xLogin)
+    CThumbnails.Register()
+    CImageTiles.Register()
 
     ui.timer(max(g_iTimeout, 5), OnTimerTestShutdown)
     if bNoSsl is False:
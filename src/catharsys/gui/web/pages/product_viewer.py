@@ -132,7 +132,7 @@ class CPageProductViewer:
 
         xPageView = CPageProductViewer.dicClients.get(sClientId)
         if xPageView is not None:
-            # xPageWs.OnRemove()
+            xPageView.OnRemove()
             xPageView.xClientId = None
             del CPageProductViewer.dicClients[sClientId]
         # endif
@@ -146,6 +146,15 @@ class CPageProductViewer:
 
     # enddef
 
+    # #############################################################################################
+    def OnRemove(self):
+        # print("On Remove")
+        if self.xProductViewer is not None:
+            self.xProductViewer.CleanUp()
+        # endif
+
+    # enddef
+
     # #############################################################################################
     def Create(self):
         try:
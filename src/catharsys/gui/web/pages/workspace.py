@@ -63,6 +63,7 @@ from ..widgets.cls_value_grid import CValueGrid
 from ..widgets.cls_tabs import CTabs
 from ..widgets.cls_message import CMessage, EMessageType
 from ..widgets.cls_variant_group_product_view import CVariantGroupProductView
+from ..util import paths as guipaths
 
 
 @dataclass
@@ -1966,6 +1967,15 @@ class CPageWorkspace:
 
     # enddef
 
+    # #############################################################################################
+    # Path where the job registry and the job output logs of a launch instance are stored
+    def _GetInstanceJobsPath(self, _sId: str) -> Path:
+        sPrjId: str = re.sub(r"[^\w.\-]", "_", self.xProject.sId)
+        sInstId: str = re.sub(r"[^\w.\-]", "_", _sId)
+        return guipaths.GetSettingsPath(self.xWorkspace.pathWorkspace) / "jobs" / sPrjId / sInstId
+
+    # enddef
+
     # #############################################################################################
     async def _InitInstance(self, _sId: str):
         try:
@@ -1997,6 +2007,8 @@ class CPageWorkspace:
                         _funcOnClose=lambda: self.RemoveInstance(_sId),
                         _funcOnStart=lambda: self.OnInstanceLaunchStart(_sId),
                         _funcOnEnd=lambda: self.OnInstanceLaunchEnd(_sId),
+                        _pathLogs=self._GetInstanceJobsPath(_sId) / "logs",
+                        _pathRegistry=self._GetInstanceJobsPath(_sId) / "jobs.json",
                     )
                 except Exception as _xEx:
                     xEx = _xEx
@@ -0,0 +1,216 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import ison
+from anybase import config
+from anybase import file as anyfile
+
+
+@dataclass
+class CArtefactMetaText:
+    sTooltip: Optional[str] = None
+    sBelow: Optional[str] = None
+
+
+# endclass
+
+
+# Request for the meta text of one meta data definition of an artefact,
+# as tuple of the form (json path, meta id, meta data definition).
+TMetaRequest = tuple[Path, str, dict]
+
+
+# LRU cache of the processed meta texts of artefacts, keyed by the meta data file
+# and the meta id. Lookups from the event loop only use the in-memory entries.
+# The modification times of the meta data files are validated by 'Update',
+# which is meant to be called in a worker thread.
+# The meta requests of each artefact, i.e. its meta data definitions with the processed
+# json path, are cached as well, so that they are not processed again on every redraw.
+class CArtefactMetaCache:
+    def __init__(self, *, _iMaxEntries: int = 20000):
+        self._iMaxEntries: int = _iMaxEntries
+        self._xLock: threading.Lock = threading.Lock()
+        # Values are tuples of the form (modification time of json file, meta text)
+        self._dicEntries: OrderedDict[tuple[str, str], tuple[int, CArtefactMetaText]] = OrderedDict()
+        # Meta requests by artefact path
+        self._dicRequests: OrderedDict[str, list[TMetaRequest]] = OrderedDict()
+
+    # enddef
+
+    # #########################################################################
+    # Returns the cached meta requests of an artefact, or None if they have not been cached
+    def GetRequests(self, _pathArt: Path) -> Optional[list[TMetaRequest]]:
+        sKey: str = _pathArt.as_posix()
+        with self._xLock:
+            lRequests: Optional[list[TMetaRequest]] = self._dicRequests.get(sKey)
+            if lRequests is not None:
+                self._dicRequests.move_to_end(sKey)
+            # endif
+        # endwith
+        return lRequests
+
+    # enddef
+
+    # #########################################################################
+    def PutRequests(self, _pathArt: Path, _lRequests: list[TMetaRequest]):
+        sKey: str = _pathArt.as_posix()
+        with self._xLock:
+            self._dicRequests[sKey] = _lRequests
+            self._dicRequests.move_to_end(sKey)
+            while len(self._dicRequests) > self._iMaxEntries:
+                self._dicRequests.popitem(last=False)
+            # endwhile
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # The meta requests depend on the meta data definitions of the production,
+    # so they have to be cleared when the production is scanned again.
+    def ClearRequests(self):
+        with self._xLock:
+            self._dicRequests.clear()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def _MergeTexts(_lTexts: list[CArtefactMetaText]) -> CArtefactMetaText:
+        # Texts of later meta data definitions replace those of earlier ones
+        xText = CArtefactMetaText()
+        for xMetaText in _lTexts:
+            if xMetaText.sTooltip is not None:
+                xText.sTooltip = xMetaText.sTooltip
+            # endif
+            if xMetaText.sBelow is not None:
+                xText.sBelow = xMetaText.sBelow
+            # endif
+        # endfor
+        return xText
+
+    # enddef
+
+    # #########################################################################
+    # Returns the merged meta text of the given requests, if all of them are cached.
+    # The cached entries are not validated against the meta data files.
+    def Get(self, _lRequests: list[TMetaRequest]) -> Optional[CArtefactMetaText]:
+        lTexts: list[CArtefactMetaText] = []
+        with self._xLock:
+            for pathJson, sMetaId, _ in _lRequests:
+                tKey = (pathJson.as_posix(), sMetaId)
+                tEntry = self._dicEntries.get(tKey)
+                if tEntry is None:
+                    return None
+                # endif
+                self._dicEntries.move_to_end(tKey)
+                lTexts.append(tEntry[1])
+            # endfor
+        # endwith
+        return self._MergeTexts(lTexts)
+
+    # enddef
+
+    # #########################################################################
+    def _Put(self, _tKey: tuple[str, str], _iTimeJson: int, _xText: CArtefactMetaText):
+        with self._xLock:
+            self._dicEntries[_tKey] = (_iTimeJson, _xText)
+            self._dicEntries.move_to_end(_tKey)
+            while len(self._dicEntries) > self._iMaxEntries:
+                self._dicEntries.popitem(last=False)
+            # endwhile
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Loads and processes a meta data file. This does not access the cache.
+    @staticmethod
+    def LoadMetaText(_pathJson: Path, _dicMetaData: dict) -> CArtefactMetaText:
+        xText = CArtefactMetaText()
+        dicData = anyfile.LoadJson(_pathJson)
+        sExpectDti: str = _dicMetaData.get("sExpectDti")
+        if sExpectDti is not None and not config.IsConfigType(dicData, sExpectDti):
+            return xText
+        # endif
+
+        dicPrint: dict = _dicMetaData.get("mPrint")
+        if isinstance(dicPrint, dict):
+            # A parser per call, so that this can run in several threads at once
+            xParser = ison.Parser({})
+            dicProcPrint = xParser.Process(dicPrint, dicConstVars={"meta_data": dicData})
+            if "tooltip" in dicProcPrint:
+                xText.sTooltip = "</br>".join(dicProcPrint["tooltip"]["lLines"])
+            # endif
+            if "below" in dicProcPrint:
+                xText.sBelow = "</br>".join(dicProcPrint["below"]["lLines"])
+            # endif
+        # endif
+
+        return xText
+
+    # enddef
+
+    # #########################################################################
+    # Returns the merged meta text of the given requests. Meta data files that are not cached
+    # or have been modified since they were cached are loaded. Meta data files that do not exist
+    # are cached with an empty text.
+    def Update(self, _lRequests: list[TMetaRequest]) -> CArtefactMetaText:
+        lTexts: list[CArtefactMetaText] = []
+        for pathJson, sMetaId, dicMetaData in _lRequests:
+            try:
+                iTimeJson: int = pathJson.stat().st_mtime_ns
+            except FileNotFoundError:
+                iTimeJson = -1
+            # endtry
+
+            tKey = (pathJson.as_posix(), sMetaId)
+            with self._xLock:
+                tEntry = self._dicEntries.get(tKey)
+            # endwith
+
+            if tEntry is not None and tEntry[0] == iTimeJson:
+                lTexts.append(tEntry[1])
+                continue
+            # endif
+
+            if iTimeJson < 0:
+                xText = CArtefactMetaText()
+            else:
+                xText = self.LoadMetaText(pathJson, dicMetaData)
+            # endif
+            self._Put(tKey, iTimeJson, xText)
+            lTexts.append(xText)
+        # endfor
+
+        return self._MergeTexts(lTexts)
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,127 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+# Thread-safe LRU cache of byte strings, bounded by the total number of bytes stored.
+# The least recently used entries are evicted when a new entry exceeds the limit.
+class CByteCache:
+    def __init__(self, *, _iMaxBytes: int):
+        self._iMaxBytes: int = _iMaxBytes
+        self._iBytes: int = 0
+        self._xLock: threading.Lock = threading.Lock()
+        self._dicEntries: OrderedDict[str, bytes] = OrderedDict()
+
+    # enddef
+
+    @property
+    def iMaxBytes(self) -> int:
+        return self._iMaxBytes
+
+    # enddef
+
+    @iMaxBytes.setter
+    def iMaxBytes(self, iValue: int):
+        with self._xLock:
+            self._iMaxBytes = iValue
+            self._Evict()
+        # endwith
+
+    # enddef
+
+    @property
+    def iBytes(self) -> int:
+        return self._iBytes
+
+    # enddef
+
+    def __contains__(self, _sKey: str) -> bool:
+        return _sKey in self._dicEntries
+
+    # enddef
+
+    # #########################################################################
+    def Get(self, _sKey: str) -> Optional[bytes]:
+        with self._xLock:
+            xData: bytes = self._dicEntries.get(_sKey)
+            if xData is not None:
+                self._dicEntries.move_to_end(_sKey)
+            # endif
+        # endwith
+        return xData
+
+    # enddef
+
+    # #########################################################################
+    def Put(self, _sKey: str, _xData: bytes):
+        # Entries that are larger than the whole cache are not stored
+        if len(_xData) > self._iMaxBytes:
+            return
+        # endif
+
+        with self._xLock:
+            xPrevData: bytes = self._dicEntries.pop(_sKey, None)
+            if xPrevData is not None:
+                self._iBytes -= len(xPrevData)
+            # endif
+            self._dicEntries[_sKey] = _xData
+            self._iBytes += len(_xData)
+            self._Evict()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def Remove(self, _sKey: str):
+        with self._xLock:
+            xData: bytes = self._dicEntries.pop(_sKey, None)
+            if xData is not None:
+                self._iBytes -= len(xData)
+            # endif
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def Clear(self):
+        with self._xLock:
+            self._dicEntries.clear()
+            self._iBytes = 0
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def _Evict(self):
+        # Expects that the lock is held by the caller
+        while self._iBytes > self._iMaxBytes and len(self._dicEntries) > 0:
+            _, xData = self._dicEntries.popitem(last=False)
+            self._iBytes -= len(xData)
+        # endwhile
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,171 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import threading
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+# need to enable OpenExr explicitly
+os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
+import cv2
+
+
+@dataclass
+class CExrPreviewSettings:
+    sChannel: str = "RGB"
+    fExposure: float = 0.0
+    sNormalize: str = "none"
+
+    # Identifies the settings in the ids of the tile sources
+    @property
+    def sVariant(self) -> str:
+        return f"exr:{self.sChannel}:{self.fExposure:g}:{self.sNormalize}"
+
+    # enddef
+
+
+# endclass
+
+
+# #########################################################################
+# Renders EXR images to 8-bit BGR previews. A single channel or the RGB channels can be shown.
+# The values are either scaled by the exposure and gamma corrected to sRGB, normalized to their
+# minimum and maximum or their 1% and 99% percentiles, or colored by label value.
+class CExrPreview:
+    lChannels: list[str] = ["RGB", "R", "G", "B", "A"]
+    dicNormalize: dict[str, str] = {
+        "none": "Exposure",
+        "minmax": "Min/Max",
+        "percentile": "Percentile 1-99",
+        "labels": "Labels",
+    }
+    # Number of decoded EXR images kept in memory, so that changing the settings does not load them again
+    iMaxDecodedImages: int = 2
+
+    _xLock: threading.Lock = threading.Lock()
+    _dicImages: OrderedDict[tuple[str, int], np.ndarray] = OrderedDict()
+
+    # #########################################################################
+    @classmethod
+    def _LoadImage(cls, _pathImage: Path) -> np.ndarray:
+        tKey: tuple[str, int] = (_pathImage.as_posix(), _pathImage.stat().st_mtime_ns)
+        with cls._xLock:
+            aImage: Optional[np.ndarray] = cls._dicImages.get(tKey)
+            if aImage is not None:
+                cls._dicImages.move_to_end(tKey)
+                return aImage
+            # endif
+        # endwith
+
+        aImage = cv2.imread(_pathImage.as_posix(), cv2.IMREAD_UNCHANGED)
+        if aImage is None:
+            raise RuntimeError(f"Error loading image: {(_pathImage.as_posix())}")
+        # endif
+        if aImage.ndim == 2:
+            aImage = aImage[:, :, np.newaxis]
+        # endif
+        aImage = np.nan_to_num(aImage.astype(np.float32, copy=False), nan=0.0, posinf=0.0, neginf=0.0)
+
+        with cls._xLock:
+            cls._dicImages[tKey] = aImage
+            while len(cls._dicImages) > cls.iMaxDecodedImages:
+                cls._dicImages.popitem(last=False)
+            # endwhile
+        # endwith
+        return aImage
+
+    # enddef
+
+    # #########################################################################
+    # Returns the selected channels as array of shape (height, width, 1 or 3).
+    # The image channels are in BGR(A) order.
+    @staticmethod
+    def _SelectChannels(_aImage: np.ndarray, _sChannel: str) -> np.ndarray:
+        iChannels: int = _aImage.shape[2]
+        if _sChannel == "RGB":
+            if iChannels >= 3:
+                return _aImage[:, :, 0:3]
+            # endif
+            return _aImage[:, :, 0:1]
+        # endif
+
+        iChannel: int = {"B": 0, "G": 1, "R": 2, "A": 3}.get(_sChannel, 0)
+        if iChannel >= iChannels:
+            iChannel = 0
+        # endif
+        return _aImage[:, :, iChannel : iChannel + 1]
+
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def _ColorLabels(_aValues: np.ndarray) -> np.ndarray:
+        aLabels: np.ndarray = np.rint(_aValues[:, :, 0]).astype(np.int64)
+        aUnique, aInverse = np.unique(aLabels, return_inverse=True)
+        # Derive a fixed color from each label value, with label 0 being black
+        aHash: np.ndarray = (aUnique.astype(np.uint64) * np.uint64(2654435761)) & np.uint64(0xFFFFFF)
+        aPalette: np.ndarray = np.stack(
+            [(aHash >> np.uint64(iShift)) & np.uint64(0xFF) for iShift in (0, 8, 16)], axis=1
+        )
+        aPalette[aUnique == 0] = 0
+        return aPalette.astype(np.uint8)[aInverse.reshape(aLabels.shape)]
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def Render(cls, _pathImage: Path, _xSettings: CExrPreviewSettings) -> np.ndarray:
+        aValues: np.ndarray = cls._SelectChannels(cls._LoadImage(_pathImage), _xSettings.sChannel)
+
+        if _xSettings.sNormalize == "labels":
+            aPreview: np.ndarray = cls._ColorLabels(aValues)
+        else:
+            fScale: float = 2.0**_xSettings.fExposure
+            if _xSettings.sNormalize in ("minmax", "percentile"):
+                if _xSettings.sNormalize == "minmax":
+                    fMin, fMax = float(aValues.min()), float(aValues.max())
+                else:
+                    fMin, fMax = (float(x) for x in np.percentile(aValues, (1.0, 99.0)))
+                # endif
+                aLinear = (aValues - fMin) * (fScale / max(fMax - fMin, 1e-12))
+            else:
+                aLinear = aValues * fScale
+                # Convert linear values to sRGB
+                aLinear = np.clip(aLinear, 0.0, 1.0)
+                aLinear = np.where(aLinear <= 0.0031308, 12.92 * aLinear, 1.055 * np.power(aLinear, 1.0 / 2.4) - 0.055)
+            # endif
+            aPreview = (np.clip(aLinear, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+        # endif
+
+        if aPreview.shape[2] == 1:
+            aPreview = np.repeat(aPreview, 3, axis=2)
+        # endif
+        return np.ascontiguousarray(aPreview)
+
+    # enddef
+
+
+# endclass
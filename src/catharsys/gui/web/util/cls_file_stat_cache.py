@@ -0,0 +1,113 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import threading
+import concurrent.futures
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional
+
+
+# LRU cache of the file status of artefacts. The artefact scan does not record the file status,
+# so it is queried once per artefact in parallel worker threads by 'Update' and then passed to
+# the thumbnail provider, which does not need to access the file system again for thumbnails
+# that are available. The cache has to be cleared when the artefacts are scanned again.
+class CFileStatCache:
+    # Number of threads that query the file status in parallel,
+    # as the latency of network file systems dominates.
+    iMaxWorkers: int = 16
+
+    def __init__(self, *, _iMaxEntries: int = 200000):
+        self._iMaxEntries: int = _iMaxEntries
+        self._xLock: threading.Lock = threading.Lock()
+        self._dicEntries: OrderedDict[str, os.stat_result] = OrderedDict()
+
+    # enddef
+
+    # #########################################################################
+    def Clear(self):
+        with self._xLock:
+            self._dicEntries.clear()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def Get(self, _pathFile: Path) -> Optional[os.stat_result]:
+        sKey: str = _pathFile.as_posix()
+        with self._xLock:
+            xStat: Optional[os.stat_result] = self._dicEntries.get(sKey)
+            if xStat is not None:
+                self._dicEntries.move_to_end(sKey)
+            # endif
+        # endwith
+        return xStat
+
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def _GetStat(_pathFile: Path) -> Optional[os.stat_result]:
+        try:
+            return _pathFile.stat()
+        except OSError:
+            return None
+        # endtry
+
+    # enddef
+
+    # #########################################################################
+    # Returns the file status of the given files, in the same order. Files that are not cached
+    # are queried in parallel. None is returned for files that do not exist.
+    # This is meant to be called in a worker thread.
+    def Update(self, _lPathFiles: list[Path]) -> list[Optional[os.stat_result]]:
+        lStats: list[Optional[os.stat_result]] = [self.Get(pathFile) for pathFile in _lPathFiles]
+        lMissing: list[int] = [iIdx for iIdx, xStat in enumerate(lStats) if xStat is None]
+        if len(lMissing) == 0:
+            return lStats
+        # endif
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CFileStatCache.iMaxWorkers) as xPool:
+            lNewStats = list(xPool.map(CFileStatCache._GetStat, [_lPathFiles[iIdx] for iIdx in lMissing]))
+        # endwith
+
+        with self._xLock:
+            for iIdx, xStat in zip(lMissing, lNewStats):
+                lStats[iIdx] = xStat
+                if xStat is not None:
+                    sKey: str = _lPathFiles[iIdx].as_posix()
+                    self._dicEntries[sKey] = xStat
+                    self._dicEntries.move_to_end(sKey)
+                # endif
+            # endfor
+            while len(self._dicEntries) > self._iMaxEntries:
+                self._dicEntries.popitem(last=False)
+            # endwhile
+        # endwith
+
+        return lStats
+
+    # enddef
+
+
+# endclass
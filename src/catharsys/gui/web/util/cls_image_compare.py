@@ -0,0 +1,220 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import threading
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+# need to enable OpenExr explicitly
+os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
+import cv2
+
+
+@dataclass
+class CImageCompareStats:
+    # Channel names in the order of the statistics lists
+    lChannels: list[str]
+    lMeanAbs: list[float]
+    lMaxAbs: list[float]
+    lRmse: list[float]
+    # Fraction of the pixels whose channel value differs by more than the threshold
+    lDiffRatio: list[float]
+    # The images are compared in the region they have in common, if their sizes differ
+    bSizeMatch: bool
+    iWidth: int
+    iHeight: int
+
+
+# endclass
+
+
+# #########################################################################
+# Compares images on the server. The images are converted to floating point values,
+# where integer images are scaled to the range [0, 1], so that images of different
+# bit depths can be compared. The decoded images and the difference statistics
+# of the most recently compared images are cached.
+class CImageCompare:
+    # Number of decoded images kept in memory, which should cover all images of a comparison
+    iMaxDecodedImages: int = 4
+    # Number of image pairs whose statistics are cached
+    iMaxStats: int = 64
+    # Channel differences above this value count as differing pixel
+    fDiffThreshold: float = 1.0 / 255.0
+
+    _xLock: threading.Lock = threading.Lock()
+    _dicImages: OrderedDict[tuple[str, int], np.ndarray] = OrderedDict()
+    _dicStats: OrderedDict[tuple[str, int, str, int], CImageCompareStats] = OrderedDict()
+
+    # #########################################################################
+    @staticmethod
+    def _GetKey(_pathImage: Path) -> tuple[str, int]:
+        return (_pathImage.as_posix(), _pathImage.stat().st_mtime_ns)
+
+    # enddef
+
+    # #########################################################################
+    # Returns the image as float array of shape (height, width, channels) with the channels in BGR(A) order
+    @classmethod
+    def _LoadImage(cls, _pathImage: Path) -> np.ndarray:
+        tKey: tuple[str, int] = cls._GetKey(_pathImage)
+        with cls._xLock:
+            aImage: Optional[np.ndarray] = cls._dicImages.get(tKey)
+            if aImage is not None:
+                cls._dicImages.move_to_end(tKey)
+                return aImage
+            # endif
+        # endwith
+
+        aImage = cv2.imread(_pathImage.as_posix(), cv2.IMREAD_UNCHANGED)
+        if aImage is None:
+            raise RuntimeError(f"Error loading image: {(_pathImage.as_posix())}")
+        # endif
+        if aImage.ndim == 2:
+            aImage = aImage[:, :, np.newaxis]
+        # endif
+
+        if np.issubdtype(aImage.dtype, np.integer):
+            fMax: float = float(np.iinfo(aImage.dtype).max)
+            aImage = aImage.astype(np.float32) / fMax
+        else:
+            aImage = np.nan_to_num(aImage.astype(np.float32, copy=False), nan=0.0, posinf=0.0, neginf=0.0)
+        # endif
+
+        with cls._xLock:
+            cls._dicImages[tKey] = aImage
+            while len(cls._dicImages) > cls.iMaxDecodedImages:
+                cls._dicImages.popitem(last=False)
+            # endwhile
+        # endwith
+        return aImage
+
+    # enddef
+
+    # #########################################################################
+    # Returns the names of the channels of an image with the given number of channels
+    # and the indices of the channels in RGB(A) order.
+    @staticmethod
+    def _GetChannels(_iChannels: int) -> tuple[list[str], list[int]]:
+        if _iChannels == 1:
+            return ["Y"], [0]
+        elif _iChannels == 2:
+            return ["Y", "A"], [0, 1]
+        elif _iChannels == 3:
+            return ["R", "G", "B"], [2, 1, 0]
+        # endif
+        return ["R", "G", "B", "A"], [2, 1, 0, 3]
+
+    # enddef
+
+    # #########################################################################
+    # Returns the absolute difference of the images in their common region and
+    # with the channels they have in common, in RGB(A) order.
+    @classmethod
+    def _GetDifference(cls, _pathA: Path, _pathB: Path) -> tuple[np.ndarray, list[str], bool]:
+        aA: np.ndarray = cls._LoadImage(_pathA)
+        aB: np.ndarray = cls._LoadImage(_pathB)
+
+        iH: int = min(aA.shape[0], aB.shape[0])
+        iW: int = min(aA.shape[1], aB.shape[1])
+        iC: int = min(aA.shape[2], aB.shape[2])
+        bSizeMatch: bool = aA.shape[0:2] == aB.shape[0:2]
+
+        lChannels, lIdx = cls._GetChannels(iC)
+        aDiff: np.ndarray = np.abs(aA[0:iH, 0:iW, lIdx] - aB[0:iH, 0:iW, lIdx])
+        return aDiff, lChannels, bSizeMatch
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def GetStats(cls, _pathA: Path, _pathB: Path) -> CImageCompareStats:
+        tKey: tuple[str, int, str, int] = cls._GetKey(_pathA) + cls._GetKey(_pathB)
+        with cls._xLock:
+            xStats: Optional[CImageCompareStats] = cls._dicStats.get(tKey)
+            if xStats is not None:
+                cls._dicStats.move_to_end(tKey)
+                return xStats
+            # endif
+        # endwith
+
+        aDiff, lChannels, bSizeMatch = cls._GetDifference(_pathA, _pathB)
+        iPixels: int = max(1, aDiff.shape[0] * aDiff.shape[1])
+        xStats = CImageCompareStats(
+            lChannels=lChannels,
+            lMeanAbs=aDiff.mean(axis=(0, 1), dtype=np.float64).tolist(),
+            lMaxAbs=aDiff.max(axis=(0, 1), initial=0.0).tolist(),
+            lRmse=np.sqrt(np.square(aDiff, dtype=np.float64).mean(axis=(0, 1))).tolist(),
+            lDiffRatio=(np.count_nonzero(aDiff > cls.fDiffThreshold, axis=(0, 1)) / iPixels).tolist(),
+            bSizeMatch=bSizeMatch,
+            iWidth=aDiff.shape[1],
+            iHeight=aDiff.shape[0],
+        )
+
+        with cls._xLock:
+            cls._dicStats[tKey] = xStats
+            while len(cls._dicStats) > cls.iMaxStats:
+                cls._dicStats.popitem(last=False)
+            # endwhile
+        # endwith
+        return xStats
+
+    # enddef
+
+    # #########################################################################
+    # Renders the absolute difference of the images, scaled by '_fGain', as 8-bit BGR image.
+    # Single channel differences are shown in gray and the alpha channel is ignored.
+    @classmethod
+    def RenderDifference(cls, _pathA: Path, _pathB: Path, _fGain: float) -> np.ndarray:
+        aDiff, lChannels, _ = cls._GetDifference(_pathA, _pathB)
+        if len(lChannels) >= 3:
+            # Convert from RGB to the BGR order of OpenCV
+            aDiff = aDiff[:, :, 2::-1]
+        else:
+            aDiff = np.repeat(aDiff[:, :, 0:1], 3, axis=2)
+        # endif
+
+        aPreview: np.ndarray = (np.clip(aDiff * _fGain, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+        return np.ascontiguousarray(aPreview)
+
+    # enddef
+
+    # #########################################################################
+    # Returns the channel names and the values of the pixel in RGB(A) order,
+    # or None, if the position is outside of the image.
+    @classmethod
+    def GetPixel(cls, _pathImage: Path, _iX: int, _iY: int) -> Optional[tuple[list[str], list[float]]]:
+        aImage: np.ndarray = cls._LoadImage(_pathImage)
+        if _iX < 0 or _iY < 0 or _iY >= aImage.shape[0] or _iX >= aImage.shape[1]:
+            return None
+        # endif
+
+        lChannels, lIdx = cls._GetChannels(aImage.shape[2])
+        return lChannels, aImage[_iY, _iX, lIdx].tolist()
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,340 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import math
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+from nicegui import app
+from fastapi.responses import Response
+
+from .cls_byte_cache import CByteCache
+
+# need to enable OpenExr explicitly
+os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
+import cv2
+
+
+@dataclass
+class CImageTileSource:
+    sId: str
+    pathImage: Path
+    funcLoad: Callable[[Path], np.ndarray]
+    iWidth: int
+    iHeight: int
+    iTileSize: int
+    iMaxLevel: int
+    sUrl: str
+
+
+# endclass
+
+
+# #########################################################################
+# Serves images as pyramids of tiles. Level 0 is the full resolution image and each
+# further level halves the resolution, until the image fits into a single tile.
+# The pyramid levels of the most recently used images are held in memory and
+# the encoded tiles are kept in a byte cache. Tiles are created on demand, when they
+# are requested by a client, in the thread pool of the server.
+class CImageTiles:
+    iTileSize: int = 256
+    iJpegQuality: int = 90
+    # Number of registered tile sources. The least recently used sources are removed,
+    # so that tiles of these sources are no longer served.
+    iMaxSources: int = 1024
+    # Number of bytes of the decoded pyramids that are kept in memory, which has to cover all images
+    # that are shown together in the comparison viewer. The pyramid of the most recently used image
+    # is always kept, even if it alone exceeds the limit.
+    iMaxDecodedBytes: int = 1024 * 1024 * 1024
+    xByteCache: CByteCache = CByteCache(_iMaxBytes=128 * 1024 * 1024)
+    sUrlPrefix: str = "/tiles"
+    bIsRegistered: bool = False
+
+    _xLock: threading.Lock = threading.Lock()
+    _dicSources: OrderedDict[str, CImageTileSource] = OrderedDict()
+    _dicPyramids: OrderedDict[str, list[np.ndarray]] = OrderedDict()
+    _dicLoadLocks: dict[str, threading.Lock] = dict()
+
+    # #########################################################################
+    # Registers the route the tiles are served from. This has to be called
+    # once by the app before the server is started.
+    @classmethod
+    def Register(cls):
+        if cls.bIsRegistered is True:
+            return
+        # endif
+        cls.bIsRegistered = True
+
+        # The route is a plain function, so that FastAPI runs it in its thread pool
+        # and decoding an image or encoding a tile does not block the event loop.
+        @app.get(cls.sUrlPrefix + "/{sid}/{level}/{x}/{y}")
+        def tile(sid: str, level: int, x: int, y: int) -> Response:
+            try:
+                xData: Optional[bytes] = cls._GetTileBytes(sid, level, x, y)
+            except Exception as xEx:
+                print(f"WARNING: Error providing image tile '{sid}/{level}/{x}/{y}':\n{xEx}")
+                xData = None
+            # endtry
+
+            if xData is None:
+                return Response(status_code=404)
+            # endif
+
+            # The tile source ids contain the modification time of the image,
+            # so a tile URL always refers to the same image.
+            return Response(
+                content=xData,
+                media_type="image/jpeg",
+                headers={"Cache-Control": "public, max-age=31536000, immutable"},
+            )
+
+        # enddef
+
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def LoadImage(_pathImage: Path) -> np.ndarray:
+        aImage: Optional[np.ndarray] = cv2.imread(_pathImage.as_posix(), cv2.IMREAD_COLOR)
+        if aImage is None:
+            raise RuntimeError(f"Error loading image: {(_pathImage.as_posix())}")
+        # endif
+        return aImage
+
+    # enddef
+
+    # #########################################################################
+    # Makes the image available as tile source. The image is only loaded, when the first tile is requested.
+    # The source id is derived from the path, the modification time of the image and '_sVariant',
+    # which has to identify the loading function, if one is given.
+    @classmethod
+    def RegisterImage(
+        cls,
+        _pathImage: Path,
+        *,
+        _iWidth: int,
+        _iHeight: int,
+        _sVariant: str = "",
+        _funcLoad: Optional[Callable[[Path], np.ndarray]] = None,
+    ) -> CImageTileSource:
+        iTime: int = _pathImage.stat().st_mtime_ns
+        sId: str = hashlib.md5(f"{_pathImage.as_posix()}|{iTime}|{_sVariant}".encode("utf8")).hexdigest()[0:20]
+
+        with cls._xLock:
+            xSource: Optional[CImageTileSource] = cls._dicSources.get(sId)
+            if xSource is None:
+                iMaxLevel: int = max(0, math.ceil(math.log2(max(_iWidth, _iHeight, 1) / cls.iTileSize)))
+                xSource = CImageTileSource(
+                    sId=sId,
+                    pathImage=_pathImage,
+                    funcLoad=cls.LoadImage if _funcLoad is None else _funcLoad,
+                    iWidth=_iWidth,
+                    iHeight=_iHeight,
+                    iTileSize=cls.iTileSize,
+                    iMaxLevel=iMaxLevel,
+                    sUrl=f"{cls.sUrlPrefix}/{sId}",
+                )
+                cls._dicSources[sId] = xSource
+                while len(cls._dicSources) > cls.iMaxSources:
+                    cls._dicSources.popitem(last=False)
+                # endwhile
+            else:
+                cls._dicSources.move_to_end(sId)
+            # endif
+        # endwith
+
+        return xSource
+
+    # enddef
+
+    # #########################################################################
+    # Returns the lock that serializes loading the image of a source and creating its pyramid levels
+    @classmethod
+    def _GetLoadLock(cls, _sId: str) -> threading.Lock:
+        with cls._xLock:
+            return cls._dicLoadLocks.setdefault(_sId, threading.Lock())
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Returns the pyramid of the source, which initially only contains level 0.
+    # Only one thread loads an image, while the others wait for it.
+    @classmethod
+    def _ProvidePyramid(cls, _xSource: CImageTileSource) -> list[np.ndarray]:
+        with cls._xLock:
+            lPyramid: Optional[list[np.ndarray]] = cls._dicPyramids.get(_xSource.sId)
+            if lPyramid is not None:
+                cls._dicPyramids.move_to_end(_xSource.sId)
+                return lPyramid
+            # endif
+        # endwith
+
+        with cls._GetLoadLock(_xSource.sId):
+            with cls._xLock:
+                lPyramid = cls._dicPyramids.get(_xSource.sId)
+            # endwith
+            if lPyramid is not None:
+                return lPyramid
+            # endif
+
+            lPyramid = [_xSource.funcLoad(_xSource.pathImage)]
+            with cls._xLock:
+                cls._dicPyramids[_xSource.sId] = lPyramid
+                cls._EvictPyramids()
+            # endwith
+        # endwith
+
+        return lPyramid
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def _EvictPyramids(cls):
+        # Expects that the lock is held by the caller
+        iBytes: int = sum(aLevel.nbytes for lPyramid in cls._dicPyramids.values() for aLevel in lPyramid)
+        while iBytes > cls.iMaxDecodedBytes and len(cls._dicPyramids) > 1:
+            sEvictId, lPyramid = cls._dicPyramids.popitem(last=False)
+            cls._dicLoadLocks.pop(sEvictId, None)
+            iBytes -= sum(aLevel.nbytes for aLevel in lPyramid)
+        # endwhile
+
+    # enddef
+
+    # #########################################################################
+    # Levels are only appended to a pyramid, so an existing level is returned without locking.
+    # Missing levels are created under the load lock of the source, so that tiles of other
+    # images are served in the meantime.
+    @classmethod
+    def _GetLevelImage(cls, _xSource: CImageTileSource, _iLevel: int) -> np.ndarray:
+        lPyramid: list[np.ndarray] = cls._ProvidePyramid(_xSource)
+        if len(lPyramid) > _iLevel:
+            return lPyramid[_iLevel]
+        # endif
+
+        with cls._GetLoadLock(_xSource.sId):
+            while len(lPyramid) <= _iLevel:
+                aPrev: np.ndarray = lPyramid[-1]
+                iH, iW = aPrev.shape[0:2]
+                lPyramid.append(
+                    cv2.resize(aPrev, (max(1, (iW + 1) // 2), max(1, (iH + 1) // 2)), interpolation=cv2.INTER_AREA)
+                )
+            # endwhile
+            with cls._xLock:
+                cls._EvictPyramids()
+            # endwith
+            return lPyramid[_iLevel]
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def _GetTileBytes(cls, _sId: str, _iLevel: int, _iX: int, _iY: int) -> Optional[bytes]:
+        sCacheKey: str = f"{_sId}/{_iLevel}/{_iX}/{_iY}"
+        xData: Optional[bytes] = cls.xByteCache.Get(sCacheKey)
+        if xData is not None:
+            return xData
+        # endif
+
+        with cls._xLock:
+            xSource: Optional[CImageTileSource] = cls._dicSources.get(_sId)
+            if xSource is not None:
+                cls._dicSources.move_to_end(_sId)
+            # endif
+        # endwith
+        if xSource is None or _iLevel < 0 or _iLevel > xSource.iMaxLevel or _iX < 0 or _iY < 0:
+            return None
+        # endif
+
+        return cls._EncodeTile(xSource, cls._GetLevelImage(xSource, _iLevel), _iLevel, _iX, _iY)
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def _EncodeTile(
+        cls, _xSource: CImageTileSource, _aLevel: np.ndarray, _iLevel: int, _iX: int, _iY: int
+    ) -> Optional[bytes]:
+        iSize: int = _xSource.iTileSize
+        aTile: np.ndarray = _aLevel[_iY * iSize : (_iY + 1) * iSize, _iX * iSize : (_iX + 1) * iSize]
+        if aTile.size == 0:
+            return None
+        # endif
+
+        bOk, aData = cv2.imencode(".jpg", aTile, [cv2.IMWRITE_JPEG_QUALITY, cls.iJpegQuality])
+        if not bOk:
+            return None
+        # endif
+
+        xData: bytes = aData.tobytes()
+        cls.xByteCache.Put(f"{_xSource.sId}/{_iLevel}/{_iX}/{_iY}", xData)
+        return xData
+
+    # enddef
+
+    # #########################################################################
+    # Creates the tiles of all levels that consist of at most '_iMaxTiles' tiles, so that an image
+    # can be shown without delay. The decoded image is not added to the pyramids in memory,
+    # so that prefetching does not evict the image that is currently viewed.
+    @classmethod
+    def Prefetch(cls, _xSource: CImageTileSource, *, _iMaxTiles: int = 64):
+        if f"{_xSource.sId}/{_xSource.iMaxLevel}/0/0" in cls.xByteCache:
+            return
+        # endif
+
+        with cls._xLock:
+            lPyramid: Optional[list[np.ndarray]] = cls._dicPyramids.get(_xSource.sId)
+        # endwith
+        aLevel: np.ndarray = lPyramid[0] if lPyramid is not None else _xSource.funcLoad(_xSource.pathImage)
+
+        for iLevel in range(_xSource.iMaxLevel + 1):
+            if iLevel > 0:
+                iH, iW = aLevel.shape[0:2]
+                aLevel = cv2.resize(
+                    aLevel, (max(1, (iW + 1) // 2), max(1, (iH + 1) // 2)), interpolation=cv2.INTER_AREA
+                )
+            # endif
+
+            iTileCntX: int = math.ceil(aLevel.shape[1] / _xSource.iTileSize)
+            iTileCntY: int = math.ceil(aLevel.shape[0] / _xSource.iTileSize)
+            if iTileCntX * iTileCntY > _iMaxTiles:
+                continue
+            # endif
+
+            for iY in range(iTileCntY):
+                for iX in range(iTileCntX):
+                    cls._EncodeTile(_xSource, aLevel, iLevel, iX, iY)
+                # endfor
+            # endfor
+        # endfor
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,303 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import collections
+import concurrent.futures
+from pathlib import Path
+from typing import Optional
+
+
+# Output of a single job of a given output type.
+# All output is appended to a log file, while only the last 'iMaxTailChars' characters
+# are kept in memory for display. The output is not written by 'Append', but collected
+# until it is taken by the output store, which writes it in a background thread.
+class CJobOutputBuffer:
+    def __init__(self, _pathLog: Path, *, _iMaxTailChars: int):
+        self._pathLog: Path = _pathLog
+        self._iMaxTailChars: int = _iMaxTailChars
+
+        self._dqTail: collections.deque[str] = collections.deque()
+        self._iTailChars: int = 0
+        self._iTotalChars: int = 0
+        self._bLogCreated: bool = False
+        # Output that has not been handed to the log writer yet
+        self._lPending: list[str] = []
+        self._bTruncateLog: bool = True
+
+    # enddef
+
+    @property
+    def pathLog(self) -> Path:
+        return self._pathLog
+
+    # enddef
+
+    @property
+    def bHasLog(self) -> bool:
+        return self._bLogCreated
+
+    # enddef
+
+    # Total number of characters written
+    @property
+    def iTotalChars(self) -> int:
+        return self._iTotalChars
+
+    # enddef
+
+    # Number of characters that are only available in the log file
+    @property
+    def iDroppedChars(self) -> int:
+        return self._iTotalChars - self._iTailChars
+
+    # enddef
+
+    @property
+    def sTail(self) -> str:
+        if len(self._dqTail) > 1:
+            # Join the chunks once, so that repeated reads do not join them again
+            sText = "".join(self._dqTail)
+            self._dqTail.clear()
+            self._dqTail.append(sText)
+        # endif
+        return self._dqTail[0] if len(self._dqTail) > 0 else ""
+
+    # enddef
+
+    # #########################################################################
+    def Append(self, _sText: str):
+        if len(_sText) == 0:
+            return
+        # endif
+
+        self._lPending.append(_sText)
+        self._bLogCreated = True
+
+        self._dqTail.append(_sText)
+        self._iTailChars += len(_sText)
+        self._iTotalChars += len(_sText)
+
+        while self._iTailChars > self._iMaxTailChars and len(self._dqTail) > 0:
+            sChunk: str = self._dqTail.popleft()
+            iExcess: int = self._iTailChars - self._iMaxTailChars
+            if len(sChunk) > iExcess:
+                self._dqTail.appendleft(sChunk[iExcess:])
+                self._iTailChars -= iExcess
+            else:
+                self._iTailChars -= len(sChunk)
+            # endif
+        # endwhile
+
+    # enddef
+
+    # #########################################################################
+    # Returns the output that has not been written yet, together with a flag, whether the
+    # log file has to be truncated first, which is the case for the first output of a new launch.
+    def TakePending(self) -> Optional[tuple[Path, bool, str]]:
+        if len(self._lPending) == 0:
+            return None
+        # endif
+        tPending = (self._pathLog, self._bTruncateLog, "".join(self._lPending))
+        self._lPending = []
+        self._bTruncateLog = False
+        return tPending
+
+    # enddef
+
+    # #########################################################################
+    # Restores the buffer from an existing log file, of which '_iTotalChars' characters
+    # have been written. The tail is read from the end of the log file.
+    def Restore(self, _iTotalChars: int):
+        self._dqTail.clear()
+        self._iTailChars = 0
+        self._iTotalChars = 0
+        self._bLogCreated = False
+        self._lPending = []
+
+        try:
+            with self._pathLog.open("rb") as xFile:
+                iSize: int = xFile.seek(0, 2)
+                # A character has at most 4 bytes in utf-8
+                iRead: int = min(iSize, 4 * self._iMaxTailChars)
+                xFile.seek(iSize - iRead)
+                sText: str = xFile.read().decode("utf8", errors="ignore")[-self._iMaxTailChars :]
+            # endwith
+        except OSError:
+            return
+        # endtry
+
+        self._bLogCreated = True
+        # Further output of a restored launch is appended to the log file
+        self._bTruncateLog = False
+        if len(sText) > 0:
+            self._dqTail.append(sText)
+        # endif
+        self._iTailChars = len(sText)
+        self._iTotalChars = max(_iTotalChars, len(sText))
+
+    # enddef
+
+    # #########################################################################
+    # Returns the text written since the character position '_iPos', or None if
+    # this part of the output is no longer held in memory.
+    def GetTextSince(self, _iPos: int) -> Optional[str]:
+        if _iPos < self.iDroppedChars:
+            return None
+        # endif
+        sTail: str = self.sTail
+        return sTail[len(sTail) - (self._iTotalChars - _iPos) :] if _iPos < self._iTotalChars else ""
+
+    # enddef
+
+    # #########################################################################
+    # Expects that the output has been written to the log file by the output store
+    def ReadAll(self) -> str:
+        if self._bLogCreated is False:
+            return self.sTail
+        # endif
+        return self._pathLog.read_text(encoding="utf8", errors="replace")
+
+    # enddef
+
+
+# endclass
+
+
+# Output buffers of all jobs of a launch by output type.
+# The output collected by the buffers is written to the log files by 'Flush' in a background thread,
+# with a single write per log file and flush, so that writing the output does not block the event loop.
+class CJobOutputStore:
+    # All log files are written by a single thread, so that the writes of a log file stay in order
+    _xWriter: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def __init__(self, _pathLogs: Path, *, _iMaxTailChars: int):
+        self._pathLogs: Path = _pathLogs
+        self._iMaxTailChars: int = _iMaxTailChars
+        self._dicBuffers: dict[str, list[CJobOutputBuffer]] = dict()
+        # Buffers with output that has not been written yet
+        self._setPending: set[CJobOutputBuffer] = set()
+        self._xFlushFuture: Optional[concurrent.futures.Future] = None
+
+    # enddef
+
+    @property
+    def lOutputTypes(self) -> list[str]:
+        return list(self._dicBuffers.keys())
+
+    # enddef
+
+    # #########################################################################
+    def Create(self, _lOutputTypes: list[str], _iJobCount: int):
+        self.Sync()
+        self._pathLogs.mkdir(parents=True, exist_ok=True)
+        self._dicBuffers = {
+            sOutType: [
+                CJobOutputBuffer(
+                    self._pathLogs / f"job-{iJobIdx:05d}-{sOutType}.log", _iMaxTailChars=self._iMaxTailChars
+                )
+                for iJobIdx in range(_iJobCount)
+            ]
+            for sOutType in _lOutputTypes
+        }
+
+    # enddef
+
+    # #########################################################################
+    # Creates the buffers from the existing log files. '_dicOutputPos' gives the number of characters
+    # written to the log files by job index and output type.
+    def Restore(self, _lOutputTypes: list[str], _iJobCount: int, _dicOutputPos: dict[int, dict[str, int]]):
+        self.Create(_lOutputTypes, _iJobCount)
+        for sOutType, lBuffers in self._dicBuffers.items():
+            for iJobIdx, xBuffer in enumerate(lBuffers):
+                xBuffer.Restore(_dicOutputPos.get(iJobIdx, dict()).get(sOutType, 0))
+            # endfor
+        # endfor
+
+    # enddef
+
+    # #########################################################################
+    def Clear(self):
+        self.Sync()
+        self._dicBuffers.clear()
+
+    # enddef
+
+    # #########################################################################
+    def Get(self, _sOutType: str, _iJobIdx: int) -> CJobOutputBuffer:
+        return self._dicBuffers[_sOutType][_iJobIdx]
+
+    # enddef
+
+    # #########################################################################
+    def Append(self, _sOutType: str, _iJobIdx: int, _sText: str):
+        xBuffer: CJobOutputBuffer = self._dicBuffers[_sOutType][_iJobIdx]
+        xBuffer.Append(_sText)
+        self._setPending.add(xBuffer)
+
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def _WriteLogs(_lPending: list[tuple[Path, bool, str]]):
+        for pathLog, bTruncate, sText in _lPending:
+            try:
+                with pathLog.open("w" if bTruncate else "a", encoding="utf8") as xFile:
+                    xFile.write(sText)
+                # endwith
+            except OSError as xEx:
+                print(f"WARNING: Cannot write job output to log file '{pathLog}': {xEx}")
+            # endtry
+        # endfor
+
+    # enddef
+
+    # #########################################################################
+    # Hands the collected output of all buffers to the log writer thread
+    def Flush(self):
+        lPending: list[tuple[Path, bool, str]] = []
+        for xBuffer in self._setPending:
+            tPending = xBuffer.TakePending()
+            if tPending is not None:
+                lPending.append(tPending)
+            # endif
+        # endfor
+        self._setPending.clear()
+
+        if len(lPending) > 0:
+            self._xFlushFuture = CJobOutputStore._xWriter.submit(CJobOutputStore._WriteLogs, lPending)
+        # endif
+
+    # enddef
+
+    # #########################################################################
+    # Writes all collected output and waits until it is in the log files
+    def Sync(self):
+        self.Flush()
+        if self._xFlushFuture is not None:
+            self._xFlushFuture.result()
+            self._xFlushFuture = None
+        # endif
+
+    # enddef
+
+
+# endclass
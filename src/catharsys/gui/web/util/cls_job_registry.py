@@ -0,0 +1,248 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import json
+import time
+import threading
+import concurrent.futures
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class CJobRegistryLaunch:
+    fTimeStart: float
+    lOutputTypes: list[str]
+    lLabels: list[str]
+    lStatus: list[str]
+    dicInfo: dict[int, dict] = field(default_factory=dict)
+    dicOutputPos: dict[int, dict[str, int]] = field(default_factory=dict)
+    fTimeEnd: Optional[float] = None
+
+    @property
+    def iJobCount(self) -> int:
+        return len(self.lLabels)
+
+    # enddef
+
+
+# endclass
+
+
+# Record of the jobs of the last launch of a launch instance. The registry holds the latest state
+# of all jobs in memory and writes it as a single JSON document, so the file size only depends on
+# the number of jobs. Changes are written at most every 'fWriteInterval' seconds in a background thread.
+# Changes made within this interval after a write are written by a timer when the interval has passed.
+# Starting a new launch replaces the record of the previous launch.
+class CJobRegistry:
+    fWriteInterval: float = 5.0
+
+    # The registry files are written by a single thread, so that the writes of a file stay in order
+    _xWriter: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def __init__(self, _pathFile: Path):
+        self._pathFile: Path = _pathFile
+        self._xLaunch: Optional[CJobRegistryLaunch] = None
+        self._bChanged: bool = False
+        self._fTimeWrite: float = 0.0
+        self._xLock: threading.Lock = threading.Lock()
+        self._xWriteTimer: Optional[threading.Timer] = None
+
+    # enddef
+
+    @property
+    def pathFile(self) -> Path:
+        return self._pathFile
+
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def _WriteFile(_pathFile: Path, _dicData: dict):
+        pathTemp: Path = _pathFile.with_name(_pathFile.name + ".tmp")
+        try:
+            _pathFile.parent.mkdir(parents=True, exist_ok=True)
+            with pathTemp.open("w", encoding="utf8") as xFile:
+                json.dump(_dicData, xFile, default=str)
+            # endwith
+            os.replace(pathTemp, _pathFile)
+        except OSError as xEx:
+            print(f"WARNING: Cannot write job registry '{_pathFile}': {xEx}")
+        # endtry
+
+    # enddef
+
+    # #########################################################################
+    # Hands a copy of the current state to the writer thread.
+    # Expects that the lock is held by the caller.
+    def _Write(self):
+        if self._xWriteTimer is not None:
+            self._xWriteTimer.cancel()
+            self._xWriteTimer = None
+        # endif
+
+        xLaunch: Optional[CJobRegistryLaunch] = self._xLaunch
+        if xLaunch is None:
+            return
+        # endif
+
+        # The job info dictionaries are replaced and not changed, so a shallow copy of them suffices
+        dicData: dict = {
+            "fTimeStart": xLaunch.fTimeStart,
+            "fTimeEnd": xLaunch.fTimeEnd,
+            "lOutputTypes": list(xLaunch.lOutputTypes),
+            "lLabels": list(xLaunch.lLabels),
+            "lStatus": list(xLaunch.lStatus),
+            "dicInfo": {str(iIdx): dicInfo for iIdx, dicInfo in xLaunch.dicInfo.items()},
+            "dicOutputPos": {str(iIdx): dict(dicPos) for iIdx, dicPos in xLaunch.dicOutputPos.items()},
+        }
+        self._bChanged = False
+        self._fTimeWrite = time.time()
+        CJobRegistry._xWriter.submit(CJobRegistry._WriteFile, self._pathFile, dicData)
+
+    # enddef
+
+    # #########################################################################
+    # Expects that the lock is held by the caller
+    def _WriteIfDue(self):
+        if self._bChanged is False:
+            return
+        # endif
+
+        fWait: float = CJobRegistry.fWriteInterval - (time.time() - self._fTimeWrite)
+        if fWait <= 0.0:
+            self._Write()
+        elif self._xWriteTimer is None:
+            self._xWriteTimer = threading.Timer(fWait, self.Flush)
+            self._xWriteTimer.daemon = True
+            self._xWriteTimer.start()
+        # endif
+
+    # enddef
+
+    # #########################################################################
+    # Writes all changes that have not been written yet
+    def Flush(self):
+        with self._xLock:
+            self._xWriteTimer = None
+            if self._bChanged is True:
+                self._Write()
+            # endif
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def StartLaunch(self, *, _lOutputTypes: list[str], _lLabels: list[str], _lStatus: list[str]):
+        with self._xLock:
+            self._xLaunch = CJobRegistryLaunch(
+                fTimeStart=time.time(),
+                lOutputTypes=list(_lOutputTypes),
+                lLabels=list(_lLabels),
+                lStatus=list(_lStatus),
+            )
+            self._Write()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Records the new status and the job info of the given jobs
+    def AddStatus(self, _dicStatus: dict[int, tuple[str, dict]]):
+        if self._xLaunch is None or len(_dicStatus) == 0:
+            return
+        # endif
+
+        with self._xLock:
+            for iIdx, (sStatus, dicInfo) in _dicStatus.items():
+                if 0 <= iIdx < self._xLaunch.iJobCount:
+                    self._xLaunch.lStatus[iIdx] = sStatus
+                    self._xLaunch.dicInfo[iIdx] = dicInfo
+                # endif
+            # endfor
+            self._bChanged = True
+            self._WriteIfDue()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Records the number of characters written to the log files of the given jobs by output type
+    def AddOutputPos(self, _dicOutputPos: dict[int, dict[str, int]]):
+        if self._xLaunch is None or len(_dicOutputPos) == 0:
+            return
+        # endif
+
+        with self._xLock:
+            for iIdx, dicPos in _dicOutputPos.items():
+                self._xLaunch.dicOutputPos.setdefault(iIdx, dict()).update(dicPos)
+            # endfor
+            self._bChanged = True
+            self._WriteIfDue()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def EndLaunch(self):
+        if self._xLaunch is None:
+            return
+        # endif
+        with self._xLock:
+            self._xLaunch.fTimeEnd = time.time()
+            self._Write()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Returns the state of the last launch, or None if no launch has been recorded
+    def Load(self) -> Optional[CJobRegistryLaunch]:
+        try:
+            with self._pathFile.open("r", encoding="utf8") as xFile:
+                dicData: dict = json.load(xFile)
+            # endwith
+
+            xLaunch = CJobRegistryLaunch(
+                fTimeStart=dicData["fTimeStart"],
+                lOutputTypes=dicData["lOutputTypes"],
+                lLabels=dicData["lLabels"],
+                lStatus=dicData["lStatus"],
+                dicInfo={int(sIdx): dicInfo for sIdx, dicInfo in dicData["dicInfo"].items()},
+                dicOutputPos={int(sIdx): dicPos for sIdx, dicPos in dicData["dicOutputPos"].items()},
+                fTimeEnd=dicData["fTimeEnd"],
+            )
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        # endtry
+
+        if len(xLaunch.lStatus) != xLaunch.iJobCount:
+            return None
+        # endif
+        return xLaunch
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,225 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import json
+import concurrent.futures
+from pathlib import Path
+from typing import Callable, Optional
+
+
+# Modification times of the directories of a scan.
+# Creating or deleting files or sub-directories changes the modification time of
+# the parent directory. So, if none of the modification times of all directories the scan
+# has visited has changed, the scan is still up-to-date and the file system does not need
+# to be walked again. These directories are recorded by 'FromWalk' from the roots of the scan.
+class CScanDirTimes:
+    # Time recorded for directories whose time is not known to be before the scan.
+    # They are always reported as changed.
+    iTimeChanged: int = -2
+
+    # Number of threads that query the directory times in parallel,
+    # as the latency of network file systems dominates.
+    iMaxWorkers: int = 16
+
+    def __init__(self, _dicDirTimes: Optional[dict[str, int]] = None):
+        self._dicDirTimes: dict[str, int] = dict() if _dicDirTimes is None else _dicDirTimes
+
+    # enddef
+
+    @property
+    def iDirCount(self) -> int:
+        return len(self._dicDirTimes)
+
+    # enddef
+
+    @property
+    def lDirs(self) -> list[str]:
+        return list(self._dicDirTimes.keys())
+
+    # enddef
+
+    @property
+    def dicDirTimes(self) -> dict[str, int]:
+        return self._dicDirTimes
+
+    # enddef
+
+    # The recorded directories that are not contained in another recorded directory
+    @property
+    def lRoots(self) -> list[str]:
+        return [sDir for sDir in self._dicDirTimes if os.path.dirname(sDir) not in self._dicDirTimes]
+
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def _GetDirTime(_sPath: str) -> int:
+        try:
+            return os.stat(_sPath).st_mtime_ns
+        except OSError:
+            return -1
+        # endtry
+
+    # enddef
+
+    # #########################################################################
+    def _GetDirTimes(self, _lDirs: list[str]) -> list[int]:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CScanDirTimes.iMaxWorkers) as xPool:
+            return list(xPool.map(CScanDirTimes._GetDirTime, _lDirs))
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Returns the time of a directory and its sub-directories. The time is read before
+    # the directory is listed, so that changes during the listing are detected later on.
+    @staticmethod
+    def _ListDir(_sDir: str) -> tuple[int, list[str]]:
+        iTime: int = CScanDirTimes._GetDirTime(_sDir)
+        lSubDirs: list[str] = []
+        try:
+            with os.scandir(_sDir) as xIter:
+                for xEntry in xIter:
+                    if xEntry.is_dir(follow_symlinks=False):
+                        lSubDirs.append(Path(xEntry.path).as_posix())
+                    # endif
+                # endfor
+            # endwith
+        except OSError:
+            pass
+        # endtry
+        return iTime, lSubDirs
+
+    # enddef
+
+    # #########################################################################
+    # Walks the given root directories in parallel and records the times of all directories.
+    # Directories modified at or after '_iChangedAfter' (in ns) are recorded as changed, which is used
+    # if the walk runs after the scan. The progress is reported relative to '_iDirCountHint' directories,
+    # e.g. the number of directories of the previous walk, as the total is not known in advance.
+    @classmethod
+    def FromWalk(
+        cls,
+        _lRoots: list[str],
+        *,
+        _iChangedAfter: Optional[int] = None,
+        _iDirCountHint: int = 0,
+        _funcIterInit: Optional[Callable[[str, int], None]] = None,
+        _funcIterUpdate: Optional[Callable[[int, bool], None]] = None,
+    ) -> "CScanDirTimes":
+        xDirTimes = cls()
+        if _funcIterInit is not None:
+            _funcIterInit("Recording directories...", _iDirCountHint)
+        # endif
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=CScanDirTimes.iMaxWorkers) as xPool:
+            dicPending: dict[concurrent.futures.Future, str] = {
+                xPool.submit(CScanDirTimes._ListDir, sRoot): sRoot for sRoot in _lRoots
+            }
+            while len(dicPending) > 0:
+                setDone, _ = concurrent.futures.wait(dicPending.keys(), return_when=concurrent.futures.FIRST_COMPLETED)
+                for xFuture in setDone:
+                    sDir: str = dicPending.pop(xFuture)
+                    iTime, lSubDirs = xFuture.result()
+                    if _iChangedAfter is not None and iTime >= _iChangedAfter:
+                        iTime = CScanDirTimes.iTimeChanged
+                    # endif
+                    xDirTimes._dicDirTimes[sDir] = iTime
+                    for sSubDir in lSubDirs:
+                        dicPending[xPool.submit(CScanDirTimes._ListDir, sSubDir)] = sSubDir
+                    # endfor
+                # endfor
+
+                iProgress: int = min(len(setDone), _iDirCountHint - len(xDirTimes._dicDirTimes) + len(setDone))
+                if _funcIterUpdate is not None and iProgress > 0:
+                    _funcIterUpdate(iProgress, False)
+                # endif
+            # endwhile
+        # endwith
+
+        if _funcIterUpdate is not None:
+            _funcIterUpdate(0, True)
+        # endif
+
+        return xDirTimes
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def FromDirs(cls, _lDirs: list[str]) -> "CScanDirTimes":
+        xDirTimes = cls()
+        xDirTimes._dicDirTimes = dict(zip(_lDirs, xDirTimes._GetDirTimes(_lDirs)))
+        return xDirTimes
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def Load(cls, _pathFile: Path) -> Optional["CScanDirTimes"]:
+        try:
+            with _pathFile.open("r") as xFile:
+                return cls(json.load(xFile))
+            # endwith
+        except (OSError, ValueError):
+            return None
+        # endtry
+
+    # enddef
+
+    # #########################################################################
+    def Save(self, _pathFile: Path):
+        with _pathFile.open("w") as xFile:
+            json.dump(self._dicDirTimes, xFile)
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Adds directories with their current modification times. Known directories are not changed.
+    def AddDirs(self, _lDirs: list[str]):
+        lNewDirs: list[str] = [sDir for sDir in _lDirs if sDir not in self._dicDirTimes]
+        self._dicDirTimes.update(zip(lNewDirs, self._GetDirTimes(lNewDirs)))
+
+    # enddef
+
+    # #########################################################################
+    # Returns the directories whose modification time has changed or that no longer exist.
+    # If '_bUpdate' is True, the new times are stored, so that the next call only returns later changes.
+    def GetChangedDirs(self, *, _bUpdate: bool = False) -> list[str]:
+        lDirs: list[str] = list(self._dicDirTimes.keys())
+        lChangedDirs: list[str] = []
+        for sDir, iTime in zip(lDirs, self._GetDirTimes(lDirs)):
+            if iTime < 0 or iTime != self._dicDirTimes[sDir]:
+                lChangedDirs.append(sDir)
+                if _bUpdate is True:
+                    self._dicDirTimes[sDir] = iTime
+                # endif
+            # endif
+        # endfor
+        return lChangedDirs
+
+    # enddef
+
+
+# endclass
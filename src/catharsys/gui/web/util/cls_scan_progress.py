@@ -0,0 +1,141 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import time
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class CScanProgressState:
+    iRevision: int
+    sStatus: str
+    bIterActive: bool
+    iDone: int
+    iMax: int
+    fRate: float
+    fEta: Optional[float]
+
+
+# Thread-safe progress of an artefact scan. The scan reports its status and
+# progress from a worker thread, while the UI samples the current state at a fixed rate.
+# The revision is incremented whenever the status text changes, so that the UI
+# only needs to update the status label if it has changed.
+class CScanProgress:
+    # Time constant in seconds of the exponential smoothing of the rate
+    fRateSmoothing: float = 2.0
+
+    def __init__(self):
+        self._xLock: threading.Lock = threading.Lock()
+        self._iRevision: int = 0
+        self._sStatus: str = ""
+        self._bIterActive: bool = False
+        self._iDone: int = 0
+        self._iMax: int = 0
+        self._fRate: float = 0.0
+        self._fLastTime: float = 0.0
+        self._iLastDone: int = 0
+
+    # enddef
+
+    # #########################################################################
+    def SetStatus(self, _sStatus: str):
+        with self._xLock:
+            self._sStatus = _sStatus
+            self._iRevision += 1
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def IterInit(self, _sTitle: str, _iMax: int):
+        with self._xLock:
+            self._sStatus = _sTitle
+            self._iRevision += 1
+            self._bIterActive = True
+            self._iDone = 0
+            self._iMax = _iMax
+            self._fRate = 0.0
+            self._fLastTime = time.monotonic()
+            self._iLastDone = 0
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def IterUpdate(self, _iInc: int, _bEnd: bool = False):
+        with self._xLock:
+            self._iDone += _iInc
+            if _bEnd:
+                self._bIterActive = False
+            # endif
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def Reset(self):
+        with self._xLock:
+            self._bIterActive = False
+            self._iDone = 0
+            self._iMax = 0
+            self._fRate = 0.0
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Returns a copy of the current state. The rate is updated from the progress
+    # since the previous call and is therefore smoothed over the sampling interval.
+    def Sample(self) -> CScanProgressState:
+        with self._xLock:
+            fTime: float = time.monotonic()
+            fDelta: float = fTime - self._fLastTime
+            if self._bIterActive and fDelta > 0.0:
+                fRate: float = (self._iDone - self._iLastDone) / fDelta
+                fAlpha: float = 1.0 if self._fRate == 0.0 else min(1.0, fDelta / CScanProgress.fRateSmoothing)
+                self._fRate += fAlpha * (fRate - self._fRate)
+                self._fLastTime = fTime
+                self._iLastDone = self._iDone
+            # endif
+
+            fEta: Optional[float] = None
+            if self._fRate > 0.0 and self._iMax > 0:
+                fEta = max(0, self._iMax - self._iDone) / self._fRate
+            # endif
+
+            return CScanProgressState(
+                iRevision=self._iRevision,
+                sStatus=self._sStatus,
+                bIterActive=self._bIterActive,
+                iDone=self._iDone,
+                iMax=self._iMax,
+                fRate=self._fRate,
+                fEta=fEta,
+            )
+        # endwith
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,97 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+# Key of a loaded scan of the form (variant group path, group id, modification time of scan cache file)
+TScanKey = tuple[str, str, int]
+
+
+@dataclass
+class CSharedScan:
+    xGroup: Any = None
+    iRefCount: int = 0
+    xLock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# endclass
+
+
+# Process-wide registry of loaded artefact scans. Views of the same variant group
+# share the group data of a scan read-only, so that a scan cache file is only
+# deserialized once per server process. The shared data is released when the
+# last view that acquired it releases it.
+class CScanRegistry:
+    _dicScans: dict[TScanKey, CSharedScan] = dict()
+    _xLock: threading.Lock = threading.Lock()
+
+    # #########################################################################
+    # Returns the group data for the given key. If the scan is not loaded yet,
+    # it is loaded by '_funcLoad'. Concurrent calls for the same key wait for
+    # a single load. If '_funcLoad' returns None, the data cannot be shared and
+    # every later call loads it again. Every call has to be matched by a call to 'Release'.
+    @classmethod
+    def Acquire(cls, _tKey: TScanKey, _funcLoad: Callable[[], Any]) -> Any:
+        with cls._xLock:
+            xScan: CSharedScan = cls._dicScans.get(_tKey)
+            if xScan is None:
+                xScan = CSharedScan()
+                cls._dicScans[_tKey] = xScan
+            # endif
+            xScan.iRefCount += 1
+        # endwith
+
+        with xScan.xLock:
+            if xScan.xGroup is None:
+                try:
+                    xScan.xGroup = _funcLoad()
+                except Exception:
+                    cls.Release(_tKey)
+                    raise
+                # endtry
+            # endif
+        # endwith
+
+        return xScan.xGroup
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def Release(cls, _tKey: TScanKey):
+        with cls._xLock:
+            xScan: Optional[CSharedScan] = cls._dicScans.get(_tKey)
+            if xScan is None:
+                return
+            # endif
+            xScan.iRefCount -= 1
+            if xScan.iRefCount <= 0:
+                del cls._dicScans[_tKey]
+            # endif
+        # endwith
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,189 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import threading
+from pathlib import Path
+
+from .cls_scan_dir_times import CScanDirTimes
+from .paths import IsNetworkPath
+
+try:
+    import watchfiles
+except Exception:
+    watchfiles = None
+# endtry
+
+
+# Watches the directories of an artefact scan for changes. File system events are used where
+# available. Each directory is watched on its own, without its sub-directories, as a recursive
+# watch of the production root can exhaust the watches of the system. The creation of a new
+# sub-directory is reported as change of its parent. On network file systems, where these events
+# are not reported for changes made by other hosts, or for more than 'iMaxEventDirs' directories,
+# the modification times of the directories are polled instead.
+# The changed directories are collected and can be retrieved with 'PopChanges'.
+class CScanWatcher:
+    iMaxEventDirs: int = 4096
+
+    def __init__(self, *, _fPollInterval: float = 10.0):
+        self._fPollInterval: float = _fPollInterval
+        self._xThread: threading.Thread = None
+        self._evStop: threading.Event = threading.Event()
+        self._xLock: threading.Lock = threading.Lock()
+        self._setChangedDirs: set[str] = set()
+        self._setSuffixes: set[str] = set()
+        self._setDirs: set[str] = set()
+        # Directories added while polling, which are taken over by the polling thread
+        self._lAddDirs: list[str] = []
+        self._bPolling: bool = False
+
+    # enddef
+
+    @property
+    def bIsRunning(self) -> bool:
+        return self._xThread is not None
+
+    # enddef
+
+    @property
+    def bIsPolling(self) -> bool:
+        return self._bPolling
+
+    # enddef
+
+    # #########################################################################
+    # Starts watching the given directories. Only file changes with one of the given
+    # suffixes and changes of directories are reported. If the watcher is already running
+    # for the same directories, it keeps running. New directories are added to a running
+    # polling watcher, while the event watcher is restarted for them.
+    def Start(self, _lDirs: list[str], _setSuffixes: set[str]):
+        setDirs: set[str] = set(_lDirs)
+        if self.bIsRunning and set(_setSuffixes) == self._setSuffixes:
+            if setDirs == self._setDirs:
+                return
+            # endif
+            if self._bPolling and setDirs >= self._setDirs:
+                with self._xLock:
+                    self._lAddDirs.extend(setDirs - self._setDirs)
+                # endwith
+                self._setDirs = setDirs
+                return
+            # endif
+        # endif
+
+        self.Stop()
+        if len(_lDirs) == 0:
+            return
+        # endif
+
+        self._evStop.clear()
+        self._setSuffixes = set(_setSuffixes)
+        self._setDirs = setDirs
+        self._lAddDirs = []
+        self._bPolling = (
+            watchfiles is None
+            or len(_lDirs) > CScanWatcher.iMaxEventDirs
+            or IsNetworkPath(Path(os.path.commonpath(_lDirs)))
+        )
+        if self._bPolling:
+            self._xThread = threading.Thread(target=self._RunPolling, args=(_lDirs,), daemon=True)
+        else:
+            self._xThread = threading.Thread(target=self._RunEvents, args=(_lDirs,), daemon=True)
+        # endif
+        self._xThread.start()
+
+    # enddef
+
+    # #########################################################################
+    def Stop(self):
+        if self._xThread is not None:
+            self._evStop.set()
+            self._xThread.join()
+            self._xThread = None
+        # endif
+        self._setDirs = set()
+
+    # enddef
+
+    # #########################################################################
+    def PopChanges(self) -> set[str]:
+        with self._xLock:
+            setChangedDirs = self._setChangedDirs
+            self._setChangedDirs = set()
+        # endwith
+        return setChangedDirs
+
+    # enddef
+
+    # #########################################################################
+    def _AddChanges(self, _iterDirs):
+        with self._xLock:
+            self._setChangedDirs.update(_iterDirs)
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def _RunPolling(self, _lDirs: list[str]):
+        xDirTimes = CScanDirTimes.FromDirs(_lDirs)
+        while not self._evStop.wait(self._fPollInterval):
+            with self._xLock:
+                lAddDirs: list[str] = self._lAddDirs
+                self._lAddDirs = []
+            # endwith
+            xDirTimes.AddDirs(lAddDirs)
+
+            lChangedDirs = xDirTimes.GetChangedDirs(_bUpdate=True)
+            if len(lChangedDirs) > 0:
+                self._AddChanges(lChangedDirs)
+            # endif
+        # endwhile
+
+    # enddef
+
+    # #########################################################################
+    def _RunEvents(self, _lDirs: list[str]):
+        try:
+            for setChanges in watchfiles.watch(*_lDirs, stop_event=self._evStop, recursive=False):
+                lDirs: list[str] = []
+                for _, sPath in setChanges:
+                    sSuffix: str = os.path.splitext(sPath)[1]
+                    if sSuffix in self._setSuffixes:
+                        lDirs.append(os.path.dirname(sPath))
+                    elif sSuffix == "" or os.path.isdir(sPath):
+                        lDirs.append(sPath)
+                    # endif
+                # endfor
+                if len(lDirs) > 0:
+                    self._AddChanges(lDirs)
+                # endif
+            # endfor
+        except Exception as xEx:
+            print(f"WARNING: Watching {len(_lDirs)} directories failed, polling directory times instead:\n{xEx}")
+            self._bPolling = True
+            self._RunPolling(_lDirs)
+        # endtry
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,242 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import atexit
+import hashlib
+import sqlite3
+import threading
+import concurrent.futures
+from pathlib import Path
+from typing import Optional
+from dataclasses import dataclass
+
+from .paths import IsNetworkPath
+
+
+@dataclass
+class CThumbnailIndexEntry:
+    sFilename: str = None
+    iSrcTime: int = 0
+    iSrcSize: int = 0
+    iWidth: int = 0
+    iHeight: int = 0
+
+
+# endclass
+
+
+# Persistent index of the thumbnails in a single thumbnail folder, keyed by the
+# relative path of the source image. The index is loaded once per folder and
+# is shared by all thumbnail providers of the server process. Lookups only use
+# the in-memory dictionary. Updates are collected and written to the database
+# in a single transaction per batch by a background thread, at most every
+# 'fWriteInterval' seconds.
+# SQLite file locking is not reliable on network file systems. There, the database
+# is kept in 'pathLocalIndices' on the local disk instead of the thumbnail folder.
+# The thumbnail files are still shared, and thumbnails another host has created are
+# adopted on first lookup, as their file names only depend on the source image.
+class CThumbnailIndex:
+    _dicIndices: dict[str, "CThumbnailIndex"] = dict()
+    _xIndicesLock: threading.Lock = threading.Lock()
+
+    # Single thread, so that the database writes of all indices do not run concurrently
+    _xWriter: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    sDatabaseFilename: str = "_index.sqlite"
+    pathLocalIndices: Path = Path.home() / ".cache" / "catharsys-gui" / "thumbnail-index"
+    fWriteInterval: float = 2.0
+
+    def __init__(self, _pathThumb: Path):
+        self._pathThumb: Path = _pathThumb
+        self._pathDb: Path = self._GetDatabasePath(_pathThumb)
+        self._xLock: threading.Lock = threading.Lock()
+        self._dicEntries: dict[str, CThumbnailIndexEntry] = dict()
+        # Updates not yet written to the database. Removed entries are stored as None.
+        self._dicPending: dict[str, Optional[CThumbnailIndexEntry]] = dict()
+        self._xWriteTimer: Optional[threading.Timer] = None
+        self._xDb: sqlite3.Connection = None
+
+        self._Load()
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def Provide(cls, _pathThumb: Path) -> "CThumbnailIndex":
+        sKey: str = _pathThumb.as_posix()
+        with cls._xIndicesLock:
+            xIndex: CThumbnailIndex = cls._dicIndices.get(sKey)
+            if xIndex is None:
+                _pathThumb.mkdir(parents=True, exist_ok=True)
+                xIndex = CThumbnailIndex(_pathThumb)
+                cls._dicIndices[sKey] = xIndex
+            # endif
+        # endwith
+        return xIndex
+
+    # enddef
+
+    # #########################################################################
+    # Writes the pending updates of all indices directly. This is called on exit,
+    # when the writer thread does not accept new tasks anymore. The writes that are
+    # still running in the writer thread are waited for first.
+    @classmethod
+    def FlushAll(cls):
+        cls._xWriter.shutdown(wait=True)
+        with cls._xIndicesLock:
+            lIndices: list[CThumbnailIndex] = list(cls._dicIndices.values())
+        # endwith
+        for xIndex in lIndices:
+            xIndex._Write(xIndex._TakePending())
+        # endfor
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def _GetDatabasePath(cls, _pathThumb: Path) -> Path:
+        if not IsNetworkPath(_pathThumb):
+            return _pathThumb / cls.sDatabaseFilename
+        # endif
+
+        sName: str = hashlib.md5(_pathThumb.resolve().as_posix().encode("utf8")).hexdigest()
+        cls.pathLocalIndices.mkdir(parents=True, exist_ok=True)
+        return cls.pathLocalIndices / f"{sName}.sqlite"
+
+    # enddef
+
+    # #########################################################################
+    def _Load(self):
+        try:
+            self._xDb = sqlite3.connect(self._pathDb.as_posix(), check_same_thread=False)
+            self._xDb.execute(
+                "CREATE TABLE IF NOT EXISTS thumbnails ("
+                "rel_path TEXT PRIMARY KEY, filename TEXT, src_time INTEGER, src_size INTEGER, "
+                "width INTEGER, height INTEGER)"
+            )
+            self._xDb.commit()
+
+            for sRelPath, sFilename, iSrcTime, iSrcSize, iWidth, iHeight in self._xDb.execute(
+                "SELECT rel_path, filename, src_time, src_size, width, height FROM thumbnails"
+            ):
+                self._dicEntries[sRelPath] = CThumbnailIndexEntry(
+                    sFilename=sFilename, iSrcTime=iSrcTime, iSrcSize=iSrcSize, iWidth=iWidth, iHeight=iHeight
+                )
+            # endfor
+        except (sqlite3.Error, OSError) as xEx:
+            # Keep working with an in-memory index, if the database cannot be used
+            print(f"WARNING: Thumbnail index not persistent, error accessing '{(self._pathDb.as_posix())}':\n{xEx}")
+            self._xDb = None
+        # endtry
+
+    # enddef
+
+    # #########################################################################
+    def Get(self, _sRelPath: str) -> Optional[CThumbnailIndexEntry]:
+        return self._dicEntries.get(_sRelPath)
+
+    # enddef
+
+    # #########################################################################
+    def Set(self, _sRelPath: str, _xEntry: CThumbnailIndexEntry):
+        with self._xLock:
+            self._dicEntries[_sRelPath] = _xEntry
+            self._AddPending(_sRelPath, _xEntry)
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def Remove(self, _sRelPath: str):
+        with self._xLock:
+            if self._dicEntries.pop(_sRelPath, None) is not None:
+                self._AddPending(_sRelPath, None)
+            # endif
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Expects that the lock is held by the caller
+    def _AddPending(self, _sRelPath: str, _xEntry: Optional[CThumbnailIndexEntry]):
+        if self._xDb is None:
+            return
+        # endif
+
+        self._dicPending[_sRelPath] = _xEntry
+        if self._xWriteTimer is None:
+            self._xWriteTimer = threading.Timer(CThumbnailIndex.fWriteInterval, self.Flush)
+            self._xWriteTimer.daemon = True
+            self._xWriteTimer.start()
+        # endif
+
+    # enddef
+
+    # #########################################################################
+    def _TakePending(self) -> dict[str, Optional[CThumbnailIndexEntry]]:
+        with self._xLock:
+            if self._xWriteTimer is not None:
+                self._xWriteTimer.cancel()
+                self._xWriteTimer = None
+            # endif
+            dicPending: dict[str, Optional[CThumbnailIndexEntry]] = self._dicPending
+            self._dicPending = dict()
+        # endwith
+        return dicPending
+
+    # enddef
+
+    # #########################################################################
+    # Submits the pending updates to the writer thread
+    def Flush(self) -> concurrent.futures.Future:
+        return CThumbnailIndex._xWriter.submit(self._Write, self._TakePending())
+
+    # enddef
+
+    # #########################################################################
+    def _Write(self, _dicPending: dict[str, Optional[CThumbnailIndexEntry]]):
+        if len(_dicPending) == 0:
+            return
+        # endif
+
+        lSet: list[tuple] = [
+            (sRelPath, xEntry.sFilename, xEntry.iSrcTime, xEntry.iSrcSize, xEntry.iWidth, xEntry.iHeight)
+            for sRelPath, xEntry in _dicPending.items()
+            if xEntry is not None
+        ]
+        lRemove: list[tuple] = [(sRelPath,) for sRelPath, xEntry in _dicPending.items() if xEntry is None]
+        try:
+            with self._xDb:
+                self._xDb.executemany("INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?, ?, ?, ?)", lSet)
+                self._xDb.executemany("DELETE FROM thumbnails WHERE rel_path = ?", lRemove)
+            # endwith
+        except sqlite3.Error as xEx:
+            print(f"WARNING: Error updating thumbnail index '{(self._pathDb.as_posix())}':\n{xEx}")
+        # endtry
+
+    # enddef
+
+
+# endclass
+
+
+atexit.register(CThumbnailIndex.FlushAll)
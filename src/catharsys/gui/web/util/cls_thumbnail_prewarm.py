@@ -0,0 +1,174 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import threading
+import functools
+import concurrent.futures
+from pathlib import Path
+from typing import Callable
+
+from .cls_thumbnails import CThumbnails
+
+
+# Fills the thumbnail cache for a list of images in the background.
+# The thumbnails are created by the niced background worker processes of CThumbnails.
+# At most 'iMaxQueueSize' thumbnails are queued at a time, so that the interactive
+# thumbnail requests of the product views are not delayed by a long queue.
+class CThumbnailPreWarm:
+    def __init__(self, _xThumbnails: CThumbnails, *, _iMaxQueueSize: int = 8):
+        self._xThumbnails: CThumbnails = _xThumbnails
+        self._iMaxQueueSize: int = _iMaxQueueSize
+
+        self._xThread: threading.Thread = None
+        self._evStop: threading.Event = threading.Event()
+        self._xLock: threading.Lock = threading.Lock()
+        self._iTotal: int = 0
+        self._iDone: int = 0
+        self._iErrors: int = 0
+        self._bCollecting: bool = False
+        # Id of the current run, so that thumbnails of a stopped run do not count for the next one
+        self._iRunId: int = 0
+        self._setFutures: set[concurrent.futures.Future] = set()
+
+    # enddef
+
+    @property
+    def bIsRunning(self) -> bool:
+        return self._xThread is not None and (self._bCollecting or self._iDone < self._iTotal)
+
+    # enddef
+
+    @property
+    def bIsCollecting(self) -> bool:
+        return self._bCollecting
+
+    # enddef
+
+    @property
+    def iTotal(self) -> int:
+        return self._iTotal
+
+    # enddef
+
+    @property
+    def iDone(self) -> int:
+        return self._iDone
+
+    # enddef
+
+    @property
+    def iErrors(self) -> int:
+        return self._iErrors
+
+    # enddef
+
+    # #########################################################################
+    # The image paths are collected by '_funcGetImagePaths' in the pre-warm thread,
+    # as walking a large scan can take a while.
+    def Start(self, _funcGetImagePaths: Callable[[], list[Path]]):
+        self.Stop()
+
+        self._evStop.clear()
+        self._iRunId += 1
+        self._iTotal = 0
+        self._iDone = 0
+        self._iErrors = 0
+        self._bCollecting = True
+        self._xThread = threading.Thread(target=self._Run, args=(_funcGetImagePaths,), daemon=True)
+        self._xThread.start()
+
+    # enddef
+
+    # #########################################################################
+    def Stop(self):
+        if self._xThread is not None:
+            self._evStop.set()
+            self._xThread.join()
+            self._xThread = None
+        # endif
+        self._bCollecting = False
+
+        # Thumbnails that have not been started yet and that no product view waits for are cancelled
+        with self._xLock:
+            lFutures = list(self._setFutures)
+            self._setFutures.clear()
+        # endwith
+        CThumbnails.CancelBackground(lFutures)
+
+    # enddef
+
+    # #########################################################################
+    def _OnThumbnailDone(
+        self, _iRunId: int, _semQueue: threading.BoundedSemaphore, _xFuture: concurrent.futures.Future
+    ):
+        _semQueue.release()
+        with self._xLock:
+            self._setFutures.discard(_xFuture)
+            if _iRunId != self._iRunId or _xFuture.cancelled():
+                return
+            # endif
+            self._iDone += 1
+            if _xFuture.exception() is not None:
+                self._iErrors += 1
+            # endif
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    def _Run(self, _funcGetImagePaths: Callable[[], list[Path]]):
+        iRunId: int = self._iRunId
+        lPathImages: list[Path] = []
+        try:
+            lPathImages = _funcGetImagePaths()
+        except Exception as xEx:
+            print(f"WARNING: Error collecting images for thumbnail pre-warming:\n{xEx}")
+        # endtry
+
+        # The total has to be set before collecting ends, so that the run is not seen as finished in between
+        self._iTotal = len(lPathImages)
+        self._bCollecting = False
+        semQueue = threading.BoundedSemaphore(self._iMaxQueueSize)
+
+        for pathImage in lPathImages:
+            while not semQueue.acquire(timeout=0.2):
+                if self._evStop.is_set():
+                    return
+                # endif
+            # endwhile
+
+            if self._evStop.is_set():
+                semQueue.release()
+                return
+            # endif
+
+            xFuture = self._xThumbnails.ProvideThumbnailUrls([pathImage], _bBackground=True)[0]
+            with self._xLock:
+                self._setFutures.add(xFuture)
+            # endwith
+            xFuture.add_done_callback(functools.partial(self._OnThumbnailDone, iRunId, semQueue))
+        # endfor
+
+    # enddef
+
+
+# endclass
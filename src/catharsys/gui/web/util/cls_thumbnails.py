@@ -24,17 +24,131 @@ import os
 import base64
 import hashlib
 import shutil
+import mimetypes
+import threading
+import functools
+import multiprocessing
+import concurrent.futures
 import numpy as np
-from typing import Union
+from typing import Union, Optional
 from pathlib import Path
+from collections import OrderedDict
+from nicegui import app
+from fastapi.responses import Response
 import catharsys.plugins.std.util.imgproc as imgproc
 
+from .cls_thumbnail_index import CThumbnailIndex, CThumbnailIndexEntry
+from .cls_byte_cache import CByteCache
+
 # need to enable OpenExr explicitly
 os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
 import cv2
 
 
+# #########################################################################
+# This function needs to be defined on module level, so that it can be
+# executed in the worker processes of the shared thumbnail process pool.
+# The image is decoded once and all given thumbnail levels are derived from it,
+# starting with the largest level. Each level is encoded in memory and only written
+# to a file if a thumbnail path is given. Returns tuples of the form
+# (target width, thumbnail path, width, height, encoded image).
+def _CreateThumbnails(
+    _pathImage: Path,
+    _lLevels: list[tuple[int, Optional[Path]]],
+    _iTrgHeight: int,
+    _bNormalizeExr: bool,
+    _sFileTypeExt: str,
+) -> list[tuple[int, Optional[Path], int, int, bytes]]:
+    sExt: str = _pathImage.suffix
+    aImage: np.ndarray = None
+
+    if sExt == ".exr":
+        aImage = imgproc.LoadImageExr(sFpImage=_pathImage.as_posix(), bAsUint=True, bNormalize=_bNormalizeExr)
+    else:
+        aImage = cv2.imread(_pathImage.as_posix())
+    # endif
+
+    lResults: list[tuple[int, Optional[Path], int, int, bytes]] = []
+    aLevel: np.ndarray = aImage
+    for iTrgWidth, pathThumbFile in sorted(_lLevels, key=lambda x: x[0], reverse=True):
+        iW, iH = imgproc.UpdateWidthHeight(iTrgWidth, _iTrgHeight, aImage)
+        aLevel = cv2.resize(aLevel, (iW, iH), interpolation=cv2.INTER_AREA)
+        bOk, aData = cv2.imencode(f".{_sFileTypeExt}", aLevel)
+        if not bOk:
+            raise RuntimeError(f"Error encoding thumbnail of image: {(_pathImage.as_posix())}")
+        # endif
+        xData: bytes = aData.tobytes()
+        if pathThumbFile is not None:
+            pathThumbFile.write_bytes(xData)
+        # endif
+        lResults.append((iTrgWidth, pathThumbFile, iW, iH, xData))
+    # endfor
+
+    return lResults
+
+
+# enddef
+
+
+# #########################################################################
+# Initializer of the background worker processes, which run with a lower priority
+# than the web server and the interactive thumbnail workers.
+def _InitBackgroundWorker(_iNice: int):
+    try:
+        os.nice(_iNice)
+    except (AttributeError, OSError):
+        pass
+    # endtry
+
+
+# enddef
+
+
 class CThumbnails:
+    # Process pool shared by all thumbnail instances, i.e. by all product views
+    # of a server process. It is created on first use.
+    _xProcessPool: concurrent.futures.ProcessPoolExecutor = None
+    _xProcessPoolLock: threading.RLock = threading.RLock()
+    _dicPendingFutures: dict[str, concurrent.futures.Future] = dict()
+    # Submissions to the background pool by the future of their target level, as tuples of the form
+    # (pool future, level futures). Level futures that have also been returned to other requests
+    # are collected in '_setJoinedFutures', as their submissions must not be cancelled.
+    _dicBackgroundSubmissions: dict[
+        concurrent.futures.Future, tuple[concurrent.futures.Future, list[concurrent.futures.Future]]
+    ] = dict()
+    _setJoinedFutures: set[concurrent.futures.Future] = set()
+    iMaxWorkers: Optional[int] = None
+    # The worker processes are started fresh instead of being forked from the server process,
+    # which runs the threads of the web server, the index writers and the scan watchers.
+    sStartMethod: str = "spawn"
+
+    # Separate pool of niced worker processes for creating thumbnails in the background
+    _xBackgroundPool: concurrent.futures.ProcessPoolExecutor = None
+    iBackgroundWorkers: int = 1
+    iBackgroundNice: int = 10
+
+    # Image types thumbnails can be created for
+    lImageSuffixes: list[str] = [".png", ".jpg", ".exr"]
+
+    # Thumbnail widths that are created together from a single decode of the source image
+    lPyramidWidths: list[int] = [32, 64, 128, 256, 512]
+
+    # The encoded thumbnails are served from memory via the thumbnail route.
+    # The thumbnail files on disk are an optional second tier, which persists
+    # the thumbnails between server runs. Only the requested level of the pyramid
+    # is written to disk, the other levels are only kept in memory.
+    xByteCache: CByteCache = CByteCache(_iMaxBytes=256 * 1024 * 1024)
+    bDiskCache: bool = True
+    sUrlPrefix: str = "/thumb"
+    bIsRegistered: bool = False
+
+    # Sources of the thumbnail URLs that have been handed out, needed to load or create
+    # thumbnails that are no longer in memory. The least recently used sources are removed.
+    # Their URLs then return 404 until they are requested again by a view.
+    iMaxThumbSources: int = 100000
+    _dicThumbSources: OrderedDict[str, tuple["CThumbnails", Path, int]] = OrderedDict()
+    _xThumbSourcesLock: threading.Lock = threading.Lock()
+
     def __init__(
         self,
         *,
@@ -44,6 +158,8 @@ class CThumbnails:
         _iTrgHeight: int = 0,
         _sFileTypeExt: str = "jpg",
         _bNormalizeExr: bool = True,
+        _lPyramidWidths: Optional[list[int]] = None,
+        _bDiskCache: Optional[bool] = None,
     ):
         self._pathThumbnails: Path = _pathThumbnails
         self._pathMain: Path = _pathMain
@@ -51,6 +167,13 @@ class CThumbnails:
         self._iTrgHeight: int = _iTrgHeight
         self._sFileTypeExt: str = _sFileTypeExt
         self._bNormalizeExr: bool = _bNormalizeExr
+        self._lPyramidWidths: list[int] = (
+            list(CThumbnails.lPyramidWidths) if _lPyramidWidths is None else list(_lPyramidWidths)
+        )
+        self._bDiskCache: bool = CThumbnails.bDiskCache if _bDiskCache is None else _bDiskCache
+
+        # Identifies the thumbnails of this thumbnail folder in the thumbnail URLs
+        self._sServeId: str = hashlib.md5(_pathThumbnails.as_posix().encode("utf8")).hexdigest()[0:16]
 
     # enddef
 
@@ -78,6 +201,43 @@ class CThumbnails:
 
     # enddef
 
+    # #########################################################################
+    # Registers the route the thumbnails are served from. This has to be called
+    # once by the app before the server is started.
+    @classmethod
+    def Register(cls):
+        if cls.bIsRegistered is True:
+            return
+        # endif
+        cls.bIsRegistered = True
+
+        # The route is a plain function, so that FastAPI runs it in its thread pool
+        # and reading or creating a thumbnail does not block the event loop.
+        @app.get(cls.sUrlPrefix + "/{group}/{hash}")
+        def thumbnail(group: str, hash: str) -> Response:
+            try:
+                xData: Optional[bytes] = cls._GetThumbnailBytes(group, hash)
+            except Exception as xEx:
+                print(f"WARNING: Error providing thumbnail '{group}/{hash}':\n{xEx}")
+                xData = None
+            # endtry
+
+            if xData is None:
+                return Response(status_code=404)
+            # endif
+
+            # The thumbnail names contain the modification time of the source image,
+            # so a thumbnail URL always refers to the same image.
+            return Response(
+                content=xData,
+                media_type=mimetypes.guess_type(hash)[0] or "application/octet-stream",
+                headers={"Cache-Control": "public, max-age=31536000, immutable"},
+            )
+
+        # enddef
+
+    # enddef
+
     # #########################################################################
     def GetRelativePath(self, _pathImage: Path) -> Path:
         return _pathImage.relative_to(self._pathMain)
@@ -85,20 +245,28 @@ class CThumbnails:
     # enddef
 
     # #########################################################################
-    def GetThumbnailNames(self, _pathImage: Path) -> tuple[str, str]:
-        if _pathImage.exists():
-            iTimeImage: int = int(os.path.getmtime(_pathImage.as_posix()))
-        else:
-            iTimeImage = 0
-        # endif
-
+    def _GetImageId(self, _pathImage: Path) -> str:
         pathRel: Path
         try:
             pathRel = self.GetRelativePath(_pathImage)
         except Exception:
             pathRel = _pathImage
         # endtry
-        sId: str = pathRel.as_posix()
+        return pathRel.as_posix()
+
+    # enddef
+
+    # #########################################################################
+    def GetThumbnailNames(self, _pathImage: Path, *, _iTimeImage: Optional[int] = None) -> tuple[str, str]:
+        if _iTimeImage is not None:
+            iTimeImage: int = _iTimeImage
+        elif _pathImage.exists():
+            iTimeImage = int(os.path.getmtime(_pathImage.as_posix()))
+        else:
+            iTimeImage = 0
+        # endif
+
+        sId: str = self._GetImageId(_pathImage)
         hashMD5 = hashlib.md5(sId.encode("utf8"))
         sName = base64.b32encode(hashMD5.digest()).decode()
         sFilename = f"{sName}-{iTimeImage}.{self._sFileTypeExt}"
@@ -107,43 +275,185 @@ class CThumbnails:
     # enddef
 
     # #########################################################################
-    def GetThumbnailPath(self):
-        return self._pathThumbnails / f"{self._iTrgWidth}x{self._iTrgHeight}"
+    def GetThumbnailPath(self, *, _iWidth: Optional[int] = None):
+        iWidth: int = self._iTrgWidth if _iWidth is None else _iWidth
+        return self._pathThumbnails / f"{iWidth}x{self._iTrgHeight}"
+
+    # enddef
+
+    # #########################################################################
+    # The cache key of a thumbnail is also the part of its URL after the URL prefix
+    def _GetCacheKey(self, _sThumbFile: str, *, _iWidth: Optional[int] = None) -> str:
+        iWidth: int = self._iTrgWidth if _iWidth is None else _iWidth
+        return f"{self._sServeId}/{iWidth}x{self._iTrgHeight}-{_sThumbFile}"
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def GetThumbnailUrl(cls, _sCacheKey: str) -> str:
+        return f"{cls.sUrlPrefix}/{_sCacheKey}"
+
+    # enddef
+
+    # #########################################################################
+    def _GetLevelWidths(self, *, _iWidth: Optional[int] = None) -> list[int]:
+        iWidth: int = self._iTrgWidth if _iWidth is None else _iWidth
+        # The pyramid is only used for thumbnails that are defined by their width alone
+        if self._iTrgHeight == 0 and iWidth in self._lPyramidWidths:
+            return list(self._lPyramidWidths)
+        # endif
+        return [iWidth]
 
     # enddef
 
     # #########################################################################
-    def CreateThumbnail(self, _pathImage: Path) -> Path:
-        if not _pathImage.exists():
+    def _GetImageStat(self, _pathImage: Path) -> os.stat_result:
+        try:
+            return _pathImage.stat()
+        except FileNotFoundError:
             raise RuntimeError(f"File does not exist: {(_pathImage.as_posix())}")
+        # endtry
+
+    # enddef
+
+    # #########################################################################
+    def _ProvideIndex(self, *, _iWidth: Optional[int] = None) -> CThumbnailIndex:
+        return CThumbnailIndex.Provide(self.GetThumbnailPath(_iWidth=_iWidth))
+
+    # enddef
+
+    # #########################################################################
+    def _LookupThumbnail(
+        self, _pathImage: Path, _xStat: os.stat_result, *, _iWidth: Optional[int] = None
+    ) -> Optional[Path]:
+        pathThumb: Path = self.GetThumbnailPath(_iWidth=_iWidth)
+        xIndex: CThumbnailIndex = self._ProvideIndex(_iWidth=_iWidth)
+        sImageId: str = self._GetImageId(_pathImage)
+        iTimeImage: int = int(_xStat.st_mtime)
+
+        xEntry: CThumbnailIndexEntry = xIndex.Get(sImageId)
+        if xEntry is not None:
+            if xEntry.iSrcTime == iTimeImage and xEntry.iSrcSize == _xStat.st_size:
+                return pathThumb / xEntry.sFilename
+            # endif
+
+            # The source image has changed, so remove the outdated thumbnail
+            (pathThumb / xEntry.sFilename).unlink(missing_ok=True)
+            xIndex.Remove(sImageId)
+            return None
         # endif
 
-        pathThumb: Path = self.GetThumbnailPath()
-        pathThumb.mkdir(parents=True, exist_ok=True)
-        sThumbFile, sThumbName = self.GetThumbnailNames(_pathImage)
+        # Adopt thumbnails that have been created before the index existed
+        sThumbFile, sThumbName = self.GetThumbnailNames(_pathImage, _iTimeImage=iTimeImage)
         pathThumbFile = pathThumb / sThumbFile
+        if pathThumbFile.exists():
+            xIndex.Set(
+                sImageId, CThumbnailIndexEntry(sFilename=sThumbFile, iSrcTime=iTimeImage, iSrcSize=_xStat.st_size)
+            )
+            return pathThumbFile
+        # endif
 
-        sExt: str = _pathImage.suffix
-        aImage: np.ndarray = None
+        return None
 
-        if sExt == ".exr":
-            aImage = imgproc.LoadImageExr(sFpImage=_pathImage.as_posix(), bAsUint=True, bNormalize=self._bNormalizeExr)
-        else:
-            aImage = cv2.imread(_pathImage.as_posix())
+    # enddef
+
+    # #########################################################################
+    # Tests whether a thumbnail level is available in memory or, if enabled, on disk
+    def _IsLevelAvailable(self, _pathImage: Path, _xStat: os.stat_result, _sCacheKey: str, *, _iWidth: int) -> bool:
+        if _sCacheKey in CThumbnails.xByteCache:
+            return True
         # endif
+        return self._bDiskCache and self._LookupThumbnail(_pathImage, _xStat, _iWidth=_iWidth) is not None
+
+    # enddef
+
+    # #########################################################################
+    # Returns the thumbnail levels that still need to be created as tuples of the form
+    # (width, cache key, thumbnail file, index). The thumbnail file and index are only set
+    # for the target level and only if the disk cache is enabled. The target level is always included.
+    def _GetMissingLevels(
+        self, _pathImage: Path, _xStat: os.stat_result, *, _iWidth: Optional[int] = None
+    ) -> list[tuple[int, str, Optional[Path], Optional[CThumbnailIndex]]]:
+        iTrgWidth: int = self._iTrgWidth if _iWidth is None else _iWidth
+        sThumbFile, sThumbName = self.GetThumbnailNames(_pathImage, _iTimeImage=int(_xStat.st_mtime))
+
+        lLevels: list[tuple[int, str, Optional[Path], Optional[CThumbnailIndex]]] = []
+        for iWidth in self._GetLevelWidths(_iWidth=iTrgWidth):
+            sCacheKey: str = self._GetCacheKey(sThumbFile, _iWidth=iWidth)
+            if iWidth != iTrgWidth and self._IsLevelAvailable(_pathImage, _xStat, sCacheKey, _iWidth=iWidth):
+                continue
+            # endif
 
-        iW, iH = imgproc.UpdateWidthHeight(self._iTrgWidth, self._iTrgHeight, aImage)
-        aImage = cv2.resize(aImage, (iW, iH), interpolation=cv2.INTER_AREA)
+            pathThumbFile: Optional[Path] = None
+            xIndex: Optional[CThumbnailIndex] = None
+            if self._bDiskCache and iWidth == iTrgWidth:
+                xIndex = self._ProvideIndex(_iWidth=iWidth)
+                pathThumbFile = self.GetThumbnailPath(_iWidth=iWidth) / sThumbFile
+            # endif
+            lLevels.append((iWidth, sCacheKey, pathThumbFile, xIndex))
+        # endfor
 
-        cv2.imwrite(pathThumbFile.as_posix(), aImage)
+        return lLevels
 
-        return pathThumbFile
+    # enddef
+
+    # #########################################################################
+    @staticmethod
+    def _CreateIndexEntry(_pathThumbFile: Path, _xStat: os.stat_result, _iW: int, _iH: int) -> CThumbnailIndexEntry:
+        return CThumbnailIndexEntry(
+            sFilename=_pathThumbFile.name,
+            iSrcTime=int(_xStat.st_mtime),
+            iSrcSize=_xStat.st_size,
+            iWidth=_iW,
+            iHeight=_iH,
+        )
+
+    # enddef
+
+    # #########################################################################
+    # Creates the thumbnail synchronously. Returns the path of the thumbnail file,
+    # or None if the disk cache is disabled.
+    def CreateThumbnail(self, _pathImage: Path, *, _xStat: Optional[os.stat_result] = None) -> Optional[Path]:
+        xStat: os.stat_result = self._GetImageStat(_pathImage) if _xStat is None else _xStat
+        sImageId: str = self._GetImageId(_pathImage)
+
+        lLevels = self._GetMissingLevels(_pathImage, xStat)
+        dicLevels: dict[int, tuple[str, Optional[CThumbnailIndex]]] = {
+            iWidth: (sCacheKey, xIndex) for iWidth, sCacheKey, _, xIndex in lLevels
+        }
+
+        pathTrgThumbFile: Optional[Path] = None
+        lResults = _CreateThumbnails(
+            _pathImage,
+            [(iWidth, pathFile) for iWidth, _, pathFile, _ in lLevels],
+            self._iTrgHeight,
+            self._bNormalizeExr,
+            self._sFileTypeExt,
+        )
+        for iWidth, pathThumbFile, iW, iH, xData in lResults:
+            sCacheKey, xIndex = dicLevels[iWidth]
+            CThumbnails.xByteCache.Put(sCacheKey, xData)
+            if pathThumbFile is not None:
+                xIndex.Set(sImageId, self._CreateIndexEntry(pathThumbFile, xStat, iW, iH))
+            # endif
+            if iWidth == self._iTrgWidth:
+                pathTrgThumbFile = pathThumbFile
+            # endif
+        # endfor
+
+        return pathTrgThumbFile
 
     # enddef
 
     # #########################################################################
     def ProvideThumbnailPath(
-        self, _pathImage: Union[str, Path], *, _bCreateOnDemand: bool = True, _bReturnString: bool = False
+        self,
+        _pathImage: Union[str, Path],
+        *,
+        _bCreateOnDemand: bool = True,
+        _bReturnString: bool = False,
+        _xStat: Optional[os.stat_result] = None,
     ) -> Union[Path, str]:
         if isinstance(_pathImage, str):
             pathImage = Path(_pathImage)
@@ -151,33 +461,337 @@ class CThumbnails:
             pathImage = _pathImage
         # endif
 
-        if not pathImage.exists():
-            raise RuntimeError(f"File does not exist: {(pathImage.as_posix())}")
-        # endif
-        pathThumbFile: Path = None
-        pathThumb = self.GetThumbnailPath()
-        if pathThumb.exists():
-            sThumbFile, sThumbName = self.GetThumbnailNames(pathImage)
-            pathThumbFile = pathThumb / sThumbFile
-            if not pathThumbFile.exists():
-                for pathFile in pathThumb.glob(f"{sThumbName}*.{self._sFileTypeExt}"):
-                    pathFile.unlink()
-                # endfor
-                pathThumbFile = None
-                if _bCreateOnDemand:
-                    pathThumbFile = self.CreateThumbnail(pathImage)
-                # endif
-            # endif
-        elif _bCreateOnDemand:
-            pathThumbFile = self.CreateThumbnail(pathImage)
+        # If the caller already knows the file status, no file system access is needed
+        # for images whose thumbnail is available.
+        xStat: os.stat_result = self._GetImageStat(pathImage) if _xStat is None else _xStat
+
+        pathThumbFile: Path = self._LookupThumbnail(pathImage, xStat)
+        if pathThumbFile is None and _bCreateOnDemand:
+            pathThumbFile = self.CreateThumbnail(pathImage, _xStat=xStat)
         # endif
 
-        if _bReturnString:
+        if _bReturnString and pathThumbFile is not None:
             return pathThumbFile.as_posix()
         # endif
         return pathThumbFile
 
     # enddef
 
+    # #########################################################################
+    # Returns the URL the thumbnail is served from, if the thumbnail is available.
+    # Otherwise, None is returned or, if '_bCreateOnDemand' is True, the thumbnail is created.
+    def ProvideThumbnailUrl(
+        self,
+        _pathImage: Union[str, Path],
+        *,
+        _bCreateOnDemand: bool = False,
+        _xStat: Optional[os.stat_result] = None,
+    ) -> Optional[str]:
+        pathImage = Path(_pathImage) if isinstance(_pathImage, str) else _pathImage
+        xStat: os.stat_result = self._GetImageStat(pathImage) if _xStat is None else _xStat
+
+        sThumbFile, sThumbName = self.GetThumbnailNames(pathImage, _iTimeImage=int(xStat.st_mtime))
+        sCacheKey: str = self._GetCacheKey(sThumbFile)
+        with CThumbnails._xThumbSourcesLock:
+            CThumbnails._dicThumbSources[sCacheKey] = (self, pathImage, self._iTrgWidth)
+            CThumbnails._dicThumbSources.move_to_end(sCacheKey)
+            while len(CThumbnails._dicThumbSources) > CThumbnails.iMaxThumbSources:
+                CThumbnails._dicThumbSources.popitem(last=False)
+            # endwhile
+        # endwith
+
+        if self._IsLevelAvailable(pathImage, xStat, sCacheKey, _iWidth=self._iTrgWidth):
+            return CThumbnails.GetThumbnailUrl(sCacheKey)
+        # endif
+
+        if _bCreateOnDemand:
+            return self._SubmitThumbnail(pathImage, xStat).result()
+        # endif
+
+        return None
+
+    # enddef
+
+    # #########################################################################
+    # Returns the encoded thumbnail for the given thumbnail URL parts.
+    # Thumbnails that are not in memory are loaded from disk or created.
+    @classmethod
+    def _GetThumbnailBytes(cls, _sServeId: str, _sKey: str) -> Optional[bytes]:
+        sCacheKey: str = f"{_sServeId}/{_sKey}"
+        xData: Optional[bytes] = cls.xByteCache.Get(sCacheKey)
+        if xData is not None:
+            return xData
+        # endif
+
+        # Only thumbnails whose URLs have been handed out can be provided
+        with cls._xThumbSourcesLock:
+            tSource = cls._dicThumbSources.get(sCacheKey)
+            if tSource is None:
+                return None
+            # endif
+            cls._dicThumbSources.move_to_end(sCacheKey)
+        # endwith
+
+        xThumbnails, pathImage, iWidth = tSource
+        return xThumbnails._LoadThumbnailBytes(pathImage, sCacheKey, _iWidth=iWidth)
+
+    # enddef
+
+    # #########################################################################
+    def _LoadThumbnailBytes(self, _pathImage: Path, _sCacheKey: str, *, _iWidth: int) -> Optional[bytes]:
+        xStat: os.stat_result = self._GetImageStat(_pathImage)
+        sThumbFile, sThumbName = self.GetThumbnailNames(_pathImage, _iTimeImage=int(xStat.st_mtime))
+        if self._GetCacheKey(sThumbFile, _iWidth=_iWidth) != _sCacheKey:
+            # The source image has changed since the URL has been handed out
+            return None
+        # endif
+
+        if self._bDiskCache:
+            pathThumbFile: Optional[Path] = self._LookupThumbnail(_pathImage, xStat, _iWidth=_iWidth)
+            if pathThumbFile is not None:
+                try:
+                    xData: bytes = pathThumbFile.read_bytes()
+                    CThumbnails.xByteCache.Put(_sCacheKey, xData)
+                    return xData
+                except OSError:
+                    # The thumbnail file has been deleted since it has been indexed,
+                    # so it is created again below.
+                    self._ProvideIndex(_iWidth=_iWidth).Remove(self._GetImageId(_pathImage))
+                # endtry
+            # endif
+        # endif
+
+        # The thumbnail has been evicted from memory and is not available on disk
+        self._SubmitThumbnail(_pathImage, xStat, _iWidth=_iWidth).result()
+        return CThumbnails.xByteCache.Get(_sCacheKey)
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def _ProvideProcessPool(cls, *, _bBackground: bool = False) -> concurrent.futures.ProcessPoolExecutor:
+        # Expects that the process pool lock is held by the caller
+        if _bBackground is True:
+            if cls._xBackgroundPool is None:
+                cls._xBackgroundPool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=cls.iBackgroundWorkers,
+                    mp_context=multiprocessing.get_context(cls.sStartMethod),
+                    initializer=_InitBackgroundWorker,
+                    initargs=(cls.iBackgroundNice,),
+                )
+            # endif
+            return cls._xBackgroundPool
+        # endif
+
+        if cls._xProcessPool is None:
+            cls._xProcessPool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=cls.iMaxWorkers, mp_context=multiprocessing.get_context(cls.sStartMethod)
+            )
+        # endif
+        return cls._xProcessPool
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def ShutdownProcessPool(cls):
+        with cls._xProcessPoolLock:
+            if cls._xProcessPool is not None:
+                cls._xProcessPool.shutdown(wait=False, cancel_futures=True)
+                cls._xProcessPool = None
+            # endif
+            if cls._xBackgroundPool is not None:
+                cls._xBackgroundPool.shutdown(wait=False, cancel_futures=True)
+                cls._xBackgroundPool = None
+            # endif
+            cls._dicPendingFutures.clear()
+            cls._dicBackgroundSubmissions.clear()
+            cls._setJoinedFutures.clear()
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    @classmethod
+    def _OnThumbnailsCreated(
+        cls,
+        _sImageId: str,
+        _xStat: os.stat_result,
+        _dicLevels: dict[int, tuple[str, Optional[CThumbnailIndex], concurrent.futures.Future]],
+        _xPoolFuture: concurrent.futures.Future,
+    ):
+        with cls._xProcessPoolLock:
+            for sCacheKey, _, xFuture in _dicLevels.values():
+                if cls._dicPendingFutures.get(sCacheKey) is xFuture:
+                    del cls._dicPendingFutures[sCacheKey]
+                # endif
+                cls._dicBackgroundSubmissions.pop(xFuture, None)
+                cls._setJoinedFutures.discard(xFuture)
+            # endfor
+        # endwith
+
+        if _xPoolFuture.cancelled():
+            # Only submissions whose level futures have not been returned to any other request
+            # are cancelled, see 'CancelBackground'.
+            for sCacheKey, xIndex, xFuture in _dicLevels.values():
+                xFuture.cancel()
+            # endfor
+            return
+        # endif
+
+        try:
+            for iWidth, pathThumbFile, iW, iH, xData in _xPoolFuture.result():
+                sCacheKey, xIndex, xFuture = _dicLevels[iWidth]
+                cls.xByteCache.Put(sCacheKey, xData)
+                if pathThumbFile is not None:
+                    xIndex.Set(_sImageId, cls._CreateIndexEntry(pathThumbFile, _xStat, iW, iH))
+                # endif
+                xFuture.set_result(cls.GetThumbnailUrl(sCacheKey))
+            # endfor
+        except Exception as xEx:
+            for sCacheKey, xIndex, xFuture in _dicLevels.values():
+                if not xFuture.done():
+                    xFuture.set_exception(xEx)
+                # endif
+            # endfor
+        # endtry
+
+    # enddef
+
+    # #########################################################################
+    def _SubmitThumbnail(
+        self,
+        _pathImage: Path,
+        _xStat: os.stat_result,
+        *,
+        _iWidth: Optional[int] = None,
+        _bBackground: bool = False,
+    ) -> concurrent.futures.Future:
+        iTrgWidth: int = self._iTrgWidth if _iWidth is None else _iWidth
+        lLevels = self._GetMissingLevels(_pathImage, _xStat, _iWidth=iTrgWidth)
+        sTrgCacheKey: str = next(sCacheKey for iWidth, sCacheKey, _, _ in lLevels if iWidth == iTrgWidth)
+
+        with CThumbnails._xProcessPoolLock:
+            # If another view already requested the same thumbnail, share its future
+            xFuture: concurrent.futures.Future = CThumbnails._dicPendingFutures.get(sTrgCacheKey)
+            if xFuture is not None:
+                CThumbnails._setJoinedFutures.add(xFuture)
+                return xFuture
+            # endif
+
+            # Levels that are already being created for another view are not created twice
+            lLevels = [x for x in lLevels if x[1] not in CThumbnails._dicPendingFutures]
+
+            tArgs = (
+                _pathImage,
+                [(iWidth, pathFile) for iWidth, _, pathFile, _ in lLevels],
+                self._iTrgHeight,
+                self._bNormalizeExr,
+                self._sFileTypeExt,
+            )
+            try:
+                xPoolFuture = CThumbnails._ProvideProcessPool(_bBackground=_bBackground).submit(
+                    _CreateThumbnails, *tArgs
+                )
+            except concurrent.futures.process.BrokenProcessPool:
+                # A worker process died, e.g. while decoding a corrupt image.
+                # Start a new pool and try once more.
+                if _bBackground is True:
+                    CThumbnails._xBackgroundPool = None
+                else:
+                    CThumbnails._xProcessPool = None
+                # endif
+                xPoolFuture = CThumbnails._ProvideProcessPool(_bBackground=_bBackground).submit(
+                    _CreateThumbnails, *tArgs
+                )
+            # endtry
+
+            # The byte cache and the thumbnail indices are only updated in this process, so the pool future
+            # is wrapped by one future per level that completes after its thumbnail has been stored.
+            dicLevels: dict[int, tuple[str, Optional[CThumbnailIndex], concurrent.futures.Future]] = dict()
+            for iWidth, sCacheKey, _, xIndex in lLevels:
+                xLevelFuture = concurrent.futures.Future()
+                CThumbnails._dicPendingFutures[sCacheKey] = xLevelFuture
+                dicLevels[iWidth] = (sCacheKey, xIndex, xLevelFuture)
+            # endfor
+
+            xPoolFuture.add_done_callback(
+                functools.partial(CThumbnails._OnThumbnailsCreated, self._GetImageId(_pathImage), _xStat, dicLevels)
+            )
+            xFuture = dicLevels[iTrgWidth][2]
+            if _bBackground is True:
+                CThumbnails._dicBackgroundSubmissions[xFuture] = (
+                    xPoolFuture,
+                    [xLevelFuture for _, _, xLevelFuture in dicLevels.values()],
+                )
+            # endif
+        # endwith
+
+        return xFuture
+
+    # enddef
+
+    # #########################################################################
+    # Cancels the background submissions of the given target level futures, as returned by
+    # 'ProvideThumbnailUrls', if they have not been started yet. Submissions whose level futures
+    # have also been returned to other requests are not cancelled, so that these requests
+    # still get their thumbnails.
+    @classmethod
+    def CancelBackground(cls, _lFutures: list[concurrent.futures.Future]):
+        with cls._xProcessPoolLock:
+            for xFuture in _lFutures:
+                tSubmission = cls._dicBackgroundSubmissions.get(xFuture)
+                if tSubmission is None:
+                    continue
+                # endif
+
+                xPoolFuture, lLevelFutures = tSubmission
+                if any(xLevelFuture in cls._setJoinedFutures for xLevelFuture in lLevelFutures):
+                    continue
+                # endif
+                xPoolFuture.cancel()
+            # endfor
+        # endwith
+
+    # enddef
+
+    # #########################################################################
+    # Returns one future per image, in the same order as the given images.
+    # The result of each future is the thumbnail URL. Available thumbnails are
+    # returned as completed futures, all others are created in parallel
+    # in the shared process pool, or in the niced background pool if '_bBackground' is True.
+    # If the file status of the images is already known, it can be passed in '_lStats',
+    # in the same order as the images. Only images with a status of None are queried.
+    def ProvideThumbnailUrls(
+        self,
+        _lPathImages: list[Union[str, Path]],
+        *,
+        _bBackground: bool = False,
+        _lStats: Optional[list[Optional[os.stat_result]]] = None,
+    ) -> list[concurrent.futures.Future]:
+        lStats: list[Optional[os.stat_result]] = [None] * len(_lPathImages) if _lStats is None else _lStats
+        lFutures: list[concurrent.futures.Future] = []
+        for xPathImage, xKnownStat in zip(_lPathImages, lStats):
+            pathImage = Path(xPathImage) if isinstance(xPathImage, str) else xPathImage
+            try:
+                xStat: os.stat_result = self._GetImageStat(pathImage) if xKnownStat is None else xKnownStat
+                sThumbUrl: Optional[str] = self.ProvideThumbnailUrl(pathImage, _xStat=xStat)
+                if sThumbUrl is None:
+                    xFuture = self._SubmitThumbnail(pathImage, xStat, _bBackground=_bBackground)
+                else:
+                    xFuture = concurrent.futures.Future()
+                    xFuture.set_result(sThumbUrl)
+                # endif
+            except Exception as xEx:
+                xFuture = concurrent.futures.Future()
+                xFuture.set_exception(xEx)
+            # endtry
+            lFutures.append(xFuture)
+        # endfor
+
+        return lFutures
+
+    # enddef
+
 
 # endclass
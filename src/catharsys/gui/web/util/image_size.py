@@ -0,0 +1,192 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import os
+import struct
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import BinaryIO, Optional
+
+# need to enable OpenExr explicitly
+os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
+import cv2
+
+# Image sizes by path and modification time
+g_dicImageSizes: OrderedDict[tuple[str, int], tuple[int, int]] = OrderedDict()
+g_iMaxImageSizes: int = 10000
+g_xImageSizesLock: threading.Lock = threading.Lock()
+
+
+# #########################################################################
+def _ReadPngSize(_xFile: BinaryIO) -> Optional[tuple[int, int]]:
+    xData: bytes = _xFile.read(24)
+    if len(xData) < 24 or xData[0:8] != b"\x89PNG\r\n\x1a\n" or xData[12:16] != b"IHDR":
+        return None
+    # endif
+    return struct.unpack(">II", xData[16:24])
+
+
+# enddef
+
+
+# #########################################################################
+# Reads the segments of the JPEG file up to the first start of frame segment
+def _ReadJpegSize(_xFile: BinaryIO) -> Optional[tuple[int, int]]:
+    if _xFile.read(2) != b"\xff\xd8":
+        return None
+    # endif
+
+    while True:
+        xMarker: bytes = _xFile.read(2)
+        if len(xMarker) < 2 or xMarker[0] != 0xFF:
+            return None
+        # endif
+        iMarker: int = xMarker[1]
+        if iMarker == 0xFF:
+            # Fill byte
+            _xFile.seek(-1, os.SEEK_CUR)
+            continue
+        # endif
+        if iMarker == 0x01 or 0xD0 <= iMarker <= 0xD7:
+            # Markers without segment data
+            continue
+        # endif
+
+        xLen: bytes = _xFile.read(2)
+        if len(xLen) < 2:
+            return None
+        # endif
+        iLen: int = struct.unpack(">H", xLen)[0]
+
+        # Start of frame markers, excluding DHT, JPG and DAC
+        if 0xC0 <= iMarker <= 0xCF and iMarker not in (0xC4, 0xC8, 0xCC):
+            xData: bytes = _xFile.read(5)
+            if len(xData) < 5:
+                return None
+            # endif
+            iHeight, iWidth = struct.unpack(">HH", xData[1:5])
+            return iWidth, iHeight
+        # endif
+
+        _xFile.seek(iLen - 2, os.SEEK_CUR)
+    # endwhile
+
+
+# enddef
+
+
+# #########################################################################
+# Reads the attributes of the (first) header up to the 'dataWindow' attribute
+def _ReadExrSize(_xFile: BinaryIO) -> Optional[tuple[int, int]]:
+    xData: bytes = _xFile.read(8)
+    if len(xData) < 8 or xData[0:4] != b"\x76\x2f\x31\x01":
+        return None
+    # endif
+
+    def ReadString() -> Optional[bytes]:
+        lChars: list[bytes] = []
+        while True:
+            xChar: bytes = _xFile.read(1)
+            if len(xChar) == 0:
+                return None
+            elif xChar == b"\0":
+                return b"".join(lChars)
+            # endif
+            lChars.append(xChar)
+        # endwhile
+
+    # enddef
+
+    while True:
+        xName: Optional[bytes] = ReadString()
+        if xName is None or len(xName) == 0:
+            return None
+        # endif
+        xType: Optional[bytes] = ReadString()
+        xSize: bytes = _xFile.read(4)
+        if xType is None or len(xSize) < 4:
+            return None
+        # endif
+        iSize: int = struct.unpack("<i", xSize)[0]
+
+        if xName == b"dataWindow" and xType == b"box2i" and iSize == 16:
+            iMinX, iMinY, iMaxX, iMaxY = struct.unpack("<iiii", _xFile.read(16))
+            return iMaxX - iMinX + 1, iMaxY - iMinY + 1
+        # endif
+        _xFile.seek(iSize, os.SEEK_CUR)
+    # endwhile
+
+
+# enddef
+
+
+# #########################################################################
+# Returns the width and height of the image. For PNG, JPEG and EXR files only the header is read.
+# Other images are decoded. The sizes are cached by path and modification time.
+# Returns None if the size cannot be determined.
+def GetImageSize(_pathImage: Path) -> Optional[tuple[int, int]]:
+    try:
+        tKey: tuple[str, int] = (_pathImage.as_posix(), _pathImage.stat().st_mtime_ns)
+    except OSError:
+        return None
+    # endtry
+
+    with g_xImageSizesLock:
+        tSize: Optional[tuple[int, int]] = g_dicImageSizes.get(tKey)
+        if tSize is not None:
+            g_dicImageSizes.move_to_end(tKey)
+            return tSize
+        # endif
+    # endwith
+
+    dicReader = {".png": _ReadPngSize, ".jpg": _ReadJpegSize, ".jpeg": _ReadJpegSize, ".exr": _ReadExrSize}
+    funcRead = dicReader.get(_pathImage.suffix.lower())
+    if funcRead is not None:
+        try:
+            with _pathImage.open("rb") as xFile:
+                tSize = funcRead(xFile)
+            # endwith
+        except (OSError, struct.error):
+            tSize = None
+        # endtry
+    # endif
+
+    if tSize is None:
+        aImage = cv2.imread(_pathImage.as_posix(), cv2.IMREAD_UNCHANGED)
+        if aImage is None:
+            return None
+        # endif
+        tSize = (aImage.shape[1], aImage.shape[0])
+    # endif
+
+    with g_xImageSizesLock:
+        g_dicImageSizes[tKey] = tSize
+        while len(g_dicImageSizes) > g_iMaxImageSizes:
+            g_dicImageSizes.popitem(last=False)
+        # endwhile
+    # endwith
+
+    return tSize
+
+
+# enddef
@@ -20,8 +20,13 @@
 # </LICENSE>
 ###
 
+import os
 import getpass
 from pathlib import Path
+from typing import Optional
+
+# File system types on which changes made by other hosts are not reported as file system events
+g_setNetworkFsTypes: set[str] = {"nfs", "nfs4", "lustre", "cifs", "smb3", "smbfs", "gpfs", "beegfs", "ceph"}
 
 
 def GetSettingsPath(_pathMain: Path) -> Path:
@@ -32,3 +37,33 @@ def GetSettingsPath(_pathMain: Path) -> Path:
 
 
 # enddef
+
+
+# Tests whether the path is located on a network file system, using the file system type
+# of the mount point with the longest matching path
+def IsNetworkPath(_pathX: Path) -> bool:
+    try:
+        with open("/proc/mounts", "r") as xFile:
+            lMounts: list[list[str]] = [sLine.split() for sLine in xFile]
+        # endwith
+    except OSError:
+        return False
+    # endtry
+
+    sPath: str = os.path.realpath(_pathX)
+    sFsType: Optional[str] = None
+    iMountLen: int = -1
+    for lMount in lMounts:
+        if len(lMount) < 3:
+            continue
+        # endif
+        sMount: str = lMount[1]
+        if (sPath == sMount or sPath.startswith(sMount.rstrip("/") + "/")) and len(sMount) > iMountLen:
+            sFsType = lMount[2]
+            iMountLen = len(sMount)
+        # endif
+    # endfor
+    return sFsType in g_setNetworkFsTypes
+
+
+# enddef
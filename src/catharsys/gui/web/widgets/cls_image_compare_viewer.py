@@ -0,0 +1,366 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import asyncio
+from pathlib import Path
+from nicegui import ui, events
+from typing import Callable, Optional
+
+from .cls_ui_compare_view import CUiCompareView
+from ..util.cls_image_tiles import CImageTiles, CImageTileSource
+from ..util.cls_image_compare import CImageCompare, CImageCompareStats
+from ..util.cls_exr_preview import CExrPreview, CExrPreviewSettings
+from ..util.image_size import GetImageSize
+
+
+# Compares 2 to 4 images with a common pan and zoom. The images are either shown side by side,
+# or the first image is compared with one of the others by a wipe or their difference image.
+# The difference image and the difference statistics are computed on the server.
+class CImageCompareViewer:
+    iMaxImages: int = 4
+    dicModes: dict[str, str] = {"side": "Side by side", "wipe": "Wipe", "diff": "Difference"}
+    dicDiffGains: dict[float, str] = {1.0: "x1", 4.0: "x4", 16.0: "x16", 64.0: "x64"}
+
+    def __init__(self):
+        self._lImages: list[tuple[Path, list[str]]] = []
+        self._lSizes: list[tuple[int, int]] = []
+        self._lSources: list[CImageTileSource] = []
+        self._sMode: str = "side"
+        # Index of the image that is compared with the first image in the wipe and difference mode
+        self._iOtherIdx: int = 1
+        self._fDiffGain: float = 4.0
+        self._uiView: CUiCompareView = None
+        self._uiSliderWipe: ui.slider = None
+        self._uiRowPixel: ui.row = None
+        self._uiDivStats: ui.element = None
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def GetLabel(_iIdx: int) -> str:
+        return chr(ord("A") + _iIdx)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _RegisterSource(self, _iIdx: int) -> CImageTileSource:
+        pathImage: Path = self._lImages[_iIdx][0]
+        iWidth, iHeight = self._lSizes[_iIdx]
+        if pathImage.suffix == ".exr":
+            xSettings = CExrPreviewSettings()
+            return CImageTiles.RegisterImage(
+                pathImage,
+                _iWidth=iWidth,
+                _iHeight=iHeight,
+                _sVariant=xSettings.sVariant,
+                _funcLoad=lambda pathImage: CExrPreview.Render(pathImage, xSettings),
+            )
+        # endif
+
+        return CImageTiles.RegisterImage(pathImage, _iWidth=iWidth, _iHeight=iHeight)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _RegisterDifferenceSource(self) -> CImageTileSource:
+        pathA: Path = self._lImages[0][0]
+        pathB: Path = self._lImages[self._iOtherIdx][0]
+        fGain: float = self._fDiffGain
+        return CImageTiles.RegisterImage(
+            pathA,
+            _iWidth=min(self._lSizes[0][0], self._lSizes[self._iOtherIdx][0]),
+            _iHeight=min(self._lSizes[0][1], self._lSizes[self._iOtherIdx][1]),
+            _sVariant=f"diff:{(pathB.as_posix())}:{pathB.stat().st_mtime_ns}:{fGain:g}",
+            _funcLoad=lambda pathImage: CImageCompare.RenderDifference(pathImage, pathB, fGain),
+        )
+
+    # enddef
+
+    # ##########################################################################################################
+    def _GetViewSources(self) -> tuple[list[CImageTileSource], list[str], str]:
+        sOther: str = self.GetLabel(self._iOtherIdx)
+        if self._sMode == "diff":
+            return (
+                [self._RegisterDifferenceSource()],
+                [f"|A - {sOther}| {self.dicDiffGains.get(self._fDiffGain, '')}"],
+                "side",
+            )
+        elif self._sMode == "wipe":
+            return [self._lSources[0], self._lSources[self._iOtherIdx]], ["A", sOther], "wipe"
+        # endif
+        return self._lSources, [self.GetLabel(i) for i in range(len(self._lSources))], "side"
+
+    # enddef
+
+    # ##########################################################################################################
+    def _UpdateView(self):
+        lSources, lLabels, sViewMode = self._GetViewSources()
+        self._uiView.SetSources(lSources, _lLabels=lLabels)
+        self._uiView.SetMode(sViewMode)
+        self._uiSliderWipe.set_visibility(self._sMode == "wipe")
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnChangeMode(self, _xArgs: events.ValueChangeEventArguments):
+        if _xArgs.value is None:
+            return
+        # endif
+        self._sMode = str(_xArgs.value)
+        self._UpdateView()
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnChangeOther(self, _xArgs: events.ValueChangeEventArguments):
+        if _xArgs.value is None:
+            return
+        # endif
+        self._iOtherIdx = int(_xArgs.value)
+        self._UpdateView()
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnChangeDiffGain(self, _xArgs: events.ValueChangeEventArguments):
+        if _xArgs.value is None:
+            return
+        # endif
+        self._fDiffGain = float(_xArgs.value)
+        self._UpdateView()
+
+    # enddef
+
+    # ##########################################################################################################
+    # Shows the values of the selected pixel in all images
+    async def _AsyncOnPixel(self, _iX: int, _iY: int):
+        self._uiView.SetMarker(_iX, _iY)
+
+        xLoop = asyncio.get_running_loop()
+        lValues: list = []
+        for pathImage, _ in self._lImages:
+            try:
+                lValues.append(await xLoop.run_in_executor(None, CImageCompare.GetPixel, pathImage, _iX, _iY))
+            except Exception as xEx:
+                lValues.append(xEx)
+            # endtry
+        # endfor
+
+        self._uiRowPixel.clear()
+        with self._uiRowPixel:
+            ui.label(f"Pixel ({_iX}, {_iY})").classes("text-bold")
+            for iIdx, xValue in enumerate(lValues):
+                if isinstance(xValue, Exception):
+                    sText = f"error: {xValue}"
+                elif xValue is None:
+                    sText = "outside"
+                else:
+                    lChannels, lPixel = xValue
+                    sText = " ".join(f"{sChannel} {fValue:.4f}" for sChannel, fValue in zip(lChannels, lPixel))
+                # endif
+                ui.label(f"{self.GetLabel(iIdx)}: {sText}").style("font-family: monospace;")
+            # endfor
+        # endwith
+
+    # enddef
+
+    # ##########################################################################################################
+    # Computes the difference statistics of the first image with all other images in the background
+    async def _AsyncUpdateStats(self):
+        with self._uiDivStats:
+            uiSpinner = ui.spinner()
+        # endwith
+
+        xLoop = asyncio.get_running_loop()
+        lRows: list[dict] = []
+        lWarnings: list[str] = []
+        pathA: Path = self._lImages[0][0]
+        for iIdx in range(1, len(self._lImages)):
+            sPair: str = f"A - {self.GetLabel(iIdx)}"
+            try:
+                xStats: CImageCompareStats = await xLoop.run_in_executor(
+                    None, CImageCompare.GetStats, pathA, self._lImages[iIdx][0]
+                )
+            except Exception as xEx:
+                lWarnings.append(f"{sPair}: {xEx}")
+                continue
+            # endtry
+
+            if not xStats.bSizeMatch:
+                lWarnings.append(
+                    f"{sPair}: image sizes differ, compared region {xStats.iWidth} x {xStats.iHeight} pixels"
+                )
+            # endif
+
+            for iChIdx, sChannel in enumerate(xStats.lChannels):
+                lRows.append(
+                    {
+                        "key": f"{sPair}/{sChannel}",
+                        "pair": sPair,
+                        "channel": sChannel,
+                        "mean": f"{xStats.lMeanAbs[iChIdx]:.6f}",
+                        "max": f"{xStats.lMaxAbs[iChIdx]:.6f}",
+                        "rmse": f"{xStats.lRmse[iChIdx]:.6f}",
+                        "ratio": f"{(100.0 * xStats.lDiffRatio[iChIdx]):.3f} %",
+                    }
+                )
+            # endfor
+        # endfor
+
+        uiSpinner.delete()
+        with self._uiDivStats:
+            lCols = [
+                {"name": "pair", "label": "Images", "field": "pair", "align": "left"},
+                {"name": "channel", "label": "Channel", "field": "channel", "align": "left"},
+                {"name": "mean", "label": "Mean abs. difference", "field": "mean"},
+                {"name": "max", "label": "Max. abs. difference", "field": "max"},
+                {"name": "rmse", "label": "RMSE", "field": "rmse"},
+                {"name": "ratio", "label": f"Pixels differing > {CImageCompare.fDiffThreshold:.4f}", "field": "ratio"},
+            ]
+            ui.table(columns=lCols, rows=lRows, row_key="key").props("dense flat")
+            for sWarning in lWarnings:
+                ui.label(sWarning).classes("text-negative")
+            # endfor
+        # endwith
+
+    # enddef
+
+    # ##########################################################################################################
+    def DrawCompare(
+        self,
+        _lImages: list[tuple[Path, list[str]]],
+        *,
+        _sHeight: str = "100vh",
+        _funcOnClose: Optional[Callable[[None], None]] = None,
+    ):
+        if len(_lImages) < 2 or len(_lImages) > self.iMaxImages:
+            raise RuntimeError(f"Select between 2 and {self.iMaxImages} images for a comparison")
+        # endif
+
+        self._lImages = list(_lImages)
+        self._lSizes = []
+        for pathImage, _ in self._lImages:
+            tSize: Optional[tuple[int, int]] = GetImageSize(pathImage)
+            if tSize is None:
+                raise RuntimeError(f"Image cannot be compared: {(pathImage.as_posix())}")
+            # endif
+            self._lSizes.append(tSize)
+        # endfor
+        self._lSources = [self._RegisterSource(iIdx) for iIdx in range(len(self._lImages))]
+        self._iOtherIdx = 1
+
+        with ui.grid().style(
+            "grid-template-columns: 1fr; "
+            "grid-template-rows: max-content max-content auto max-content max-content;"
+            f"width: 100%; height: {_sHeight};"
+            "justify-items: stretch;"
+            "gap: 5px 0px;"
+            "background: white;"
+            "padding: 5px;"
+        ):
+            with ui.row().classes("w-full items-center no-wrap"):
+                with ui.row().classes("q-gutter-sm"):
+                    for iIdx, (pathImage, lPathNames) in enumerate(self._lImages):
+                        ui.badge(f"{self.GetLabel(iIdx)}: {' / '.join(str(x) for x in lPathNames)}").tooltip(
+                            pathImage.as_posix()
+                        )
+                    # endfor
+                # endwith
+                ui.element("q-space")
+                ui.button(icon="close", on_click=_funcOnClose).props("dense flat")
+            # endwith
+
+            with ui.row().classes("w-full items-center").style("gap: 1em;"):
+                ui.toggle(self.dicModes, value=self._sMode, on_change=self._OnChangeMode).props("dense")
+                ui.select(
+                    {iIdx: self.GetLabel(iIdx) for iIdx in range(1, len(self._lImages))},
+                    label="Compare A with",
+                    value=self._iOtherIdx,
+                    on_change=self._OnChangeOther,
+                ).props("dense").style("min-width: 8em;")
+                ui.select(
+                    self.dicDiffGains,
+                    label="Difference gain",
+                    value=self._fDiffGain,
+                    on_change=self._OnChangeDiffGain,
+                ).props("dense").style("min-width: 8em;")
+                self._uiSliderWipe = ui.slider(
+                    min=0.0, max=1.0, step=0.01, value=0.5, on_change=lambda xArgs: self._uiView.SetWipe(xArgs.value)
+                ).style("width: 12em;")
+                ui.button(icon="fit_screen", on_click=lambda: self._uiView.Fit()).props("dense flat").tooltip(
+                    "Fit to view"
+                )
+                ui.button("1:1", on_click=lambda: self._uiView.SetScale(1.0)).props("dense flat").tooltip(
+                    "Show the images at their original size"
+                )
+            # endwith
+
+            lSources, lLabels, sViewMode = self._GetViewSources()
+            self._uiView = CUiCompareView(
+                lSources, _lLabels=lLabels, _sMode=sViewMode, _funcOnPixel=self._AsyncOnPixel
+            ).style(
+                "width: 100%; height: 100%; min-height: 0px;"
+                "background-color: #8f8f8f;"
+                "background-image:  repeating-linear-gradient(45deg, #a4a4a4 25%, transparent 25%, transparent 75%, #a4a4a4 75%, #a4a4a4), repeating-linear-gradient(45deg, #a4a4a4 25%, #8f8f8f 25%, #8f8f8f 75%, #a4a4a4 75%, #a4a4a4);"
+                "background-position: 0 0, 10px 10px;"
+                "background-size: 20px 20px;"
+            )
+            self._uiSliderWipe.set_visibility(self._sMode == "wipe")
+
+            self._uiRowPixel = ui.row().classes("w-full items-center").style("gap: 1.5em;")
+            with self._uiRowPixel:
+                ui.label("Click on an image to show the pixel values. Integer images are scaled to [0, 1].")
+            # endwith
+
+            self._uiDivStats = ui.element("div").classes("w-full")
+        # endwith
+
+    # enddef
+
+    # ##########################################################################################################
+    def GetCompareDialog(self, _lImages: list[tuple[Path, list[str]]]) -> ui.dialog:
+        dlgCompare = ui.dialog().props("maximized persistent")
+        try:
+            with dlgCompare:
+                self.DrawCompare(_lImages, _funcOnClose=lambda: dlgCompare.close())
+            # endwith dialog
+        except Exception:
+            dlgCompare.delete()
+            raise
+        # endtry
+
+        return dlgCompare
+
+    # enddef
+
+    # ##########################################################################################################
+    async def AsyncShowCompare(self, _lImages: list[tuple[Path, list[str]]]):
+        dlgCompare = self.GetCompareDialog(_lImages)
+        dlgCompare.open()
+        await self._AsyncUpdateStats()
+        await dlgCompare
+
+    # enddef
+
+
+# endclass
@@ -20,27 +20,42 @@
 # </LICENSE>
 ###
 
-import os
 import math
+import asyncio
+import concurrent.futures
 from pathlib import Path
-from nicegui import ui, Tailwind, events
-from catharsys.gui.web.widgets.cls_message import CMessage, EMessageType
-import catharsys.plugins.std.util.imgproc as imgproc
-import numpy as np
-from typing import Callable, Optional, Union, Any
+from nicegui import ui, events
+from typing import Callable, Optional, Union
 
 from .cls_ui_image import CUiImage
-
-# need to enable OpenExr explicitly
-os.environ["OPENCV_IO_ENABLE_OPENEXR"] = "1"
-import cv2
+from .cls_ui_tile_view import CUiTileView
+from ..util.cls_image_tiles import CImageTiles, CImageTileSource
+from ..util.image_size import GetImageSize
+from ..util.cls_exr_preview import CExrPreview, CExrPreviewSettings
 
 
 class CImageViewer:
+    # Images whose width or height is at least this size are shown in the tiled view,
+    # which only loads the tiles of the visible part of the image at the current zoom level.
+    iTileViewMinSize: int = 4096
+    # Range of the image scale, which is the same for the slider and the mouse wheel of the tiled view,
+    # so that very large images can be zoomed out to fit into the view.
+    fMinScale: float = 0.01
+    fMaxScale: float = 8.0
+
+    # Images are prefetched one after the other by a single background thread
+    _xPrefetchPool: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
     def __init__(self):
         self._iImgHeight: int = None
         self._iImgWidth: int = None
         self._uiImage: CUiImage = None
+        self._uiTileView: CUiTileView = None
+        self._uiDivView: ui.element = None
+        self._uiSliderScale: ui.slider = None
+        # EXR images are rendered to 8-bit previews on the server with these settings
+        self._xExrSettings = CExrPreviewSettings()
+        self._lPrefetchFutures: list[concurrent.futures.Future] = []
         self._bIsDrawn: bool = False
         self._fScalePower: float = 0.0
         self._uiDivTitle: ui.element = None
@@ -63,6 +78,12 @@ class CImageViewer:
 
     # ##########################################################################################################
     def ScaleImage(self, _uiImage: ui.image, _fScalePower: float):
+        if self._uiTileView is not None:
+            self._fScalePower = _fScalePower
+            self._uiTileView.SetScale(math.exp(self._fScalePower))
+            return
+        # endif
+
         if _uiImage is None:
             return
         # endif
@@ -75,6 +96,18 @@ class CImageViewer:
 
     # enddef
 
+    # ##########################################################################################################
+    # Called when the scale of the tiled view has been changed with the mouse wheel
+    def _OnTileViewScale(self, _fScale: float):
+        self._fScalePower = min(
+            math.log(CImageViewer.fMaxScale), max(math.log(CImageViewer.fMinScale), math.log(_fScale))
+        )
+        if self._uiSliderScale is not None:
+            self._uiSliderScale.set_value(self._fScalePower)
+        # endif
+
+    # enddef
+
     # ##########################################################################################################
     def UpdateScale(self):
         self.ScaleImage(self._uiImage, self._fScalePower)
@@ -90,17 +123,13 @@ class CImageViewer:
     ):
         self._pathImage = _pathImage
 
-        if self._uiImage is not None:
-            if _pathImage.exists():
-                aImage: np.ndarray = cv2.imread(_pathImage.as_posix())
-                self._iImgHeight, self._iImgWidth = aImage.shape[0:2]
-
-            else:
+        if self._uiDivView is not None:
+            if not _pathImage.exists():
                 raise RuntimeError(f"Image does not exist: {(_pathImage.as_posix())}")
             # endif
 
             self.UpdateTitle(_xTitle)
-            self._uiImage.UpdateImage(_pathImage)
+            self._DrawView()
             self.UpdateScale()
         # endif
 
@@ -127,6 +156,181 @@ class CImageViewer:
 
     # enddef
 
+    # ##########################################################################################################
+    def _IsTileView(self) -> bool:
+        if self._iImgWidth is None or self._iImgHeight is None:
+            return False
+        # endif
+        return max(self._iImgWidth, self._iImgHeight) >= CImageViewer.iTileViewMinSize
+
+    # enddef
+
+    # ##########################################################################################################
+    # Loads the given images in the background, so that they can be shown without delay.
+    # The coarse tile levels of large images and EXR previews are created on the server,
+    # while other images are loaded into the cache of the browser.
+    # Prefetches that have not started yet are cancelled by the next call.
+    async def AsyncPrefetch(self, _lPaths: list[Path]):
+        for xFuture in self._lPrefetchFutures:
+            xFuture.cancel()
+        # endfor
+        self._lPrefetchFutures = []
+        if self._uiDivView is None:
+            return
+        # endif
+
+        xLoop = asyncio.get_running_loop()
+        for pathImage in _lPaths:
+            tSize: Optional[tuple[int, int]] = await xLoop.run_in_executor(None, GetImageSize, pathImage)
+            if tSize is None or self._uiDivView is None:
+                continue
+            # endif
+
+            iWidth, iHeight = tSize
+            if pathImage.suffix == ".exr" or max(iWidth, iHeight) >= CImageViewer.iTileViewMinSize:
+                xSource: CImageTileSource = self._RegisterTileSource(pathImage, iWidth, iHeight)
+                self._lPrefetchFutures.append(CImageViewer._xPrefetchPool.submit(CImageTiles.Prefetch, xSource))
+            elif pathImage.suffix in [".png", ".jpg", ".jpeg"]:
+                sUrl: str = CUiImage.GetImageUrl(pathImage)
+                self._uiDivView.client.run_javascript(f"new Image().src = window.path_prefix + '{sUrl}';")
+            # endif
+        # endfor
+
+    # enddef
+
+    # ##########################################################################################################
+    def _RegisterTileSource(self, _pathImage: Path, _iWidth: int, _iHeight: int) -> CImageTileSource:
+        if _pathImage.suffix == ".exr":
+            xSettings = CExrPreviewSettings(**vars(self._xExrSettings))
+            return CImageTiles.RegisterImage(
+                _pathImage,
+                _iWidth=_iWidth,
+                _iHeight=_iHeight,
+                _sVariant=xSettings.sVariant,
+                _funcLoad=lambda pathImage: CExrPreview.Render(pathImage, xSettings),
+            )
+        # endif
+
+        return CImageTiles.RegisterImage(_pathImage, _iWidth=_iWidth, _iHeight=_iHeight)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnChangeExrSettings(self, _sName: str, _xArgs: events.ValueChangeEventArguments):
+        if _xArgs.value is None:
+            return
+        # endif
+        xValue = float(_xArgs.value) if _sName == "fExposure" else str(_xArgs.value)
+        setattr(self._xExrSettings, _sName, xValue)
+        if self._uiTileView is not None:
+            self._uiTileView.SetSource(self._RegisterTileSource(self._pathImage, self._iImgWidth, self._iImgHeight))
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    def _DrawExrControls(self):
+        with ui.row().classes("items-center q-px-sm").style("gap: 1em;"):
+            ui.select(
+                CExrPreview.lChannels,
+                label="Channel",
+                value=self._xExrSettings.sChannel,
+                on_change=lambda xArgs: self._OnChangeExrSettings("sChannel", xArgs),
+            ).props("dense").style("min-width: 6em;")
+            ui.select(
+                CExrPreview.dicNormalize,
+                label="Normalize",
+                value=self._xExrSettings.sNormalize,
+                on_change=lambda xArgs: self._OnChangeExrSettings("sNormalize", xArgs),
+            ).props("dense").style("min-width: 10em;")
+            ui.number(
+                label="Exposure",
+                value=self._xExrSettings.fExposure,
+                step=0.5,
+                format="%.1f",
+                on_change=lambda xArgs: self._OnChangeExrSettings("fExposure", xArgs),
+            ).props("dense debounce=500").style("width: 6em;")
+        # endwith
+
+    # enddef
+
+    # ##########################################################################################################
+    # Creates the view of the current image, which is either the image element in a scroll area,
+    # or the tiled view for large images.
+    def _DrawView(self):
+        pathImage: Path = self._pathImage
+        # Only reads the image header for the supported image types
+        tSize: Optional[tuple[int, int]] = GetImageSize(pathImage)
+        if tSize is not None:
+            self._iImgWidth, self._iImgHeight = tSize
+        else:
+            self._iImgWidth = None
+            self._iImgHeight = None
+        # endif
+
+        self._uiImage = None
+        self._uiTileView = None
+        self._uiDivView.clear()
+        with self._uiDivView:
+            sBackground: str = (
+                "background-color: #8f8f8f;"
+                # "opacity: 0.8;"
+                "background-image:  repeating-linear-gradient(45deg, #a4a4a4 25%, transparent 25%, transparent 75%, #a4a4a4 75%, #a4a4a4), repeating-linear-gradient(45deg, #a4a4a4 25%, #8f8f8f 25%, #8f8f8f 75%, #a4a4a4 75%, #a4a4a4);"
+                "background-position: 0 0, 10px 10px;"
+                "background-size: 20px 20px;"
+            )
+
+            # EXR images are always shown as tiled previews rendered on the server
+            bIsExr: bool = pathImage.suffix == ".exr" and self._iImgWidth is not None
+            if pathImage.exists() and (
+                bIsExr or (pathImage.suffix in [".png", ".jpg", ".jpeg"] and self._IsTileView())
+            ):
+                with ui.column().style("height: 100%; width: 100%; gap: 0px; flex-wrap: nowrap;"):
+                    if bIsExr is True:
+                        self._DrawExrControls()
+                    # endif
+                    self._uiTileView = CUiTileView(
+                        self._RegisterTileSource(pathImage, self._iImgWidth, self._iImgHeight),
+                        _fScale=math.exp(self._fScalePower),
+                        _fMinScale=CImageViewer.fMinScale,
+                        _fMaxScale=CImageViewer.fMaxScale,
+                        _funcOnScale=self._OnTileViewScale,
+                    ).style("flex: 1 1 auto; min-height: 0px; width: 100%;" + sBackground)
+                # endwith
+                return
+            # endif
+
+            self._uiScrollArea = ui.scroll_area()
+            self._uiScrollArea.style(
+                "height: 100%; width: 100%;"
+                # "padding: 5px;"
+                + sBackground
+            )
+            with self._uiScrollArea:
+                if not pathImage.exists():
+                    # with ui.column():
+                    ui.icon("report_problem", size="xl")
+                    ui.label(f"Image path not found: {(pathImage.as_posix())}")
+                    # endwith
+                else:
+                    if pathImage.suffix not in [".png", ".jpg", ".jpeg"]:
+                        # with ui.column():
+                        ui.icon("report_problem", size="xl")
+                        ui.label(f"Image file type '{pathImage.suffix}' not supported")
+                        # endwith
+                    else:
+                        self._uiImage = CUiImage(pathImage).props('fit=cover position="0px 0px"').style("padding: 0px;")
+                        # uiImg = ui.image(pathImage).props(
+                        #     'fit=cover position="0px 0px"'
+                        # )  # .style("position: 50px 100px;")  # .style("max-width: 100%;")
+
+                    # endif
+                # endif
+            # endwith
+        # endwith
+
+    # enddef
+
     # ##########################################################################################################
     def DrawImage(
         self,
@@ -136,18 +340,10 @@ class CImageViewer:
         _bShowFullscreen: bool = True,
         _xTitle: Optional[Union[str, list[str]]] = None,
         _funcOnClose: Optional[Callable[[None], None]] = None,
+        _funcOnNavigate: Optional[Callable[[int], None]] = None,
     ):
         self._pathImage = _pathImage
 
-        if _pathImage.exists():
-            aImage: np.ndarray = cv2.imread(_pathImage.as_posix())
-            self._iImgHeight, self._iImgWidth = aImage.shape[0:2]
-
-        else:
-            self._iImgWidth = None
-            self._iImgHeight = None
-        # endif
-
         # with ui.card().tight():
         with ui.grid().style(
             "grid-template-columns: 1fr; "
@@ -162,12 +358,20 @@ class CImageViewer:
             # with ui.element("q-bar"):
             # with ui.element("div").classes("w-full"):
             with ui.grid().classes("w-full").style(
-                "grid-template-columns: auto auto min-content min-content;"
+                "grid-template-columns: auto auto min-content min-content min-content min-content;"
                 "grid-template-rows: 1fr;"
                 "justify-items: stretch;"
             ):
                 self._uiDivTitle = ui.element("div")
                 ui.element("q-space")
+                if _funcOnNavigate is not None:
+                    ui.button(icon="chevron_left", on_click=lambda: _funcOnNavigate(-1)).props("dense flat").tooltip(
+                        "Previous image"
+                    )
+                    ui.button(icon="chevron_right", on_click=lambda: _funcOnNavigate(1)).props("dense flat").tooltip(
+                        "Next image"
+                    )
+                # endif
                 if _bShowFullscreen is True:
                     ui.button(icon="fullscreen", on_click=self._OnFullscreen).props("dense flat")
                 # endif
@@ -175,42 +379,12 @@ class CImageViewer:
             # endwith
             self.UpdateTitle(_xTitle)
 
-            self._uiScrollArea = ui.scroll_area()
-            self._uiScrollArea.style(
-                "height: 100%; width: 100%;"
-                # "padding: 5px;"
-                "background-color: #8f8f8f;"
-                # "opacity: 0.8;"
-                "background-image:  repeating-linear-gradient(45deg, #a4a4a4 25%, transparent 25%, transparent 75%, #a4a4a4 75%, #a4a4a4), repeating-linear-gradient(45deg, #a4a4a4 25%, #8f8f8f 25%, #8f8f8f 75%, #a4a4a4 75%, #a4a4a4);"
-                "background-position: 0 0, 10px 10px;"
-                "background-size: 20px 20px;"
-            )
-            with self._uiScrollArea:
-                if not _pathImage.exists():
-                    # with ui.column():
-                    ui.icon("report_problem", size="xl")
-                    ui.label(f"Image path not found: {(_pathImage.as_posix())}")
-                    # endwith
-                else:
-                    if _pathImage.suffix not in [".png", ".jpg", ".jpeg"]:
-                        # with ui.column():
-                        ui.icon("report_problem", size="xl")
-                        ui.label(f"Image file type '{_pathImage.suffix}' not supported")
-                        # endwith
-                    else:
-                        self._uiImage = (
-                            CUiImage(_pathImage).props('fit=cover position="0px 0px"').style("padding: 0px;")
-                        )
-                        # uiImg = ui.image(_pathImage).props(
-                        #     'fit=cover position="0px 0px"'
-                        # )  # .style("position: 50px 100px;")  # .style("max-width: 100%;")
+            self._uiDivView = ui.element("div").style("height: 100%; width: 100%; min-height: 0px;")
+            self._DrawView()
 
-                    # endif
-                # endif
-            # endwith
-            ui.slider(
-                min=-2.0,
-                max=2.0,
+            self._uiSliderScale = ui.slider(
+                min=math.log(CImageViewer.fMinScale),
+                max=math.log(CImageViewer.fMaxScale),
                 step=0.01,
                 value=self._fScalePower,
                 on_change=lambda xArgs: self._OnScaleImage(self._uiImage, xArgs),
@@ -22,7 +22,10 @@
 
 
 import functools
-from nicegui import ui, Tailwind, events
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from nicegui import ui, Tailwind
 from typing import Callable, Optional
 
 from catharsys.api.action.cls_action_handler import CActionHandler, EJobStatus
@@ -32,9 +35,25 @@ from anybase.cls_process_group_handler import EProcessStatus
 from anybase.cls_process_output import CProcessOutput
 
 from .cls_message import CMessage, EMessageType
+from .cls_ui_log import CUiLog
+from .cls_ui_job_status_map import CUiJobStatusMap
+from ..util.cls_job_output import CJobOutputStore, CJobOutputBuffer
+from ..util.cls_job_registry import CJobRegistry, CJobRegistryLaunch
 
 
 class CJobInfo:
+    # Number of characters of the output of each job and output type that are kept in memory.
+    # The complete output is written to log files in the logs path.
+    iMaxOutputTailChars: int = 256 * 1024
+
+    # The job update interval drops to the minimum while jobs change status or produce output,
+    # and grows by the backoff factor with every update without changes, up to the maximum.
+    fJobUpdateMinInterval: float = 0.2
+    fJobUpdateMaxInterval: float = 2.0
+    fJobUpdateBackoff: float = 1.5
+    # Fraction of the update interval that may be spent on reading job output
+    fJobUpdateLoad: float = 0.1
+
     def __init__(
         self,
         *,
@@ -43,6 +62,8 @@ class CJobInfo:
         _funcOnClose: Optional[Callable[[None], None]] = None,
         _funcOnStart: Optional[Callable[[None], None]] = None,
         _funcOnEnd: Optional[Callable[[None], None]] = None,
+        _pathLogs: Optional[Path] = None,
+        _pathRegistry: Optional[Path] = None,
     ):
         self._uiGridMain: ui.grid = _uiGrid
         self._xActHandler: CActionHandler = _xActHandler
@@ -50,9 +71,23 @@ class CJobInfo:
         self._funcOnStart: Callable[[None], None] = _funcOnStart
         self._funcOnEnd: Callable[[None], None] = _funcOnEnd
 
-        self._dicJobOutputTypeText: dict[str, list[str]] = dict()
+        # Without a logs path the logs are written to a temporary folder,
+        # which is removed together with the job info.
+        self._xTempLogs: Optional[tempfile.TemporaryDirectory] = None
+        if _pathLogs is None:
+            self._xTempLogs = tempfile.TemporaryDirectory(prefix="cathgui-jobs-")
+            _pathLogs = Path(self._xTempLogs.name)
+        # endif
+        self._xJobOutput = CJobOutputStore(_pathLogs, _iMaxTailChars=CJobInfo.iMaxOutputTailChars)
+
+        # The jobs of the last launch are recorded in the registry, so that their status
+        # and output can be shown again, after the page has been closed.
+        self._xJobRegistry: Optional[CJobRegistry] = None if _pathRegistry is None else CJobRegistry(_pathRegistry)
+        # The launch that has been restored from the registry, while no jobs have been launched
+        self._xRestoredLaunch: Optional[CJobRegistryLaunch] = None
         self._iDisplayJobIdx: int = 0
-        self._bEnableJobOutputAutoScroll: bool = True
+        # Number of characters of the output of the displayed job that have been sent to the log views
+        self._dicDisplayJobOutputPos: dict[str, int] = dict()
 
         self._dicJobStatusIconName: dict[EProcessStatus, str] = {
             EJobStatus.NOT_STARTED: "schedule",
@@ -61,14 +96,27 @@ class CJobInfo:
             EJobStatus.ENDED: "done",
             EJobStatus.TERMINATED: "close",
         }
+        self._dicJobStatusColor: dict[EJobStatus, str] = {
+            EJobStatus.NOT_STARTED: "#9e9e9e",
+            EJobStatus.STARTING: "#ffc107",
+            EJobStatus.RUNNING: "#1976d2",
+            EJobStatus.ENDED: "#21ba45",
+            EJobStatus.TERMINATED: "#c10015",
+        }
+        # The job status map stores the status of each job as index into this list
+        self._lJobStatus: list[EJobStatus] = list(self._dicJobStatusIconName.keys())
+        self._dicJobStatusIndex: dict[EJobStatus, int] = {
+            eStatus: iIdx for iIdx, eStatus in enumerate(self._lJobStatus)
+        }
 
         self._xMessage = CMessage()
 
         self._iJobUpdateIndex: int = 0
 
         # Create UI Elements
-        self._uiTimerJobUpdate = ui.timer(1.0, lambda: self._JobsUpdate(), active=False)
-        self._lbutJobStatus: list[ui.button] = []
+        self._uiTimerJobUpdate = ui.timer(CJobInfo.fJobUpdateMinInterval, lambda: self._JobsUpdate(), active=False)
+        self._uiJobStatusMap: CUiJobStatusMap = None
+        self._dicJobStatusCountLabel: dict[EJobStatus, ui.label] = dict()
         with self._uiGridMain:
             ui.label(f"Action: {self._xActHandler.xAction.sAction}")
             # with ui.grid(columns=3):
@@ -93,7 +141,14 @@ class CJobInfo:
             with self._uiBadgeAlive:
                 self._labStatus = ui.label("Status: n/a")
             # endwith
-            self._rowJobStatus = ui.row()
+            self._rowJobStatusCount = ui.row().classes("items-center")
+            with self._rowJobStatusCount:
+                for eStatus, sIconName in self._dicJobStatusIconName.items():
+                    ui.icon(sIconName).style(f"color: {self._dicJobStatusColor[eStatus]}")
+                    self._dicJobStatusCountLabel[eStatus] = ui.label("0").classes("q-mr-md")
+                # endfor
+            # endwith
+            self._rowJobStatus = ui.row().classes("w-full")
             ui.separator()
             self._labJobSectionTitle = ui.label("Selected Job")
             self._rowJobInfo = ui.row()
@@ -102,33 +157,62 @@ class CJobInfo:
 
         # endwith
 
+        self._RestoreLastLaunch()
+
     # enddef
 
     # #####################################################################################################
-    def _CreateJobOutput(self):
-        self._dicJobOutputTypeText.clear()
-        lOutTypes = self._xActHandler.GetJobOutputTypes()
-        iJobCnt = self._xActHandler.iJobCount
-        self._dicScrlJobOutput: dict[str, ui.scroll_area] = dict()
-        self._dicHtmlJobOutput: dict[str, ui.html] = dict()
+    def _RestoreLastLaunch(self):
+        if self._xJobRegistry is None:
+            return
+        # endif
+
+        xLaunch: Optional[CJobRegistryLaunch] = self._xJobRegistry.Load()
+        if xLaunch is None or xLaunch.iJobCount == 0:
+            return
+        # endif
+
+        self._xRestoredLaunch = xLaunch
+        sTime: str = datetime.fromtimestamp(xLaunch.fTimeStart).strftime("%Y-%m-%d %H:%M:%S")
+        if xLaunch.fTimeEnd is None:
+            self._labStatus.set_text(f"Status: launch of {sTime} with {xLaunch.iJobCount} jobs (not monitored)")
+        else:
+            self._labStatus.set_text(f"Status: finished launch of {sTime} with {xLaunch.iJobCount} jobs")
+        # endif
+
+        dicStatusIndex: dict[str, int] = {eStatus.name: iIdx for eStatus, iIdx in self._dicJobStatusIndex.items()}
+        lStatus: list[int] = [dicStatusIndex.get(sStatus, 0) for sStatus in xLaunch.lStatus]
+        self._iDisplayJobIdx = 0
+        self._CreateJobStatusMap(lStatus, xLaunch.lLabels)
+
+        self._xJobOutput.Restore(xLaunch.lOutputTypes, xLaunch.iJobCount, xLaunch.dicOutputPos)
+        self._CreateJobOutput(xLaunch.lOutputTypes)
+        self._DisplayJobOutput(_bReset=True)
+
+    # enddef
+
+    # #####################################################################################################
+    def _CreateJobOutput(self, _lOutTypes: list[str]):
+        self._dicLogJobOutput: dict[str, CUiLog] = dict()
 
         self._rowJobOutput.clear()
         with self._rowJobOutput:
             sOutType: str = None
-            for sOutType in lOutTypes:
-                self._dicJobOutputTypeText[sOutType] = [""] * iJobCnt
+            for sOutType in _lOutTypes:
                 with ui.expansion(sOutType, icon="description").props("switch-toggle-side").classes("w-full"):
                     uiCard = ui.card()
                     Tailwind().width("full").height("100").apply(uiCard)
 
                     with uiCard:
-                        self._dicScrlJobOutput[sOutType] = ui.scroll_area(
-                            on_scroll=lambda xArgs: self._OnScrollJobOutput(xArgs)
+                        self._dicLogJobOutput[sOutType] = CUiLog(_sEmptyText="--- no output ---").classes(
+                            "w-full h-full"
                         )
-                        with self._dicScrlJobOutput[sOutType]:
-                            self._dicHtmlJobOutput[sOutType] = ui.html("<pre><code>n/a</code></pre>")
-                        # endwith scroll area
                     # endwith card
+                    ui.button(
+                        "Download full output",
+                        icon="download",
+                        on_click=functools.partial(self._DownloadJobOutput, sOutType),
+                    ).props("flat dense")
                 # endwith expansion
             # endfor output type
         # endwith row
@@ -143,21 +227,25 @@ class CJobInfo:
         self._uiBadgeAlive.props(f"color={sColor}")
         self._uiBadgeAlive.update()
 
-        self._xActHandler.UpdateJobOutput(_iMaxTime_ms=100)
+        iMaxTime_ms: int = max(20, int(self._uiTimerJobUpdate.interval * 1000.0 * CJobInfo.fJobUpdateLoad))
+        self._xActHandler.UpdateJobOutput(_iMaxTime_ms=iMaxTime_ms)
 
         setJobsStatusChanged = self._xActHandler.GetJobStatusChanged()
         setJobOutChanged = self._xActHandler.GetJobOutputChanged()
+        self._AdaptJobUpdateInterval(len(setJobsStatusChanged) > 0 or len(setJobOutChanged) > 0)
 
+        dicStatusChanged: dict[int, int] = dict()
+        dicRegStatus: dict[int, tuple[str, dict]] = dict()
         for iJobIdx in setJobsStatusChanged:
             eJobStatus: EJobStatus = self._xActHandler.GetJobStatus(iJobIdx)
-            sIconName = self._dicJobStatusIconName[eJobStatus]
-            self._lbutJobStatus[iJobIdx].props(f"icon={sIconName}")
-            # print(f"[{iJobIdx}]: {eJobStatus}, {sIconName}")
+            dicStatusChanged[iJobIdx] = self._dicJobStatusIndex[eJobStatus]
+            dicRegStatus[iJobIdx] = (eJobStatus.name, self._xActHandler.GetJobInfo(iJobIdx))
+            # print(f"[{iJobIdx}]: {eJobStatus}")
             if eJobStatus == EJobStatus.TERMINATED:
                 sEndMsg = self._xActHandler.GetJobEndMessage(iJobIdx)
                 sMsg = "\n--- Job TERMINATED ---\n\n" + sEndMsg
-                for sOutType in self._dicJobOutputTypeText:
-                    self._dicJobOutputTypeText[sOutType][iJobIdx] += sMsg
+                for sOutType in self._xJobOutput.lOutputTypes:
+                    self._xJobOutput.Append(sOutType, iJobIdx, sMsg)
                 # endfor
                 setJobOutChanged.add(iJobIdx)
             # endif
@@ -166,19 +254,31 @@ class CJobInfo:
             # endif
         # endfor
 
+        if len(dicStatusChanged) > 0 and self._uiJobStatusMap is not None:
+            self._uiJobStatusMap.Update(dicStatusChanged)
+            self._UpdateJobStatusCounts()
+        # endif
+
         # print(f"> Job Update: setJobOutChanged: {setJobOutChanged}")
 
+        dicRegOutputPos: dict[int, dict[str, int]] = dict()
         for iJobIdx in setJobOutChanged:
-            for sOutType in self._dicJobOutputTypeText:
+            dicPos: dict[str, int] = dict()
+            dicRegOutputPos[iJobIdx] = dicPos
+            for sOutType in self._xJobOutput.lOutputTypes:
                 xJobOut: CProcessOutput = self._xActHandler.GetJobOutput(iJobIdx, _sType=sOutType)
-                lOutput = self._dicJobOutputTypeText[sOutType]
-                sLine: str = None
-                for sLine in xJobOut:
-                    lOutput[iJobIdx] += sLine
-                # endfor
+                self._xJobOutput.Append(sOutType, iJobIdx, "".join(xJobOut))
+                dicPos[sOutType] = self._xJobOutput.Get(sOutType, iJobIdx).iTotalChars
             # endfor output type
         # endfor job index
 
+        self._xJobOutput.Flush()
+
+        if self._xJobRegistry is not None:
+            self._xJobRegistry.AddStatus(dicRegStatus)
+            self._xJobRegistry.AddOutputPos(dicRegOutputPos)
+        # endif
+
         # print(f"> Job Update: self._iDisplayJobIdx: {self._iDisplayJobIdx}")
         if self._iDisplayJobIdx in setJobOutChanged:
             # print("> Job Update: Display Job Output")
@@ -189,30 +289,52 @@ class CJobInfo:
     # enddef
 
     # #####################################################################################################
-    def _DisplayJobOutput(self):
+    # Only the output that has been added since the last call is sent to the log views.
+    # If '_bReset' is True, or the new output is no longer held in memory, the log views are refilled.
+    def _DisplayJobOutput(self, *, _bReset: bool = False):
         sOutType: str = None
-        for sOutType in self._dicJobOutputTypeText:
-            htmlJobOutput = self._dicHtmlJobOutput[sOutType]
-            scrlJobOutput = self._dicScrlJobOutput[sOutType]
+        for sOutType in self._xJobOutput.lOutputTypes:
+            uiLog: CUiLog = self._dicLogJobOutput[sOutType]
+            xBuffer: CJobOutputBuffer = self._xJobOutput.Get(sOutType, self._iDisplayJobIdx)
 
-            sText: str = self._dicJobOutputTypeText[sOutType][self._iDisplayJobIdx]
-            if len(sText) == 0:
-                sText = "--- no output ---"
+            sText: Optional[str] = None
+            if _bReset is False:
+                sText = xBuffer.GetTextSince(self._dicDisplayJobOutputPos.get(sOutType, 0))
             # endif
-            htmlJobOutput.set_content("<pre><code>\n" + sText + "\n</code></pre>\n")
-            htmlJobOutput.update()
 
-            if self._bEnableJobOutputAutoScroll is True:
-                scrlJobOutput.update()
-                scrlJobOutput.scroll_to(percent=100.0)
-                scrlJobOutput.update()
+            if sText is None:
+                uiLog.Clear()
+                if xBuffer.iDroppedChars > 0:
+                    uiLog.Push(f"--- {xBuffer.iDroppedChars} characters omitted, download the full output ---\n")
+                # endif
+                sText = xBuffer.sTail
             # endif
+
+            uiLog.Push(sText)
+            self._dicDisplayJobOutputPos[sOutType] = xBuffer.iTotalChars
         # endfor output type
 
     # enddef
 
+    # #####################################################################################################
+    def _DownloadJobOutput(self, _sOutType: str):
+        xBuffer: CJobOutputBuffer = self._xJobOutput.Get(_sOutType, self._iDisplayJobIdx)
+        if xBuffer.bHasLog is False:
+            self._xMessage.ShowMessage("No output available", _eType=EMessageType.INFO, _bDialog=False)
+            return
+        # endif
+        self._xJobOutput.Sync()
+        ui.download(xBuffer.pathLog, filename=f"job-{self._iDisplayJobIdx}-{_sOutType}.log")
+
+    # enddef
+
     # #####################################################################################################
     def _DisplayJobInfo(self):
+        if self._xRestoredLaunch is not None:
+            self._DisplayRestoredJobInfo()
+            return
+        # endif
+
         xJobCfg: CConfigExecJob = self._xActHandler.GetJobConfig(self._iDisplayJobIdx)
         self._labJobSectionTitle.set_text(f"Selected Job: {xJobCfg.iIdx}: {xJobCfg.sName}")
         eJobStatus: EJobStatus = self._xActHandler.GetJobStatus(self._iDisplayJobIdx)
@@ -244,10 +366,57 @@ class CJobInfo:
     # enddef
 
     # #####################################################################################################
-    def _OnScrollJobOutput(self, xArgs: events.ScrollEventArguments):
-        # print(f"Vertical percentage: {xArgs.vertical_percentage}")
-        self._bEnableJobOutputAutoScroll = xArgs.vertical_percentage >= 0.9
-        # pass
+    def _AdaptJobUpdateInterval(self, _bChanged: bool):
+        if _bChanged is True:
+            fInterval = CJobInfo.fJobUpdateMinInterval
+        else:
+            fInterval = min(
+                CJobInfo.fJobUpdateMaxInterval, self._uiTimerJobUpdate.interval * CJobInfo.fJobUpdateBackoff
+            )
+        # endif
+        self._uiTimerJobUpdate.interval = fInterval
+
+    # enddef
+
+    # #####################################################################################################
+    def _UpdateJobStatusCounts(self):
+        for eStatus, uiLabel in self._dicJobStatusCountLabel.items():
+            iCount: int = 0
+            if self._uiJobStatusMap is not None:
+                iCount = self._uiJobStatusMap.GetCount(self._dicJobStatusIndex[eStatus])
+            # endif
+            uiLabel.set_text(str(iCount))
+        # endfor
+
+    # enddef
+
+    # #####################################################################################################
+    def _DisplayRestoredJobInfo(self):
+        xLaunch: CJobRegistryLaunch = self._xRestoredLaunch
+        self._labJobSectionTitle.set_text(f"Selected Job: {xLaunch.lLabels[self._iDisplayJobIdx]}")
+
+        dicJobInfo: dict = xLaunch.dicInfo.get(self._iDisplayJobIdx, dict())
+        self._rowJobInfo.clear()
+        with self._rowJobInfo:
+            lCols = [{"name": sTitle, "label": sTitle, "field": sTitle} for sTitle in dicJobInfo]
+            ui.table(columns=lCols, rows=[dicJobInfo], row_key="name")
+        # endwith
+
+    # enddef
+
+    # #####################################################################################################
+    def _CreateJobStatusMap(self, _lStatus: list[int], _lLabels: list[str]):
+        self._rowJobStatus.clear()
+        with self._rowJobStatus:
+            self._uiJobStatusMap = CUiJobStatusMap(
+                _lColors=[self._dicJobStatusColor[eStatus] for eStatus in self._lJobStatus],
+                _lStatusNames=[eStatus.name for eStatus in self._lJobStatus],
+                _funcOnSelect=self._JobShowOutput,
+            ).classes("w-full")
+        # endwith
+        self._uiJobStatusMap.SetAll(_lStatus, _lLabels=_lLabels)
+        self._uiJobStatusMap.Select(self._iDisplayJobIdx)
+        self._UpdateJobStatusCounts()
 
     # enddef
 
@@ -265,29 +434,30 @@ class CJobInfo:
         iJobCnt = self._xActHandler.iJobCount
         self._labStatus.set_text(f"Status: processing {iJobCnt} jobs")
         self._iDisplayJobIdx = 0
-        # iColumns: int = 10
-        # self._rowJobStatus.style(replace=f"grid-template-columns:repeat({iColumns}, minmax(0, 1fr))")
-        # self._rowJobStatus.update()
-        twButStyle = Tailwind().width("1").height("1")
 
-        with self._rowJobStatus:
-            for iJobIdx in range(iJobCnt):
-                butX = ui.button(
-                    icon=self._dicJobStatusIconName[self._xActHandler.GetJobStatus(iJobIdx)],
-                    on_click=self._CreateCallback_JobShowOutput(iJobIdx),
-                )
-                twButStyle.apply(butX)
-                xJobCfg: CConfigExecJob = self._xActHandler.GetJobConfig(iJobIdx)
-                butX.tooltip(f"{xJobCfg.iIdx}: {xJobCfg.sName}")
-                self._lbutJobStatus.append(butX)
-            # endfor
-        # endwith
+        lStatus: list[int] = []
+        lLabels: list[str] = []
+        for iJobIdx in range(iJobCnt):
+            lStatus.append(self._dicJobStatusIndex[self._xActHandler.GetJobStatus(iJobIdx)])
+            xJobCfg: CConfigExecJob = self._xActHandler.GetJobConfig(iJobIdx)
+            lLabels.append(f"{xJobCfg.iIdx}: {xJobCfg.sName}")
+        # endfor
 
-        self._CreateJobOutput()
+        self._CreateJobStatusMap(lStatus, lLabels)
 
-        self._lbutJobStatus[self._iDisplayJobIdx].disable()
-        self._bEnableJobOutputAutoScroll = True
-        self._DisplayJobOutput()
+        lOutTypes = self._xActHandler.GetJobOutputTypes()
+        self._xJobOutput.Create(lOutTypes, iJobCnt)
+        self._CreateJobOutput(lOutTypes)
+        self._DisplayJobOutput(_bReset=True)
+
+        if self._xJobRegistry is not None:
+            self._xJobRegistry.StartLaunch(
+                _lOutputTypes=lOutTypes,
+                _lLabels=lLabels,
+                _lStatus=[self._lJobStatus[iStatus].name for iStatus in lStatus],
+            )
+        # endif
+        self._AdaptJobUpdateInterval(True)
         self._uiTimerJobUpdate.activate()
 
         if self._funcOnStart is not None:
@@ -303,6 +473,9 @@ class CJobInfo:
 
         self._uiTimerJobUpdate.deactivate()
         self._JobsUpdate()
+        if self._xJobRegistry is not None:
+            self._xJobRegistry.EndLaunch()
+        # endif
 
         if self._funcOnEnd is not None:
             self._funcOnEnd()
@@ -312,32 +485,24 @@ class CJobInfo:
 
     # enddef
 
-    # #####################################################################################################
-    def _CreateCallback_JobShowOutput(self, iJobIdx: int):
-        def Callback():
-            self._JobShowOutput(iJobIdx)
-
-        # enddef
-        return Callback
-
-    # enddef
-
     # #####################################################################################################
     def _JobShowOutput(self, iJobIdx: int):
         if iJobIdx == self._iDisplayJobIdx:
             return
         # endif
 
-        self._lbutJobStatus[self._iDisplayJobIdx].enable()
         self._iDisplayJobIdx = iJobIdx
-        self._lbutJobStatus[self._iDisplayJobIdx].disable()
+        self._uiJobStatusMap.Select(self._iDisplayJobIdx)
 
-        xJobCfg: CConfigExecJob = self._xActHandler.GetJobConfig(self._iDisplayJobIdx)
-        self._labJobOutput.set_text(f"Job {xJobCfg.iIdx}: {xJobCfg.sName} [{xJobCfg.sLabel}]")
-        self._bEnableJobOutputAutoScroll = True
+        if self._xRestoredLaunch is not None:
+            self._labJobOutput.set_text(f"Job {self._xRestoredLaunch.lLabels[self._iDisplayJobIdx]}")
+        else:
+            xJobCfg: CConfigExecJob = self._xActHandler.GetJobConfig(self._iDisplayJobIdx)
+            self._labJobOutput.set_text(f"Job {xJobCfg.iIdx}: {xJobCfg.sName} [{xJobCfg.sLabel}]")
+        # endif
 
         self._DisplayJobInfo()
-        self._DisplayJobOutput()
+        self._DisplayJobOutput(_bReset=True)
 
     # enddef
 
@@ -355,8 +520,10 @@ class CJobInfo:
         # endif
         self._butTerminate.enable()
         self._rowJobStatus.clear()
-        self._lbutJobStatus.clear()
-        self._dicJobOutputTypeText.clear()
+        self._uiJobStatusMap = None
+        self._UpdateJobStatusCounts()
+        self._xJobOutput.Clear()
+        self._xRestoredLaunch = None
 
         try:
             await self._xActHandler.Launch(
@@ -379,6 +546,7 @@ class CJobInfo:
     # #####################################################################################################
     def TerminateAll(self):
         self._xActHandler.TerminateAll()
+        self._AdaptJobUpdateInterval(True)
 
     # enddef
 
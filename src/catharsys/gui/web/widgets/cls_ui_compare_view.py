@@ -0,0 +1,114 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+from typing import Callable, Optional
+
+from nicegui import events
+from nicegui.element import Element
+
+from ..util.cls_image_tiles import CImageTileSource
+
+
+# Shows several images, which are served as tile pyramids by CImageTiles, with a common pan and zoom.
+# In the mode 'side' the images are shown next to each other. In the mode 'wipe' the second image
+# is shown on top of the first one, right of the wipe position, which is given as fraction of the view width.
+# A click on the image reports the pixel position below the pointer.
+class CUiCompareView(Element, component="compare_view.js"):
+    def __init__(
+        self,
+        _lSources: list[CImageTileSource],
+        *,
+        _lLabels: Optional[list[str]] = None,
+        _sMode: str = "side",
+        _funcOnPixel: Optional[Callable[[int, int], None]] = None,
+    ):
+        super().__init__()
+        self._props["mode"] = _sMode
+        self._props["wipe"] = 0.5
+        self._props["marker"] = None
+        self.SetSources(_lSources, _lLabels=_lLabels)
+
+        self._funcOnPixel: Optional[Callable[[int, int], None]] = _funcOnPixel
+        self.on("pixel", self._OnPixel, ["x", "y"])
+
+    # enddef
+
+    # #########################################################################
+    def _OnPixel(self, _xArgs: events.GenericEventArguments):
+        if self._funcOnPixel is not None:
+            return self._funcOnPixel(int(_xArgs.args["x"]), int(_xArgs.args["y"]))
+        # endif
+
+    # enddef
+
+    # #########################################################################
+    def SetSources(self, _lSources: list[CImageTileSource], *, _lLabels: Optional[list[str]] = None):
+        self._props["sources"] = [
+            {
+                "src": xSource.sUrl,
+                "width": xSource.iWidth,
+                "height": xSource.iHeight,
+                "tile_size": xSource.iTileSize,
+                "max_level": xSource.iMaxLevel,
+            }
+            for xSource in _lSources
+        ]
+        self._props["labels"] = _lLabels if _lLabels is not None else [""] * len(_lSources)
+        self.update()
+
+    # enddef
+
+    # #########################################################################
+    def SetMode(self, _sMode: str):
+        self._props["mode"] = _sMode
+        self.update()
+
+    # enddef
+
+    # #########################################################################
+    def SetWipe(self, _fWipe: float):
+        self._props["wipe"] = _fWipe
+        self.update()
+
+    # enddef
+
+    # #########################################################################
+    def SetMarker(self, _iX: Optional[int], _iY: Optional[int]):
+        self._props["marker"] = None if _iX is None or _iY is None else {"x": _iX, "y": _iY}
+        self.update()
+
+    # enddef
+
+    # #########################################################################
+    def SetScale(self, _fScale: float):
+        self.run_method("set_scale", _fScale)
+
+    # enddef
+
+    # #########################################################################
+    def Fit(self):
+        self.run_method("fit")
+
+    # enddef
+
+
+# endclass
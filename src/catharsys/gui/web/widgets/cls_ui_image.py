@@ -43,15 +43,23 @@ class CUiImage(Element, component="image.js"):
 
     # enddef
 
+    # Makes the image file available and returns its URL,
+    # which contains the modification time of the file.
+    @staticmethod
+    def GetImageUrl(_pathImage: Path) -> str:
+        iTimeImage: int = int(os.path.getmtime(_pathImage.as_posix()))
+        sUrl = f"/_nicegui/auto/static/{helpers.hash_file_path(_pathImage)}_{iTimeImage}/{_pathImage.name}"
+
+        return ngcore.app.add_static_file(local_file=_pathImage, url_path=sUrl)
+
+    # enddef
+
     def UpdateImage(self, _pathImage):
         if not _pathImage.exists():
             raise RuntimeError(f"Image file does not exist: {_pathImage}")
         # endif
 
-        iTimeImage: int = int(os.path.getmtime(_pathImage.as_posix()))
-        sUrl = f"/_nicegui/auto/static/{helpers.hash_file_path(_pathImage)}_{iTimeImage}/{_pathImage.name}"
-
-        self.source = ngcore.app.add_static_file(local_file=_pathImage, url_path=sUrl)
+        self.source = CUiImage.GetImageUrl(_pathImage)
         self._props["src"] = self.source
         self.update()
 
@@ -0,0 +1,124 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+import base64
+from typing import Callable, Optional
+
+from nicegui import events
+from nicegui.element import Element
+
+
+# Displays the status of many jobs as cells of a canvas. The status of all jobs is sent
+# to the client once as a byte array. Changes are sent in batches as runs of jobs with the same status.
+# Clicking on a cell calls the select handler with the index of the job.
+class CUiJobStatusMap(Element, component="job_status_map.js"):
+    def __init__(
+        self,
+        *,
+        _lColors: list[str],
+        _lStatusNames: list[str],
+        _iCellSize: int = 12,
+        _funcOnSelect: Optional[Callable[[int], None]] = None,
+    ):
+        super().__init__()
+        self._aStatus: bytearray = bytearray()
+        self._props["count"] = 0
+        self._props["status"] = ""
+        self._props["cell_size"] = _iCellSize
+        self._props["colors"] = _lColors
+        self._props["status_names"] = _lStatusNames
+        self._props["labels"] = []
+        self._props["selected"] = -1
+
+        self._funcOnSelect: Optional[Callable[[int], None]] = _funcOnSelect
+        self.on("select", self._OnSelect, ["index"])
+
+    # enddef
+
+    @property
+    def iCount(self) -> int:
+        return len(self._aStatus)
+
+    # enddef
+
+    # #########################################################################
+    def _OnSelect(self, _xArgs: events.GenericEventArguments):
+        if self._funcOnSelect is not None:
+            self._funcOnSelect(int(_xArgs.args["index"]))
+        # endif
+
+    # enddef
+
+    # #########################################################################
+    # Sets the status and the labels of all jobs. The state is sent as properties,
+    # so that it is also shown by a client that has not mounted the element yet.
+    def SetAll(self, _lStatus: list[int], *, _lLabels: Optional[list[str]] = None):
+        self._aStatus = bytearray(_lStatus)
+        self._props["count"] = len(self._aStatus)
+        self._props["status"] = base64.b64encode(bytes(self._aStatus)).decode("ascii")
+        self._props["labels"] = [] if _lLabels is None else _lLabels
+        self.update()
+
+    # enddef
+
+    # #########################################################################
+    # Returns the number of jobs with the given status
+    def GetCount(self, _iStatus: int) -> int:
+        return self._aStatus.count(_iStatus)
+
+    # enddef
+
+    # #########################################################################
+    # Sends the changed status values as runs of consecutive jobs with the same status
+    def Update(self, _dicStatus: dict[int, int]):
+        lRuns: list[list[int]] = []
+        for iIdx in sorted(_dicStatus.keys()):
+            iStatus: int = _dicStatus[iIdx]
+            if self._aStatus[iIdx] == iStatus:
+                continue
+            # endif
+            self._aStatus[iIdx] = iStatus
+            if len(lRuns) > 0 and lRuns[-1][0] + lRuns[-1][1] == iIdx and lRuns[-1][2] == iStatus:
+                lRuns[-1][1] += 1
+            else:
+                lRuns.append([iIdx, 1, iStatus])
+            # endif
+        # endfor
+
+        if len(lRuns) > 0:
+            # Keep the property in sync, so that a reconnecting client shows the current status
+            self._props["status"] = base64.b64encode(bytes(self._aStatus)).decode("ascii")
+            self.run_method("update_runs", lRuns)
+        # endif
+
+    # enddef
+
+    # #########################################################################
+    def Select(self, _iIdx: int):
+        # The property is used by the client when it mounts the element
+        self._props["selected"] = _iIdx
+        self.run_method("select", _iIdx)
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,81 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+from nicegui.element import Element
+
+
+# Append-only text log. Only the text that is pushed is sent to the client,
+# which keeps up to '_iMaxLines' lines and only renders the lines in view.
+# The log follows new text, as long as it is scrolled to the end.
+# The last '_iMaxTailChars' characters are also kept in the properties, so that
+# a client that mounts the element again, e.g. after a reconnect, shows them.
+class CUiLog(Element, component="log_view.js"):
+    def __init__(
+        self,
+        *,
+        _iMaxLines: int = 100000,
+        _iLineHeight: int = 18,
+        _sEmptyText: str = "",
+        _iMaxTailChars: int = 1000000,
+    ):
+        super().__init__()
+        self._iMaxTailChars: int = _iMaxTailChars
+        # Total number of characters pushed, which lets the client skip text it already shows
+        self._iTotalChars: int = 0
+        self._props["max_lines"] = _iMaxLines
+        self._props["line_height"] = _iLineHeight
+        self._props["empty_text"] = _sEmptyText
+        self._props["tail"] = ""
+        self._props["tail_end"] = 0
+
+    # enddef
+
+    def Push(self, _sText: str):
+        if len(_sText) == 0:
+            return
+        # endif
+
+        self._iTotalChars += len(_sText)
+        sTail: str = self._props["tail"] + _sText
+        if len(sTail) > self._iMaxTailChars:
+            sTail = sTail[-self._iMaxTailChars :]
+            # Only keep complete lines
+            iLineStart: int = sTail.find("\n") + 1
+            if iLineStart > 0:
+                sTail = sTail[iLineStart:]
+            # endif
+        # endif
+        self._props["tail"] = sTail
+        self._props["tail_end"] = self._iTotalChars
+        self.run_method("push", _sText, self._iTotalChars)
+
+    # enddef
+
+    def Clear(self):
+        self._props["tail"] = ""
+        self._props["tail_end"] = self._iTotalChars
+        self.run_method("clear")
+
+    # enddef
+
+
+# endclass
@@ -0,0 +1,82 @@
+###
+# Author: Christian Perwass (CR/ADI2.1)
+# <LICENSE id="Apache-2.0">
+#
+#   Image-Render Automation Functions module
+#   Copyright 2023 Robert Bosch GmbH and its subsidiaries
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# </LICENSE>
+###
+
+from typing import Callable, Optional
+
+from nicegui import events
+from nicegui.element import Element
+
+from ..util.cls_image_tiles import CImageTileSource
+
+
+# Zoomable view of an image that is served as tile pyramid by CImageTiles.
+# Only the tiles that cover the visible part of the image at the current zoom level
+# are requested by the client. The image is panned by dragging and zoomed with the mouse wheel.
+class CUiTileView(Element, component="tile_view.js"):
+    def __init__(
+        self,
+        _xSource: CImageTileSource,
+        *,
+        _fScale: float = 1.0,
+        _fMinScale: float = 0.01,
+        _fMaxScale: float = 8.0,
+        _funcOnScale: Optional[Callable[[float], None]] = None,
+    ):
+        super().__init__()
+        self._props["scale"] = _fScale
+        self._props["min_scale"] = _fMinScale
+        self._props["max_scale"] = _fMaxScale
+        self.SetSource(_xSource)
+
+        self._funcOnScale: Optional[Callable[[float], None]] = _funcOnScale
+        self.on("scale", self._OnScale, ["scale"])
+
+    # enddef
+
+    # #########################################################################
+    def _OnScale(self, _xArgs: events.GenericEventArguments):
+        if self._funcOnScale is not None:
+            self._funcOnScale(float(_xArgs.args["scale"]))
+        # endif
+
+    # enddef
+
+    # #########################################################################
+    def SetSource(self, _xSource: CImageTileSource):
+        self._props["src"] = _xSource.sUrl
+        self._props["width"] = _xSource.iWidth
+        self._props["height"] = _xSource.iHeight
+        self._props["tile_size"] = _xSource.iTileSize
+        self._props["max_level"] = _xSource.iMaxLevel
+        self.update()
+
+    # enddef
+
+    # #########################################################################
+    def SetScale(self, _fScale: float):
+        self._props["scale"] = _fScale
+        self.run_method("set_scale", _fScale)
+
+    # enddef
+
+
+# endclass
@@ -22,6 +22,7 @@
 
 import os
 import enum
+import time
 import asyncio
 import functools
 import concurrent
@@ -31,6 +32,7 @@ from nicegui import ui, Tailwind, events
 from typing import Callable, Optional, Union, Any
 
 import ison
+import anytree
 from anybase import config
 from anybase import file as anyfile
 
@@ -45,8 +47,16 @@ from catharsys.api.products.cls_view_dim_node_path import CViewDimNodePath
 
 from .cls_pos_range import CPosRange, EPosRangeStyle
 from ..util.cls_thumbnails import CThumbnails
+from ..util.cls_thumbnail_prewarm import CThumbnailPreWarm
+from ..util.cls_scan_registry import CScanRegistry, TScanKey
+from ..util.cls_scan_dir_times import CScanDirTimes
+from ..util.cls_scan_progress import CScanProgress, CScanProgressState
+from ..util.cls_scan_watcher import CScanWatcher
+from ..util.cls_file_stat_cache import CFileStatCache
+from ..util.cls_artefact_meta_cache import CArtefactMetaCache, CArtefactMetaText, TMetaRequest
 from .cls_message import CMessage, EMessageType
 from .cls_image_viewer import CImageViewer
+from .cls_image_compare_viewer import CImageCompareViewer
 from .cls_bool_group import CUiBoolGroup
 
 
@@ -58,6 +68,9 @@ class ESpecialSelectIds(str, enum.Enum):
 
 
 class CVariantGroupProductView:
+    # Worker threads shared by all views, which provide the thumbnails and meta texts of new cells
+    _xCellWorkers: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
     def __init__(
         self,
         *,
@@ -69,7 +82,24 @@ class CVariantGroupProductView:
         self._uiRowMain: ui.row = _uiRow
         self._uiDrawerImage: ui.drawer = _uiDrawerImage
         self._xVariantGroup: CVariantGroup = _xVariantGroup
-        self._xProdView = CProductView(CVariantGroupProducts(_xVariantGroup=_xVariantGroup))
+        self._xProducts = CVariantGroupProducts(_xVariantGroup=_xVariantGroup)
+        self._xProdView = CProductView(self._xProducts)
+        self._pathProd: Path = None
+
+        # Keys of the scans in the process-wide scan registry, which the group data of this view refers to
+        self._dicScanKeys: dict[str, TScanKey] = dict()
+
+        # In watch mode, the group is rescanned when the directories of the last scan change.
+        # As a rescan walks the whole group, changes are collected until no further changes have been
+        # reported for '_fWatchSettleTime' seconds, or for at most '_fWatchMaxDelay' seconds,
+        # so that a running render does not cause a rescan with every watch interval.
+        self._fWatchInterval: float = 10.0
+        self._fWatchSettleTime: float = 30.0
+        self._fWatchMaxDelay: float = 300.0
+        self._xScanWatcher = CScanWatcher(_fPollInterval=self._fWatchInterval)
+        self._setWatchChangedDirs: set[str] = set()
+        self._fWatchFirstChange: float = 0.0
+        self._fWatchLastChange: float = 0.0
 
         self._funcOnClose: Optional[Callable[[None], None]] = _funcOnClose
 
@@ -77,6 +107,13 @@ class CVariantGroupProductView:
         self._xMessage.uiMain = self._uiRowMain
         self._xImageViewer = CImageViewer()
         self._xImageViewerDialog = CImageViewer()
+        # The images of the current layout in display order, used to step through them in the image viewer
+        self._lViewArtImages: list[tuple[Path, list[str]]] = []
+        self._dicViewArtImageIdx: dict[str, int] = dict()
+        self._iImageViewerIdx: int = -1
+        # Number of images before and after the displayed image that are prefetched
+        self._iImageViewerPrefetch: int = 2
+        self._xImageViewerPrefetchTask: Optional[asyncio.Task] = None
         self._bIsValid: bool = False
 
         self._iBlockOnChangeSelectGroup: int = 0
@@ -95,6 +132,49 @@ class CVariantGroupProductView:
         self._dicArtVarSelectUi: dict[str, dict[str, ui.element]] = None
 
         self._bShowPixinMessage: bool = True
+        # Images selected in the context menu, which are compared in the comparison viewer
+        self._lCompareImages: list[tuple[Path, list[str]]] = []
+
+        # Thumbnails that are not available yet are created in the background,
+        # after the grid has been laid out with placeholder images.
+        self._setBackgroundTasks: set[asyncio.Task] = set()
+        self._lPendingThumbImages: list[tuple[ui.image, Path]] = []
+        self._iViewUpdateId: int = 0
+
+        # Meta texts of artefacts are taken from the cache when a cell is created. The meta data
+        # files of all new cells are then validated and loaded in a worker thread.
+        self._xMetaCache = CArtefactMetaCache()
+        # File status of the scanned artefacts, which is passed to the thumbnail provider
+        self._xArtStats = CFileStatCache()
+        self._lPendingMetaImages: list[tuple[str, ui.image, list[TMetaRequest], Optional[str]]] = []
+
+        # Visibility changes of the cells of the virtual grid, by element id. They are collected for
+        # '_fCellVisibilityDelay' seconds and then applied together, so that the thumbnails and meta texts
+        # of all cells that became visible, e.g. while scrolling, are provided in a single batch.
+        # Values are tuples of the form (cell key, cell, visible, artefact, artefact type, variables, path names).
+        self._dicPendingCellVisibility: dict[
+            int, tuple[str, ui.element, bool, Any, CArtefactType, Optional[dict], list[str]]
+        ] = dict()
+        self._fCellVisibilityDelay: float = 0.05
+
+        # The artefact cells of the current layout by artefact path. When the view is updated,
+        # the cells of artefacts that are still shown are moved to the new layout instead of being recreated.
+        self._dicArtCells: dict[str, ui.element] = dict()
+        self._dicPrevArtCells: dict[str, ui.element] = dict()
+        # The path names the event handlers of each cell refer to. The lists are updated
+        # in place when a cell is moved, as the path names depend on the view dimensions.
+        self._dicArtCellPathNames: dict[str, list[str]] = dict()
+        self._dicPrevArtCellPathNames: dict[str, list[str]] = dict()
+
+        # All images share a single context menu. The artefact it refers to
+        # is set when the context menu event of an image is received.
+        self._uiMenuArt: ui.menu = None
+        self._tMenuArt: Optional[tuple[Path, list[str]]] = None
+        # Count the context menu events of the images and the id at which the menu was last shown.
+        # The 'hide' event of the menu arrives after its transition, so it may belong to an earlier
+        # opening of the menu, when another image has been right-clicked while the menu was open.
+        self._iMenuArtOpenId: int = 0
+        self._iMenuArtShowId: int = 0
 
         self._lViewDimGridColors: list[str] = ["rgb(150, 150, 150)", "rgb(160,160,160)", "rgb(170,170,170)"]
         # self._lViewDimGridColors: list[str] = ["primary", "secondary", "primary"]
@@ -123,6 +203,11 @@ class CVariantGroupProductView:
             self._dicSettings = dict()
         # enddef
 
+        # In the virtual grid only placeholders are created for all artefacts. The content
+        # of a cell is created when it comes close to the viewport and removed when it leaves it.
+        self._bVirtualGrid: bool = self._dicSettings.get("bVirtualGrid", True)
+        self._iVirtualGridMargin: int = 400
+
         self._xParser = ison.Parser({})
 
         pathThumbnails: Path = _xVariantGroup.xProject.xConfig.pathOutput / "thumbnails" / _xVariantGroup.sGroup
@@ -131,6 +216,11 @@ class CVariantGroupProductView:
         self._xThumbnails = CThumbnails(
             _pathThumbnails=pathThumbnails, _pathMain=_xVariantGroup.xProject.xConfig.pathMain
         )
+        self._xThumbPreWarm = CThumbnailPreWarm(self._xThumbnails)
+
+        # The scan reports its progress from a worker thread. The UI samples it with a timer.
+        self._xScanProgress = CScanProgress()
+        self._iScanProgressRevision: int = 0
         self._UpdateThumbImageStyle()
         self.OnCreate()
 
@@ -148,6 +238,7 @@ class CVariantGroupProductView:
         self._dicSettings["dicVgArtTypeVarSel"] = self._dicVgArtTypeVarSel
         self._dicSettings["dicVgViewDimNamesSel"] = self._dicVgViewDimNamesSel
         self._dicSettings["dicVgArtTypeViewDimNamesSel"] = self._dicVgArtTypeViewDimNamesSel
+        self._dicSettings["bVirtualGrid"] = self._bVirtualGrid
 
         anyfile.SaveJson(self._pathSettings, self._dicSettings, iIndent=4)
 
@@ -155,6 +246,12 @@ class CVariantGroupProductView:
 
     # ##########################################################################################################
     def CleanUp(self):
+        self._xThumbPreWarm.Stop()
+        self._xScanWatcher.Stop()
+        for tKey in self._dicScanKeys.values():
+            CScanRegistry.Release(tKey)
+        # endfor
+        self._dicScanKeys.clear()
         self.SaveSettings()
 
     # enddef
@@ -207,6 +304,7 @@ class CVariantGroupProductView:
                     # endwith
                 # endwith
             else:
+                self._pathProd = pathProd
                 self._xProdView.FromFile(pathProd)
 
                 self._iBlockOnChangeSelectGroup += 1
@@ -236,6 +334,15 @@ class CVariantGroupProductView:
                                         self._uiButScan = ui.button(
                                             "Scan Filesystem", on_click=lambda: self.ScanArtefacts(_bForceRescan=True)
                                         )
+                                        self._uiButScanFull = ui.button(
+                                            icon="restart_alt",
+                                            on_click=lambda: self.ScanArtefacts(_bForceRescan=True, _bFullScan=True),
+                                        ).tooltip("Scan file system, even if no changes are detected")
+                                        self._uiSwitchWatch = ui.switch("Watch", on_change=self._OnChangeWatch)
+                                        self._uiSwitchWatch.tooltip("Rescan automatically when artefacts are added")
+                                        self._uiTimerWatch = ui.timer(
+                                            self._fWatchInterval, self._OnTimerWatch, active=False
+                                        )
                                         self._uiLabelScan = ui.label("")
                                         self._uiSpinScan = ui.spinner("dots", size="xl", color="primary")
                                         self._uiSpinScan.set_visibility(False)
@@ -243,6 +350,16 @@ class CVariantGroupProductView:
                                             "instant-feedback"
                                         )
                                         self._uiProgressScan.set_visibility(False)
+                                        self._uiLabelScanRate = ui.label("").classes("text-grey-7")
+                                        self._uiLabelScanRate.set_visibility(False)
+                                        self._uiTimerScanProgress = ui.timer(
+                                            0.1, self._OnTimerScanProgress, active=False
+                                        )
+                                        self._uiLabelPreWarm = ui.label("").classes("text-grey-7")
+                                        self._uiLabelPreWarm.set_visibility(False)
+                                        self._uiTimerPreWarm = ui.timer(
+                                            0.5, self._OnTimerPreWarmProgress, active=False
+                                        )
 
                                         # Close Button if handler is available
                                         if self._funcOnClose is not None:
@@ -297,6 +414,9 @@ class CVariantGroupProductView:
                                             _xValue="10",
                                             _sLabel="Max columns per row",
                                         )
+                                        ui.switch(
+                                            "Lazy Grid", value=self._bVirtualGrid, on_change=self._OnChangeVirtualGrid
+                                        ).tooltip("Only create the images that are close to the visible area")
                                     # endwith
                                     # self._uiGridViewArt = ui.grid().style(
                                     #     "grid-template-columns: 100% 0px; "
@@ -306,7 +426,10 @@ class CVariantGroupProductView:
                                     # # self._uiGridViewArt = ui.row().classes("w-full")
                                     # with self._uiGridViewArt:
                                     #     with ui.scroll_area().style("width: 100vw; height: 100vh; padding: 5px;"):
-                                    self._uiRowViewArt = ui.row().classes("w-full")
+                                    with ui.element("div").classes("w-full"):
+                                        self._uiRowViewArt = ui.row().classes("w-full")
+                                        self._CreateArtContextMenu()
+                                    # endwith
                                     #     endwith
                                     #     self._uiRowViewImg = ui.row().classes("w-full").style("width: 0px; height: 0px;")
                                     # endwith
@@ -376,11 +499,20 @@ class CVariantGroupProductView:
         iSize: int = int(_xArgs.value)
         self._xThumbnails.iTargetWidth = iSize
         self._UpdateThumbImageStyle()
+        self._ClearArtCells()
         # self.UpdateProductView()
         ui.timer(0.2, self.UpdateProductView, once=True)
 
     # enddef
 
+    # ##########################################################################################################
+    def _OnChangeVirtualGrid(self, _xArgs: events.ValueChangeEventArguments):
+        self._bVirtualGrid = bool(_xArgs.value)
+        self._ClearArtCells()
+        ui.timer(0.2, self.UpdateProductView, once=True)
+
+    # enddef
+
     # ##########################################################################################################
     def _CreateSelectUi(
         self,
@@ -406,6 +538,100 @@ class CVariantGroupProductView:
 
     # enddef
 
+    # ##########################################################################################################
+    def _GetScanDirTimesFilename(self, _sGroup: str) -> Path:
+        return self._xVariantGroup.pathVariants / "_cache" / f"fs-scan-{_sGroup}.dirs.json"
+
+    # enddef
+
+    # ##########################################################################################################
+    # Returns the directories the scan of the group is walked from, or None if they are not known.
+    # The top level nodes of the scan tree are the values of the first path variable of the group,
+    # so their parent directories are where new values appear. If only the artefacts of the tree have
+    # file system paths, the roots are not known. If the group data is not loaded, the roots of the
+    # recorded directory times are used. This is called in a worker thread.
+    def _GetScanRoots(self, _sGroup: str) -> Optional[list[str]]:
+        xGroup = self._GetScanGroup(_sGroup)
+        if xGroup is not None and xGroup.xTree is not None:
+            lNodes: list[Any] = [
+                nodeX
+                for nodeX in anytree.PreOrderIter(xGroup.xTree)
+                if isinstance(getattr(nodeX, "pathFS", None), Path)
+            ]
+            if len(lNodes) == 0:
+                return None
+            # endif
+            iMinDepth: int = min(nodeX.depth for nodeX in lNodes)
+            lTopNodes: list[Any] = [nodeX for nodeX in lNodes if nodeX.depth == iMinDepth]
+            if all(nodeX.is_leaf for nodeX in lTopNodes):
+                return None
+            # endif
+            return sorted(set(nodeX.pathFS.parent.as_posix() for nodeX in lTopNodes))
+        # endif
+
+        xDirTimes: Optional[CScanDirTimes] = self._LoadScanDirTimes(_sGroup)
+        if xDirTimes is None or xDirTimes.iDirCount == 0:
+            return None
+        # endif
+        return xDirTimes.lRoots
+
+    # enddef
+
+    # ##########################################################################################################
+    # Records the modification times of all directories below the given roots.
+    # This is called in a worker thread.
+    def _WalkScanDirs(self, _sGroup: str, _lRoots: list[str], *, _iChangedAfter: Optional[int] = None) -> CScanDirTimes:
+        xPrevDirTimes: Optional[CScanDirTimes] = self._LoadScanDirTimes(_sGroup)
+        return CScanDirTimes.FromWalk(
+            _lRoots,
+            _iChangedAfter=_iChangedAfter,
+            _iDirCountHint=0 if xPrevDirTimes is None else xPrevDirTimes.iDirCount,
+            _funcIterInit=self._OnScanIterInit,
+            _funcIterUpdate=self._OnScanIterUpdate,
+        )
+
+    # enddef
+
+    # ##########################################################################################################
+    # Stores the modification times of the scanned directories next to the scan cache. They are
+    # recorded before the scan and passed as '_xDirTimes'. If the roots of the new scan have not been walked
+    # before the scan, they are walked now, and directories modified since the start of the scan
+    # are recorded as changed. If the roots are not known, no times are stored, so that the next
+    # rescan walks the whole group. This is called in a worker thread.
+    def _SaveScanDirTimes(self, _sGroup: str, _xDirTimes: Optional[CScanDirTimes], _iScanStart: int):
+        pathFile: Path = self._GetScanDirTimesFilename(_sGroup)
+        lRoots: Optional[list[str]] = self._GetScanRoots(_sGroup)
+        if lRoots is None:
+            pathFile.unlink(missing_ok=True)
+            return
+        # endif
+
+        xDirTimes: Optional[CScanDirTimes] = _xDirTimes
+        if xDirTimes is None or any(sRoot not in xDirTimes.dicDirTimes for sRoot in lRoots):
+            xDirTimes = self._WalkScanDirs(_sGroup, lRoots, _iChangedAfter=_iScanStart)
+        # endif
+        xDirTimes.Save(pathFile)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _LoadScanDirTimes(self, _sGroup: str) -> Optional[CScanDirTimes]:
+        return CScanDirTimes.Load(self._GetScanDirTimesFilename(_sGroup))
+
+    # enddef
+
+    # ##########################################################################################################
+    # Returns the scanned directories that have changed since the last scan, or None
+    # if no directory times are available. This is called in a worker thread.
+    def _GetChangedScanDirs(self, _sGroup: str) -> Optional[list[str]]:
+        xDirTimes: Optional[CScanDirTimes] = self._LoadScanDirTimes(_sGroup)
+        if xDirTimes is None or xDirTimes.iDirCount == 0:
+            return None
+        # endif
+        return xDirTimes.GetChangedDirs()
+
+    # enddef
+
     # ##########################################################################################################
     def _GetScanCacheFileDateTimeString(self, _sGroup: str) -> Optional[str]:
         pathScanCache: Path = self._GetScanCacheFilename(_sGroup)
@@ -438,58 +664,267 @@ class CVariantGroupProductView:
     # enddef
 
     # ##########################################################################################################
+    # The scan callbacks are called from the scan worker thread.
+    # They only update the scan progress, which is displayed by '_OnTimerScanProgress'.
     def _OnScanStatus(self, _sStatus: str):
-        self._uiLabelScan.set_text(_sStatus)
+        self._xScanProgress.SetStatus(_sStatus)
 
     # enddef
 
     # ##########################################################################################################
     def _OnScanIterInit(self, _sTitle: str, _iMax: int):
-        self._uiLabelScan.set_text(_sTitle)
-        self._uiProgressScan.set_visibility(True)
-        self._uiProgressScan.set_value(0)
-        self._iScanIdx: int = 0
-        self._iScanCount: int = _iMax
+        self._xScanProgress.IterInit(_sTitle, _iMax)
 
     # enddef
 
     # ##########################################################################################################
     def _OnScanIterUpdate(self, _iInc: int, _bEnd: bool = False):
-        self._iScanIdx += _iInc
-        self._uiProgressScan.set_value(self._iScanIdx / self._iScanCount)
-        if _bEnd:
+        self._xScanProgress.IterUpdate(_iInc, _bEnd)
+
+    # enddef
+
+    # ##########################################################################################################
+    @staticmethod
+    def _FormatDuration(_fSeconds: float) -> str:
+        iSeconds: int = int(round(_fSeconds))
+        if iSeconds < 60:
+            return f"{iSeconds}s"
+        elif iSeconds < 3600:
+            return f"{iSeconds // 60}m {iSeconds % 60:02d}s"
+        # endif
+        return f"{iSeconds // 3600}h {(iSeconds % 3600) // 60:02d}m"
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnTimerScanProgress(self):
+        xState: CScanProgressState = self._xScanProgress.Sample()
+        if xState.iRevision != self._iScanProgressRevision:
+            self._iScanProgressRevision = xState.iRevision
+            self._uiLabelScan.set_text(xState.sStatus)
+        # endif
+
+        if xState.bIterActive is False:
             self._uiProgressScan.set_visibility(False)
+            self._uiLabelScanRate.set_visibility(False)
+            return
+        # endif
+
+        self._uiProgressScan.set_visibility(True)
+        self._uiProgressScan.set_value(xState.iDone / xState.iMax if xState.iMax > 0 else 0)
+
+        sRate: str = f"{xState.iDone} / {xState.iMax}, {xState.fRate:.0f} files/s"
+        if xState.fEta is not None:
+            sRate += f", ETA {self._FormatDuration(xState.fEta)}"
+        # endif
+        self._uiLabelScanRate.set_text(sRate)
+        self._uiLabelScanRate.set_visibility(True)
+
+    # enddef
+
+    # ##########################################################################################################
+    # The group data of a scan may be shared with other views via the scan registry.
+    # The catharsys products API has no public methods to get or exchange the data of a single group,
+    # so 'CProducts.dicGroups' is only accessed by '_GetScanGroup', '_SetScanGroup' and '_DetachScanGroup'.
+    # A view that takes the group data from the registry does not call 'CProductView.DeserializeScan'.
+    # This assumes that 'DeserializeScan' only sets the group data and no other state of the product view
+    # or the products. The assumption is checked by '_DeserializeScan' for every scan that is loaded.
+    # If it does not hold, scans are no longer shared and every view deserializes its scans itself.
+    _bCanShareScans: bool = True
+
+    # ##########################################################################################################
+    def _GetScanGroup(self, _sGroup: str) -> Any:
+        return self._xProducts.dicGroups.get(_sGroup)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _SetScanGroup(self, _sGroup: str, _xGroup: Any):
+        self._xProducts.dicGroups[_sGroup] = _xGroup
+
+    # enddef
+
+    # ##########################################################################################################
+    # Returns the identity and size of the attributes of an object, to detect changes of its state
+    @staticmethod
+    def _GetStateSignature(_xObject: Any) -> dict[str, tuple[int, int]]:
+        return {
+            sName: (id(xValue), len(xValue) if isinstance(xValue, (dict, list, set, tuple)) else -1)
+            for sName, xValue in vars(_xObject).items()
+        }
+
+    # enddef
+
+    # ##########################################################################################################
+    # Deserializes the scan of the group and returns the group data, or None if
+    # deserializing the scan has changed any state that is not part of the group data.
+    # This is called in a worker thread.
+    def _DeserializeScan(self, _sGroup: str) -> Any:
+        dicViewState = self._GetStateSignature(self._xProdView)
+        dicProductsState = self._GetStateSignature(self._xProducts)
+        self._xProdView.DeserializeScan(self._GetScanCacheFilename(_sGroup), _bDoPrint=False)
+
+        if (
+            dicViewState != self._GetStateSignature(self._xProdView)
+            or dicProductsState != self._GetStateSignature(self._xProducts)
+        ) and CVariantGroupProductView._bCanShareScans is True:
+            print("WARNING: Loading a scan changes the state of the product view, scans are not shared between views")
+            CVariantGroupProductView._bCanShareScans = False
+        # endif
+
+        if CVariantGroupProductView._bCanShareScans is False:
+            return None
         # endif
+        return self._GetScanGroup(_sGroup)
 
     # enddef
 
     # ##########################################################################################################
-    async def ScanArtefacts(self, *, _bForceRescan: bool = False):
+    # Before the data of a group is loaded or scanned again, this view switches to
+    # new product instances, so that the shared data is not modified.
+    def _DetachScanGroup(self, _sGroup: str):
+        tKey: TScanKey = self._dicScanKeys.pop(_sGroup, None)
+        if tKey is None:
+            return
+        # endif
+
+        xProducts = CVariantGroupProducts(_xVariantGroup=self._xVariantGroup)
+        xProdView = CProductView(xProducts)
+        xProdView.FromFile(self._pathProd)
+        for sGroup, xGroup in self._xProducts.dicGroups.items():
+            if sGroup != _sGroup:
+                xProducts.dicGroups[sGroup] = xGroup
+            # endif
+        # endfor
+
+        self._xProducts = xProducts
+        self._xProdView = xProdView
+        CScanRegistry.Release(tKey)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _GetScanKey(self, _sGroup: str) -> TScanKey:
+        pathScanCache: Path = self._GetScanCacheFilename(_sGroup)
+        return (self._xVariantGroup.pathGroup.as_posix(), _sGroup, pathScanCache.stat().st_mtime_ns)
+
+    # enddef
+
+    # ##########################################################################################################
+    # Loads the scan of the group from the scan cache, or takes it from the scan registry
+    # if another view has already loaded it. This is called in a worker thread.
+    def _LoadSharedScan(self, _sGroup: str):
+        tKey: TScanKey = self._GetScanKey(_sGroup)
+
+        # If the scan could not be shared, the registry holds no group data
+        # and each view deserializes the scan itself in '_DeserializeScan'.
+        bLoaded: bool = False
+
+        def LoadScan():
+            nonlocal bLoaded
+            bLoaded = True
+            return self._DeserializeScan(_sGroup)
+
+        # enddef
+
+        xGroup = CScanRegistry.Acquire(tKey, LoadScan)
+        if bLoaded is False:
+            self._SetScanGroup(_sGroup, xGroup)
+        # endif
+        self._dicScanKeys[_sGroup] = tKey
+
+    # enddef
+
+    # ##########################################################################################################
+    # Makes a scan of this view available to other views
+    def _PublishScan(self, _sGroup: str):
+        tKey: TScanKey = self._GetScanKey(_sGroup)
+        xGroup = self._GetScanGroup(_sGroup) if CVariantGroupProductView._bCanShareScans is True else None
+        xSharedGroup = CScanRegistry.Acquire(tKey, lambda: xGroup)
+        if xSharedGroup is not None:
+            self._SetScanGroup(_sGroup, xSharedGroup)
+        # endif
+        self._dicScanKeys[_sGroup] = tKey
+
+    # enddef
+
+    # ##########################################################################################################
+    # A forced rescan only walks the file system, if one of the directories of the last scan
+    # has changed since, unless '_bFullScan' is True.
+    async def ScanArtefacts(
+        self, *, _bForceRescan: bool = False, _bFullScan: bool = False, _bKeepViewCells: bool = False
+    ):
         if self._iBlockScanArtefacts == 0:
             self._iBlockScanArtefacts += 1
             self._uiButScan.disable()
+            self._uiButScanFull.disable()
             self._uiButUpdateView.disable()
             # self._uiButScan.set_visibility(False)
             self._uiSpinScan.set_visibility(True)
             try:
                 sSelGrp = str(self._uiSelGrp.value)
                 pathScanCache: Path = self._GetScanCacheFilename(sSelGrp)
-                if pathScanCache.exists() and _bForceRescan is False:
+                bRescan: bool = _bForceRescan or not pathScanCache.exists()
+
+                lScanRoots: Optional[list[str]] = None
+                if bRescan is True:
+                    xLoop = asyncio.get_running_loop()
+                    with concurrent.futures.ThreadPoolExecutor() as xPool:
+                        lScanRoots = await xLoop.run_in_executor(xPool, lambda: self._GetScanRoots(sSelGrp))
+                    # endwith
+                # endif
+
+                if bRescan is True and _bFullScan is False and pathScanCache.exists():
+                    self._uiLabelScan.set_text("Checking for changes...")
+                    xLoop = asyncio.get_running_loop()
+                    with concurrent.futures.ThreadPoolExecutor() as xPool:
+                        lChangedDirs = await xLoop.run_in_executor(xPool, lambda: self._GetChangedScanDirs(sSelGrp))
+                    # endwith
+                    if lChangedDirs is not None and len(lChangedDirs) == 0:
+                        bRescan = False
+                        self._xMessage.ShowMessage(
+                            "No changes found since last scan", _eType=EMessageType.INFO, _bDialog=False
+                        )
+                    # endif
+                # endif
+
+                if bRescan is False and self._dicScanKeys.get(sSelGrp) == self._GetScanKey(sSelGrp):
+                    # The scan of the cache file is already loaded
+                    pass
+                elif bRescan is False:
                     # print(f"Loading scan cache from: {pathScanCache}")
+                    self._DetachScanGroup(sSelGrp)
+                    self._xArtStats.Clear()
+                    self._xMetaCache.ClearRequests()
                     self._uiLabelScan.set_text("Loading scan from cache...")
                     xLoop = asyncio.get_running_loop()
                     with concurrent.futures.ThreadPoolExecutor() as xPool:
-                        await xLoop.run_in_executor(
-                            xPool, lambda: self._xProdView.DeserializeScan(pathScanCache, _bDoPrint=False)
-                        )
+                        await xLoop.run_in_executor(xPool, lambda: self._LoadSharedScan(sSelGrp))
                     # endwith
                 else:
                     # print(f"Scanning filesystem for artefacts in group: {sSelGrp}")
+                    self._DetachScanGroup(sSelGrp)
+                    self._xArtStats.Clear()
+                    self._xMetaCache.ClearRequests()
                     self._uiLabelScan.set_text("Scanning file system...")
                     pathScanCache.parent.mkdir(parents=True, exist_ok=True)
+                    self._xScanProgress.Reset()
+                    self._iScanProgressRevision = self._xScanProgress.Sample().iRevision
+                    self._uiTimerScanProgress.activate()
 
                     xLoop = asyncio.get_running_loop()
                     with concurrent.futures.ThreadPoolExecutor() as xPool:
+                        # The directory times are recorded before the scan, so that changes during the scan
+                        # are detected by the next rescan. Walking the directories in parallel also fills
+                        # the directory caches of network file systems for the sequential scan.
+                        iScanStart: int = time.time_ns()
+                        xDirTimes: Optional[CScanDirTimes] = None
+                        if lScanRoots is not None:
+                            xDirTimes = await xLoop.run_in_executor(
+                                xPool, lambda: self._WalkScanDirs(sSelGrp, lScanRoots)
+                            )
+                        # endif
+                        self._uiLabelScan.set_text("Scanning file system...")
                         await xLoop.run_in_executor(
                             xPool,
                             lambda: self._xProdView.ScanArtefacts(
@@ -500,7 +935,14 @@ class CVariantGroupProductView:
                             ),
                         )
                         await xLoop.run_in_executor(xPool, lambda: self._xProdView.SerializeScan(pathScanCache))
+                        await xLoop.run_in_executor(
+                            xPool, lambda: self._SaveScanDirTimes(sSelGrp, xDirTimes, iScanStart)
+                        )
                     # endwith
+                    self._uiTimerScanProgress.deactivate()
+                    self._uiProgressScan.set_visibility(False)
+                    self._uiLabelScanRate.set_visibility(False)
+                    self._PublishScan(sSelGrp)
                 # endif
                 lMessages = self._xProdView.GetMessages()
                 for sMessage in lMessages:
@@ -511,16 +953,27 @@ class CVariantGroupProductView:
                 self._uiLabelScan.set_text("Processing scan...")
                 await self.UpdateGroup()
                 self._UpdateScanCacheLabel()
+                if _bKeepViewCells is False:
+                    self._ClearArtCells()
+                # endif
+                self._StartThumbnailPreWarm(sSelGrp)
+                if self._uiSwitchWatch.value is True:
+                    await self._StartScanWatcher(sSelGrp)
+                # endif
 
             except Exception as xEx:
                 self._xMessage.ShowException("Error scanning artefacts", xEx)
 
             finally:
                 # print("finally start...")
+                self._uiTimerScanProgress.deactivate()
+                self._uiProgressScan.set_visibility(False)
+                self._uiLabelScanRate.set_visibility(False)
                 self._uiSpinScan.set_visibility(False)
                 # self._uiButScan.set_visibility(True)
                 self._uiButUpdateView.enable()
                 self._uiButScan.enable()
+                self._uiButScanFull.enable()
                 self._iBlockScanArtefacts -= 1
                 # print("finally end...")
             # endtry
@@ -529,6 +982,168 @@ class CVariantGroupProductView:
 
     # enddef
 
+    # ##########################################################################################################
+    # Returns the paths of all image artefacts of the last scan of the given group.
+    # This is called from the pre-warm thread.
+    def _GetScanImagePaths(self, _sGroup: str) -> list[Path]:
+        return self._GetScanPaths(_sGroup, _lSuffixes=CThumbnails.lImageSuffixes)
+
+    # enddef
+
+    # ##########################################################################################################
+    # Returns the paths of all nodes of the last scan of the given group.
+    # If suffixes are given, only paths with one of these suffixes are returned.
+    def _GetScanPaths(self, _sGroup: str, *, _lSuffixes: Optional[list[str]] = None) -> list[Path]:
+        xGroup = self._GetScanGroup(_sGroup)
+        if xGroup is None or xGroup.xTree is None:
+            return []
+        # endif
+
+        lPaths: list[Path] = []
+        for nodeX in anytree.PreOrderIter(xGroup.xTree):
+            pathFS = getattr(nodeX, "pathFS", None)
+            if isinstance(pathFS, Path) and (_lSuffixes is None or pathFS.suffix in _lSuffixes):
+                lPaths.append(pathFS)
+            # endif
+        # endfor
+        return lPaths
+
+    # enddef
+
+    # ##########################################################################################################
+    # Creates the thumbnails of all scanned images in the background,
+    # so that they are available when the product view is displayed.
+    def _StartThumbnailPreWarm(self, _sGroup: str):
+        self._xThumbPreWarm.Start(functools.partial(self._GetScanImagePaths, _sGroup))
+        self._uiLabelPreWarm.set_text("Collecting thumbnails...")
+        self._uiLabelPreWarm.set_visibility(True)
+        self._uiTimerPreWarm.activate()
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnTimerPreWarmProgress(self):
+        xPreWarm = self._xThumbPreWarm
+        if xPreWarm.bIsCollecting is True:
+            return
+        # endif
+
+        if xPreWarm.bIsRunning is False:
+            self._uiTimerPreWarm.deactivate()
+            self._uiLabelPreWarm.set_visibility(False)
+            if xPreWarm.iErrors > 0:
+                with self._uiRowMain:
+                    self._xMessage.ShowMessage(
+                        f"Error creating {xPreWarm.iErrors} of {xPreWarm.iTotal} thumbnails",
+                        _eType=EMessageType.WARNING,
+                        _bDialog=False,
+                    )
+                # endwith
+            # endif
+            return
+        # endif
+
+        self._uiLabelPreWarm.set_text(f"Thumbnails: {xPreWarm.iDone} / {xPreWarm.iTotal}")
+
+    # enddef
+
+    # ##########################################################################################################
+    # Watches all directories of the last scan of the given group, from the scan roots down, so that new
+    # sub-directories at any level are reported as change of their parent. If the directories below the
+    # roots have not been recorded, the parent directories of the artefacts and all their ancestors up
+    # to their common directory are watched.
+    async def _StartScanWatcher(self, _sGroup: str):
+        def GetWatchDirs() -> tuple[list[str], set[str]]:
+            lPaths: list[Path] = self._GetScanPaths(_sGroup)
+            setSuffixes: set[str] = set(pathX.suffix for pathX in lPaths if pathX.suffix != "")
+
+            xDirTimes: Optional[CScanDirTimes] = self._LoadScanDirTimes(_sGroup)
+            if xDirTimes is not None and xDirTimes.iDirCount > 0:
+                return sorted(xDirTimes.lDirs), setSuffixes
+            # endif
+
+            setDirs: set[str] = set(pathX.parent.as_posix() for pathX in lPaths)
+            if len(setDirs) > 1:
+                sCommonDir: str = Path(os.path.commonpath(list(setDirs))).as_posix()
+                for sDir in list(setDirs):
+                    while sDir != sCommonDir and sDir != os.path.dirname(sDir):
+                        sDir = os.path.dirname(sDir)
+                        setDirs.add(sDir)
+                    # endwhile
+                # endfor
+            # endif
+            return sorted(setDirs), setSuffixes
+
+        # enddef
+
+        xLoop = asyncio.get_running_loop()
+        with concurrent.futures.ThreadPoolExecutor() as xPool:
+            lDirs, setSuffixes = await xLoop.run_in_executor(xPool, GetWatchDirs)
+            await xLoop.run_in_executor(xPool, lambda: self._xScanWatcher.Start(lDirs, setSuffixes))
+        # endwith
+
+    # enddef
+
+    # ##########################################################################################################
+    async def _OnChangeWatch(self, _xArgs: events.ValueChangeEventArguments):
+        if _xArgs.value is True:
+            await self._StartScanWatcher(str(self._uiSelGrp.value))
+            self._uiTimerWatch.activate()
+        else:
+            self._uiTimerWatch.deactivate()
+            self._xScanWatcher.Stop()
+            self._setWatchChangedDirs = set()
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    async def _OnTimerWatch(self):
+        if self._iBlockScanArtefacts > 0:
+            return
+        # endif
+
+        fNow: float = time.monotonic()
+        setNewChangedDirs: set[str] = self._xScanWatcher.PopChanges()
+        if len(setNewChangedDirs) > 0:
+            if len(self._setWatchChangedDirs) == 0:
+                self._fWatchFirstChange = fNow
+            # endif
+            self._fWatchLastChange = fNow
+            self._setWatchChangedDirs.update(setNewChangedDirs)
+        # endif
+
+        if len(self._setWatchChangedDirs) == 0:
+            return
+        # endif
+
+        if (
+            fNow - self._fWatchLastChange < self._fWatchSettleTime
+            and fNow - self._fWatchFirstChange < self._fWatchMaxDelay
+        ):
+            self._uiLabelScan.set_text(
+                f"Changes in {len(self._setWatchChangedDirs)} directories, rescanning when writing has settled"
+            )
+            return
+        # endif
+
+        setChangedDirs: set[str] = self._setWatchChangedDirs
+        self._setWatchChangedDirs = set()
+
+        # Cells of artefacts in changed directories are created anew, all others are kept
+        lKeys: list[str] = [sKey for sKey in self._dicArtCells if os.path.dirname(sKey) in setChangedDirs]
+        for sKey in lKeys:
+            del self._dicArtCells[sKey]
+            self._dicArtCellPathNames.pop(sKey, None)
+        # endfor
+
+        await self.ScanArtefacts(_bForceRescan=True, _bFullScan=True, _bKeepViewCells=True)
+        if len(self._uiRowViewArt.default_slot.children) > 0:
+            await self.UpdateProductView()
+        # endif
+
+    # enddef
+
     # ##########################################################################################################
     def _OnChangeSelectGroup(self, _xArgs: events.ValueChangeEventArguments):
         if self._iBlockOnChangeSelectGroup == 0:
@@ -542,6 +1157,12 @@ class CVariantGroupProductView:
     async def _OnAsyncChangeSelectGroup(self, _xArgs: events.ValueChangeEventArguments):
         if self._iBlockOnChangeSelectGroup == 0:
             await self.UpdateGroup()
+            if self._uiSwitchWatch.value is True:
+                # Changes of the previous group must not trigger a rescan of the newly selected group
+                await self._StartScanWatcher(str(self._uiSelGrp.value))
+                self._xScanWatcher.PopChanges()
+                self._setWatchChangedDirs = set()
+            # endif
         # enddef
 
     # enddef
@@ -1346,14 +1967,43 @@ class CVariantGroupProductView:
             # print(f"iViewDimCnt: {iViewDimCnt}")
             # print(f"{self._lMaxColsPerBlock}")
 
+            self._iViewUpdateId += 1
+            self._lPendingThumbImages = []
+            self._lPendingMetaImages = []
+
             if xViewDimNode is None:
                 self._xMessage.ShowMessage("No artefacts available", _eType=EMessageType.WARNING)
                 self._uiRowViewArt.clear()
+                self._ClearArtCells()
             else:
-                self._uiRowViewArt.clear()
+                # The new layout is built next to the current one, taking over the cells
+                # of all artefacts that are still shown. Afterwards, the current layout
+                # is removed together with the cells that are no longer needed.
+                self._dicPrevArtCells = self._dicArtCells
+                self._dicArtCells = dict()
+                self._dicPrevArtCellPathNames = self._dicArtCellPathNames
+                self._dicArtCellPathNames = dict()
+                self._lViewArtImages = []
+                self._dicViewArtImageIdx = dict()
+                lPrevElements: list[ui.element] = list(self._uiRowViewArt.default_slot.children)
+
                 with self._uiRowViewArt:
-                    await self._ShowViewDimRow(_xViewDimNode=xViewDimNode)
+                    uiView = ui.element("div").classes("w-full")
+                    uiView.set_visibility(False)
+                    with uiView:
+                        await self._ShowViewDimRow(_xViewDimNode=xViewDimNode)
+                    # endwith
                 # endwith
+
+                for uiElement in lPrevElements:
+                    self._uiRowViewArt.remove(uiElement)
+                # endfor
+                self._dicPrevArtCells = dict()
+                self._dicPrevArtCellPathNames = dict()
+                uiView.set_visibility(True)
+
+                self._StartProvidePendingThumbnails()
+                self._StartProvidePendingMeta()
             # endif
         except Exception as xEx:
             self._xMessage.ShowException("Error updating view", xEx)
@@ -1844,113 +2494,207 @@ class CVariantGroupProductView:
         self._sThumbImageStyle = f"min-width: {iMinWidth}px; max-width: {iMaxWidth}px; height: 100%; width: 100%;"
         # f"min-height: {iMinHeight}px; max-height: {iMaxHeight}px"
 
+        # Placeholder size of the cells of the virtual grid
+        self._sThumbCellStyle = f"min-width: {self._xThumbnails.iTargetWidth}px; min-height: {iMinWidth}px;"
+
     # enddef
 
     # ##########################################################################################################
     async def _ShowViewDimArt(self):
         ndArt, xArtType = self._xProdView.GetViewDimNodeIterationValue()
+
+        sCellKey: Optional[str] = None
+        if ndArt is not None:
+            sCellKey = ndArt.pathFS.as_posix()
+            if ndArt.pathFS.suffix in CThumbnails.lImageSuffixes and sCellKey not in self._dicViewArtImageIdx:
+                self._dicViewArtImageIdx[sCellKey] = len(self._lViewArtImages)
+                self._lViewArtImages.append((ndArt.pathFS, ndArt.lPathNames.copy()))
+            # endif
+            uiCell: ui.element = self._dicPrevArtCells.pop(sCellKey, None)
+            lPathNames: Optional[list[str]] = self._dicPrevArtCellPathNames.pop(sCellKey, None)
+            if uiCell is not None and lPathNames is not None:
+                uiCell.move()
+                lPathNames[:] = ndArt.lPathNames
+                self._dicArtCellPathNames[sCellKey] = lPathNames
+                # The thumbnail of the cell may not have been set before the previous layout was replaced.
+                # Cells of the virtual grid contain the image, if they have been created.
+                uiImage: ui.image = None
+                if isinstance(uiCell, ui.image):
+                    uiImage = uiCell
+                else:
+                    uiImage = next((x for x in uiCell.default_slot.children if isinstance(x, ui.image)), None)
+                # endif
+                if uiImage is not None and not uiImage.source:
+                    self._lPendingThumbImages.append((uiImage, ndArt.pathFS))
+                # endif
+                self._dicArtCells[sCellKey] = uiCell
+                return
+            # endif
+        # endif
+
+        if ndArt is None:
+            self._CreateArtCell(ndArt, xArtType, self._xProdView.dicVarValues, [])
+            return
+        # endif
+
+        lPathNames = ndArt.lPathNames.copy()
+        self._dicArtCellPathNames[sCellKey] = lPathNames
+        if self._bVirtualGrid is False:
+            self._dicArtCells[sCellKey] = self._CreateArtCell(ndArt, xArtType, self._xProdView.dicVarValues, lPathNames)
+            return
+        # endif
+
+        # The cell content is created later, so the current variable values are copied
+        dicVars: Optional[dict] = None
+        if xArtType.dicMeta is not None:
+            dicVars = dict(self._xProdView.dicVarValues)
+        # endif
+
+        uiCell = ui.element("q-intersection").props(f'margin="{self._iVirtualGridMargin}px"')
+        uiCell.style(f"padding: 3px;justify-self: center;align-self: center;{self._sThumbCellStyle}")
+        uiCell.on(
+            "visibility",
+            functools.partial(self._OnArtCellVisibility, sCellKey, uiCell, ndArt, xArtType, dicVars, lPathNames),
+        )
+        self._dicArtCells[sCellKey] = uiCell
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnArtCellVisibility(
+        self,
+        _sCellKey: str,
+        _uiCell: ui.element,
+        _ndArt: Any,
+        _xArtType: CArtefactType,
+        _dicVars: Optional[dict],
+        _lPathNames: list[str],
+        _xArgs: events.GenericEventArguments,
+    ):
+        bVisible: bool = bool(_xArgs.args[0] if isinstance(_xArgs.args, list) else _xArgs.args)
+        if len(self._dicPendingCellVisibility) == 0:
+            asyncio.get_running_loop().call_later(self._fCellVisibilityDelay, self._ApplyCellVisibility)
+        # endif
+        self._dicPendingCellVisibility[_uiCell.id] = (
+            _sCellKey,
+            _uiCell,
+            bVisible,
+            _ndArt,
+            _xArtType,
+            _dicVars,
+            _lPathNames,
+        )
+
+    # enddef
+
+    # ##########################################################################################################
+    def _ApplyCellVisibility(self):
+        dicPending = self._dicPendingCellVisibility
+        self._dicPendingCellVisibility = dict()
+
+        try:
+            for sCellKey, uiCell, bVisible, ndArt, xArtType, dicVars, lPathNames in dicPending.values():
+                # Skip cells that have been removed from the view in the meantime
+                if self._dicArtCells.get(sCellKey) is not uiCell and self._dicPrevArtCells.get(sCellKey) is not uiCell:
+                    continue
+                # endif
+
+                bHasContent: bool = len(uiCell.default_slot.children) > 0
+                if bVisible is True and bHasContent is False:
+                    with uiCell:
+                        self._CreateArtCell(ndArt, xArtType, dicVars, lPathNames)
+                    # endwith
+                elif bVisible is False and bHasContent is True:
+                    uiCell.clear()
+                # endif
+            # endfor
+
+            self._StartProvidePendingThumbnails()
+            self._StartProvidePendingMeta()
+        except Exception as xEx:
+            with self._uiRowMain:
+                self._xMessage.ShowException("Error showing artefacts", xEx)
+            # endwith
+        # endtry
+
+    # enddef
+
+    # ##########################################################################################################
+    # Creates the content of an artefact cell and returns its top level element.
+    # The event handlers of the cell refer to the given list of path names.
+    def _CreateArtCell(
+        self, _ndArt: Any, _xArtType: CArtefactType, _dicVars: Optional[dict], _lPathNames: list[str]
+    ) -> ui.element:
+        ndArt = _ndArt
+        xArtType = _xArtType
         sStyleItem: str = "padding: 3px;justify-self: center;align-self: center;"
+        uiCell: ui.element = None
 
         if ndArt is None:
-            ui.icon("report_problem", size="xl").style(sStyleItem)
+            uiCell = ui.icon("report_problem", size="xl").style(sStyleItem)
         else:
-            pathThumb: Path = None
             pathArt: Path = ndArt.pathFS
-            lPathNames: list[str] = ndArt.lPathNames.copy()
+            lPathNames: list[str] = _lPathNames
             sTooltip: str = None
-            sBelow: str = None
+            lMetaRequests: list[TMetaRequest] = []
 
             if xArtType.dicMeta is not None:
-                for sMetaId, dicMetaData in xArtType.dicMeta.items():
-                    dicDti = config.CheckConfigType(dicMetaData, "/catharsys/production/artefact/meta/*:*")
-                    if dicDti["bOK"] is True:
-                        lMetaType = dicDti["lCfgType"][4:]
-                        if lMetaType[0] == "json":
-                            dicVars = self._xProdView.dicVarValues
-                            self._xParser.dicVarData.clear()
-                            lResult = self._xParser.Process(
-                                dicMetaData, lProcessPaths=["sRelPath"], dicConstVars=dicVars
-                            )
-                            # print(lResult)
-                            pathJson: Path = pathArt.parent / lResult[0]["sRelPath"]
-                            # print(pathJson)
-                            if pathJson.exists():
-                                dicData = anyfile.LoadJson(pathJson)
-                                sExpectDti: str = dicMetaData.get("sExpectDti")
-                                if sExpectDti is not None and not config.IsConfigType(dicData, sExpectDti):
-                                    continue
-                                # endif
-
-                                # ##################################################
-                                # PRINT Meta Text block
-                                dicPrint: dict = dicMetaData.get("mPrint")
-                                if isinstance(dicPrint, dict):
-                                    # print(dicData)
-                                    dicProcPrint = self._xParser.Process(dicPrint, dicConstVars={"meta_data": dicData})
-                                    # print(dicProcPrint)
-                                    if "tooltip" in dicProcPrint:
-                                        sTooltip = "</br>".join(dicProcPrint["tooltip"]["lLines"])
-                                        # print(sTooltip)
-                                    # endif
-                                    if "below" in dicProcPrint:
-                                        sBelow = "</br>".join(dicProcPrint["below"]["lLines"])
-                                        # print(sTooltip)
-                                    # endif
-                                # endif
-                                # ##################################################
-
+                # The processed meta data definitions are cached per artefact
+                lCachedRequests: Optional[list[TMetaRequest]] = self._xMetaCache.GetRequests(pathArt)
+                if lCachedRequests is not None:
+                    lMetaRequests = lCachedRequests
+                else:
+                    for sMetaId, dicMetaData in xArtType.dicMeta.items():
+                        dicDti = config.CheckConfigType(dicMetaData, "/catharsys/production/artefact/meta/*:*")
+                        if dicDti["bOK"] is True:
+                            lMetaType = dicDti["lCfgType"][4:]
+                            if lMetaType[0] == "json":
+                                self._xParser.dicVarData.clear()
+                                lResult = self._xParser.Process(
+                                    dicMetaData, lProcessPaths=["sRelPath"], dicConstVars=_dicVars
+                                )
+                                # print(lResult)
+                                pathJson: Path = pathArt.parent / lResult[0]["sRelPath"]
+                                # print(pathJson)
+                                lMetaRequests.append((pathJson, sMetaId, dicMetaData))
                             # endif
                         # endif
-                    # endif
-                # endfor
+                    # endfor
+                    self._xMetaCache.PutRequests(pathArt, lMetaRequests)
+                # endif
+
+                # Use the cached meta text, if available. The meta data files are validated later.
+                xMetaText: Optional[CArtefactMetaText] = self._xMetaCache.Get(lMetaRequests)
+                if xMetaText is not None:
+                    sTooltip = xMetaText.sTooltip
+                # endif
             # endif
 
-            if pathArt.suffix in [".png", ".jpg", ".exr"]:
-                pathThumb = self._xThumbnails.ProvideThumbnailPath(pathArt, _bCreateOnDemand=False)
-                if pathThumb is None:
-                    xLoop = asyncio.get_running_loop()
-                    with concurrent.futures.ThreadPoolExecutor() as xPool:
-                        pathThumb = await xLoop.run_in_executor(
-                            xPool,
-                            lambda: self._xThumbnails.ProvideThumbnailPath(pathArt),
-                        )
-                    # endwith
+            if pathArt.suffix in CThumbnails.lImageSuffixes:
+                # The file status is queried in a worker thread the first time a thumbnail is requested.
+                # Afterwards it is passed to the thumbnail provider, so no file system access is needed here.
+                xStat: Optional[os.stat_result] = self._xArtStats.Get(pathArt)
+                sThumbUrl: Optional[str] = None
+                if xStat is not None:
+                    sThumbUrl = self._xThumbnails.ProvideThumbnailUrl(pathArt, _xStat=xStat)
                 # endif
 
-                with ui.image(pathThumb.as_posix()).style("padding: 3px;") as uiImage:
+                with ui.image(sThumbUrl or "").style("padding: 3px;") as uiImage:
+                    uiCell = uiImage
+                    if sThumbUrl is None:
+                        # Thumbnail is created in the background once the whole grid is laid out
+                        self._lPendingThumbImages.append((uiImage, pathArt))
+                    # endif
                     uiImage.on("click", functools.partial(self._OnShowImageViewer, pathArt, lPathNames, False))
+                    uiImage.on("contextmenu", functools.partial(self._OnArtContextMenu, pathArt, lPathNames))
                     uiImage.props("fit=contain").style(self._sThumbImageStyle)
-                    if sTooltip is not None:
-                        with ui.element("q-tooltip"):
-                            ui.html(sTooltip)
-                        # endwith
+                    self._SetArtImageTooltip(uiImage, sTooltip)
+                    if len(lMetaRequests) > 0:
+                        self._lPendingMetaImages.append((pathArt.as_posix(), uiImage, lMetaRequests, sTooltip))
                     # endif
-
-                    with ui.menu().props("context-menu"):
-                        ui.menu_item(
-                            "Copy full path to clipboard",
-                            on_click=functools.partial(self._OnCopyImagePath, pathArt),
-                            auto_close=False,
-                        )
-                        ui.menu_item(
-                            "Image Viewer (maximized)",
-                            on_click=functools.partial(self._OnShowImageViewer, pathArt, lPathNames, True),
-                            auto_close=False,
-                        )
-                        ui.menu_item(
-                            "Pixel Inspector",
-                            on_click=functools.partial(self._OnShowPixelInspector, pathArt),
-                            auto_close=False,
-                        )
-                        ui.menu_item(
-                            "Download",
-                            on_click=functools.partial(self._OnDownloadImage, pathArt),
-                            auto_close=False,
-                        )
-                    # endwith menu
                 # endwith image
             else:
-                with ui.column().style(sStyleItem):
+                with ui.column().style(sStyleItem) as uiCell:
                     ui.icon("contact_support", size="xl")
                     ui.label(f"Filetype '{pathArt.suffix}' not supported")
                 # endwith
@@ -1958,6 +2702,268 @@ class CVariantGroupProductView:
             # ui.label(ndArt.pathFS.as_posix())
         # endif
 
+        return uiCell
+
+    # enddef
+
+    # ##########################################################################################################
+    def _SetArtImageTooltip(self, _uiImage: ui.image, _sTooltip: Optional[str]):
+        for uiChild in list(_uiImage.default_slot.children):
+            if uiChild.tag == "q-tooltip":
+                _uiImage.remove(uiChild)
+            # endif
+        # endfor
+
+        if _sTooltip is not None:
+            with _uiImage:
+                with ui.element("q-tooltip"):
+                    ui.html(_sTooltip)
+                # endwith
+            # endwith
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    # The cells are created anew on the next update of the view
+    def _ClearArtCells(self):
+        self._dicArtCells = dict()
+        self._dicArtCellPathNames = dict()
+
+    # enddef
+
+    # ##########################################################################################################
+    # Tests whether the image still belongs to the artefact cell with the given key
+    def _IsArtCellImage(self, _sCellKey: str, _uiImage: ui.image) -> bool:
+        uiCell: ui.element = self._dicArtCells.get(_sCellKey)
+        if uiCell is None:
+            uiCell = self._dicPrevArtCells.get(_sCellKey)
+        # endif
+        if uiCell is None:
+            return False
+        # endif
+        return uiCell is _uiImage or _uiImage in uiCell.default_slot.children
+
+    # enddef
+
+    # ##########################################################################################################
+    def _StartProvidePendingMeta(self):
+        if len(self._lPendingMetaImages) == 0:
+            return
+        # endif
+
+        lPending = self._lPendingMetaImages
+        self._lPendingMetaImages = []
+
+        xTask = asyncio.create_task(self._ProvidePendingMeta(lPending))
+        self._setBackgroundTasks.add(xTask)
+        xTask.add_done_callback(self._setBackgroundTasks.discard)
+
+    # enddef
+
+    # ##########################################################################################################
+    async def _ProvidePendingMeta(self, _lPending: list[tuple[str, ui.image, list[TMetaRequest], Optional[str]]]):
+        def LoadMetaTexts() -> list[Union[CArtefactMetaText, Exception]]:
+            lResults: list[Union[CArtefactMetaText, Exception]] = []
+            for _, _, lMetaRequests, _ in _lPending:
+                try:
+                    lResults.append(self._xMetaCache.Update(lMetaRequests))
+                except Exception as xEx:
+                    lResults.append(xEx)
+                # endtry
+            # endfor
+            return lResults
+
+        # enddef
+
+        xLoop = asyncio.get_running_loop()
+        lResults = await xLoop.run_in_executor(CVariantGroupProductView._xCellWorkers, LoadMetaTexts)
+
+        lErrors: list[str] = []
+        for (sCellKey, uiImage, _, sTooltip), xResult in zip(_lPending, lResults):
+            if isinstance(xResult, Exception):
+                lErrors.append(str(xResult))
+                continue
+            # endif
+
+            # Only update cells that are still shown and whose text has changed
+            if xResult.sTooltip != sTooltip and self._IsArtCellImage(sCellKey, uiImage):
+                self._SetArtImageTooltip(uiImage, xResult.sTooltip)
+            # endif
+        # endfor
+
+        if len(lErrors) > 0:
+            with self._uiRowMain:
+                self._xMessage.ShowMessage(
+                    f"Error loading meta data of {len(lErrors)} artefact(s):\n{lErrors[0]}",
+                    _eType=EMessageType.WARNING,
+                    _bDialog=False,
+                )
+            # endwith
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    def _StartProvidePendingThumbnails(self):
+        if len(self._lPendingThumbImages) == 0:
+            return
+        # endif
+
+        lPending = self._lPendingThumbImages
+        self._lPendingThumbImages = []
+
+        xTask = asyncio.create_task(self._ProvidePendingThumbnails(self._iViewUpdateId, lPending))
+        self._setBackgroundTasks.add(xTask)
+        xTask.add_done_callback(self._setBackgroundTasks.discard)
+
+    # enddef
+
+    # ##########################################################################################################
+    async def _ProvidePendingThumbnails(self, _iViewUpdateId: int, _lPending: list[tuple[ui.image, Path]]):
+        def ProvideUrls() -> list[concurrent.futures.Future]:
+            lPathArts: list[Path] = [pathArt for _, pathArt in _lPending]
+            return self._xThumbnails.ProvideThumbnailUrls(lPathArts, _lStats=self._xArtStats.Update(lPathArts))
+
+        # enddef
+
+        xLoop = asyncio.get_running_loop()
+        lFutures = await xLoop.run_in_executor(CVariantGroupProductView._xCellWorkers, ProvideUrls)
+
+        dicFutureImage: dict[asyncio.Future, ui.image] = {
+            asyncio.wrap_future(xFuture): uiImage for xFuture, (uiImage, _) in zip(lFutures, _lPending)
+        }
+        setWait: set[asyncio.Future] = set(dicFutureImage.keys())
+        lErrors: list[str] = []
+
+        # Swap in each thumbnail as soon as its worker has finished
+        while len(setWait) > 0:
+            setDone, setWait = await asyncio.wait(setWait, return_when=asyncio.FIRST_COMPLETED)
+            if _iViewUpdateId != self._iViewUpdateId:
+                # The view has been rebuilt in the meantime
+                return
+            # endif
+
+            for xFuture in setDone:
+                try:
+                    dicFutureImage[xFuture].set_source(xFuture.result())
+                except Exception as xEx:
+                    lErrors.append(str(xEx))
+                # endtry
+            # endfor
+        # endwhile
+
+        if len(lErrors) > 0:
+            with self._uiRowMain:
+                self._xMessage.ShowMessage(
+                    f"Error creating {len(lErrors)} thumbnail(s):\n{lErrors[0]}",
+                    _eType=EMessageType.WARNING,
+                    _bDialog=False,
+                )
+            # endwith
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    # Creates the context menu shared by all images of the view. It opens on a right click
+    # anywhere in its parent element, but only acts if the click was on an image.
+    def _CreateArtContextMenu(self):
+        with ui.menu().props("context-menu") as self._uiMenuArt:
+            ui.menu_item(
+                "Copy full path to clipboard",
+                on_click=functools.partial(self._OnArtMenuItem, "copy"),
+                auto_close=False,
+            )
+            ui.menu_item(
+                "Image Viewer (maximized)",
+                on_click=functools.partial(self._OnArtMenuItem, "viewer"),
+                auto_close=False,
+            )
+            ui.menu_item(
+                "Pixel Inspector",
+                on_click=functools.partial(self._OnArtMenuItem, "pixin"),
+                auto_close=False,
+            )
+            ui.menu_item(
+                "Download",
+                on_click=functools.partial(self._OnArtMenuItem, "download"),
+                auto_close=False,
+            )
+            ui.separator()
+            ui.menu_item(
+                "Add to comparison",
+                on_click=functools.partial(self._OnArtMenuItem, "compare-add"),
+                auto_close=False,
+            )
+            ui.menu_item(
+                "Compare selected images",
+                on_click=functools.partial(self._OnArtMenuItem, "compare-show"),
+                auto_close=False,
+            )
+            ui.menu_item(
+                "Clear comparison",
+                on_click=functools.partial(self._OnArtMenuItem, "compare-clear"),
+                auto_close=False,
+            )
+        # endwith menu
+        self._uiMenuArt.on("show", self._OnShowArtContextMenu)
+        self._uiMenuArt.on("hide", self._OnHideArtContextMenu)
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnArtContextMenu(self, _pathImage: Path, _lPathNames: list[str], _xArgs: events.GenericEventArguments):
+        self._tMenuArt = (_pathImage, _lPathNames)
+        self._iMenuArtOpenId += 1
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnShowArtContextMenu(self, _xArgs: events.GenericEventArguments):
+        self._iMenuArtShowId = self._iMenuArtOpenId
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnHideArtContextMenu(self, _xArgs: events.GenericEventArguments):
+        # Ignore the late 'hide' event of a previous opening, if an image has been right-clicked since
+        if self._iMenuArtOpenId == self._iMenuArtShowId:
+            self._tMenuArt = None
+        # endif
+
+    # enddef
+
+    # ##########################################################################################################
+    async def _OnArtMenuItem(self, _sAction: str, _xArgs: events.ClickEventArguments):
+        # These actions do not refer to the image the menu was opened on
+        if _sAction == "compare-show":
+            await self._OnShowComparison(_xArgs)
+            return
+        elif _sAction == "compare-clear":
+            self._lCompareImages = []
+            self._CloseMenuItemFromEvent(_xArgs)
+            return
+        # endif
+
+        if self._tMenuArt is None:
+            self._CloseMenuItemFromEvent(_xArgs)
+            return
+        # endif
+
+        pathArt, lPathNames = self._tMenuArt
+        if _sAction == "copy":
+            await self._OnCopyImagePath(pathArt, _xArgs)
+        elif _sAction == "viewer":
+            await self._OnShowImageViewer(pathArt, lPathNames, True, _xArgs)
+        elif _sAction == "pixin":
+            await self._OnShowPixelInspector(pathArt, _xArgs)
+        elif _sAction == "download":
+            await self._OnDownloadImage(pathArt, _xArgs)
+        elif _sAction == "compare-add":
+            self._OnAddToComparison(pathArt, lPathNames, _xArgs)
+        # endif
+
     # enddef
 
     # ##########################################################################################################
@@ -1985,10 +2991,63 @@ class CVariantGroupProductView:
         else:
             self._uiDivImage.clear()
             with self._uiDivImage:
-                self._xImageViewer.DrawImage(_pathImage, _xTitle=_xTitle, _funcOnClose=self._DoHideImageViewer)
+                self._xImageViewer.DrawImage(
+                    _pathImage,
+                    _xTitle=_xTitle,
+                    _funcOnClose=self._DoHideImageViewer,
+                    _funcOnNavigate=self._OnNavigateImageViewer,
+                )
             # endif
         # endwith
 
+        self._iImageViewerIdx = self._dicViewArtImageIdx.get(_pathImage.as_posix(), -1)
+        self._StartImageViewerPrefetch()
+
+    # enddef
+
+    # ##########################################################################################################
+    def _OnNavigateImageViewer(self, _iStep: int):
+        iCnt: int = len(self._lViewArtImages)
+        if self._iImageViewerIdx < 0 or iCnt == 0:
+            return
+        # endif
+
+        iIdx: int = min(iCnt - 1, max(0, self._iImageViewerIdx + _iStep))
+        if iIdx == self._iImageViewerIdx:
+            return
+        # endif
+
+        pathImage, lPathNames = self._lViewArtImages[iIdx]
+        try:
+            self._DoShowImageViewer(pathImage, lPathNames)
+        except Exception as xEx:
+            self._xMessage.ShowException("Error in image viewer", xEx)
+        # endtry
+
+    # enddef
+
+    # ##########################################################################################################
+    # Prefetches the neighbouring images of the image shown in the viewer, starting with the next one.
+    # A prefetch that is still running for a previously shown image is cancelled.
+    def _StartImageViewerPrefetch(self):
+        if self._iImageViewerIdx < 0:
+            return
+        # endif
+
+        lPaths: list[Path] = []
+        for iOffset in range(1, self._iImageViewerPrefetch + 1):
+            for iIdx in (self._iImageViewerIdx + iOffset, self._iImageViewerIdx - iOffset):
+                if 0 <= iIdx < len(self._lViewArtImages):
+                    lPaths.append(self._lViewArtImages[iIdx][0])
+                # endif
+            # endfor
+        # endfor
+
+        if self._xImageViewerPrefetchTask is not None and not self._xImageViewerPrefetchTask.done():
+            self._xImageViewerPrefetchTask.cancel()
+        # endif
+        self._xImageViewerPrefetchTask = asyncio.create_task(self._xImageViewer.AsyncPrefetch(lPaths))
+
     # enddef
 
     # ##########################################################################################################
@@ -2057,6 +3116,49 @@ class CVariantGroupProductView:
 
     # enddef
 
+    # ##########################################################################################################
+    # Adds the image to the comparison. If the maximal number of images is selected, the oldest one is replaced.
+    def _OnAddToComparison(self, _pathImage: Path, _lPathNames: list[str], _xArgs: events.ClickEventArguments):
+        try:
+            self._lCompareImages = [x for x in self._lCompareImages if x[0] != _pathImage]
+            self._lCompareImages.append((_pathImage, list(_lPathNames)))
+            self._lCompareImages = self._lCompareImages[-CImageCompareViewer.iMaxImages :]
+            self._xMessage.ShowMessage(
+                f"{len(self._lCompareImages)} of {CImageCompareViewer.iMaxImages} images selected for comparison",
+                _eType=EMessageType.INFO,
+                _bDialog=False,
+            )
+
+        finally:
+            self._CloseMenuItemFromEvent(_xArgs)
+        # endtry
+
+    # enddef
+
+    # ##########################################################################################################
+    async def _OnShowComparison(self, _xArgs: events.ClickEventArguments):
+        try:
+            if len(self._lCompareImages) < 2:
+                await self._xMessage.AsyncShowMessage(
+                    "Add at least two images to the comparison with the context menu of the images",
+                    _eType=EMessageType.INFO,
+                    _bDialog=False,
+                )
+                return
+            # endif
+
+            xCompareViewer = CImageCompareViewer()
+            await xCompareViewer.AsyncShowCompare(self._lCompareImages)
+
+        except Exception as xEx:
+            self._xMessage.ShowException("Error in image comparison", xEx)
+
+        finally:
+            self._CloseMenuItemFromEvent(_xArgs)
+        # endtry
+
+    # enddef
+
     # ##########################################################################################################
     async def _OnDownloadImage(self, _pathImage: Path, _xArgs: events.ClickEventArguments):
         try:
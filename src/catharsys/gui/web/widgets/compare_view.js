@@ -0,0 +1,231 @@
+export default {
+  template: `
+    <div ref="view" v-bind="$attrs" style="display: flex; gap: 4px; overflow: hidden; user-select: none">
+      <div
+        v-for="(panel, index) in panels"
+        :key="index"
+        style="position: relative; flex: 1 1 0px; min-width: 0px; overflow: hidden; cursor: crosshair; touch-action: none"
+        @pointerdown="on_pointer_down"
+        @pointermove="on_pointer_move"
+        @pointerup="on_pointer_up"
+        @pointercancel="on_pointer_cancel"
+        @wheel.prevent="on_wheel"
+      >
+        <div
+          v-for="layer in panel.layers"
+          :key="layer.key"
+          :style="{ position: 'absolute', inset: '0px', clipPath: layer.clip }"
+        >
+          <img
+            v-for="tile in layer.tiles"
+            :key="tile.key"
+            :src="tile.src"
+            draggable="false"
+            :style="{
+              position: 'absolute',
+              left: tile.left + 'px',
+              top: tile.top + 'px',
+              width: tile.width + 'px',
+              height: tile.height + 'px',
+              zIndex: tile.z,
+              imageRendering: current_scale > 1 ? 'pixelated' : 'auto',
+            }"
+          />
+        </div>
+        <div
+          v-if="mode === 'wipe'"
+          :style="{
+            position: 'absolute',
+            top: '0px',
+            bottom: '0px',
+            left: wipe * 100 + '%',
+            width: '2px',
+            marginLeft: '-1px',
+            background: 'white',
+            boxShadow: '0px 0px 3px black',
+            pointerEvents: 'none',
+          }"
+        ></div>
+        <div v-if="marker" :style="marker_style"></div>
+        <div
+          style="position: absolute; left: 4px; top: 4px; padding: 0px 6px; border-radius: 4px; background: rgba(0, 0, 0, 0.6); color: white; pointer-events: none"
+        >
+          {{ panel.label }}
+        </div>
+      </div>
+    </div>
+  `,
+  props: {
+    sources: { type: Array, default: () => [] },
+    labels: { type: Array, default: () => [] },
+    mode: { type: String, default: "side" },
+    wipe: { type: Number, default: 0.5 },
+    marker: { type: Object, default: null },
+  },
+  data: function () {
+    return {
+      current_scale: 1.0,
+      offset_x: 0,
+      offset_y: 0,
+      view_width: 0,
+      view_height: 0,
+    };
+  },
+  mounted() {
+    this.resize_observer = new ResizeObserver(() => {
+      const first = this.view_width === 0;
+      this.view_width = this.$refs.view.clientWidth;
+      this.view_height = this.$refs.view.clientHeight;
+      if (first) this.fit();
+    });
+    this.resize_observer.observe(this.$refs.view);
+  },
+  unmounted() {
+    this.resize_observer.disconnect();
+  },
+  watch: {
+    sources(new_sources, old_sources) {
+      // Only reset the view, if the size of the compared images has changed
+      const size = (sources) => (sources.length > 0 ? `${sources[0].width}x${sources[0].height}` : "");
+      if (size(new_sources) !== size(old_sources)) this.fit();
+    },
+    mode() {
+      this.$nextTick(() => this.fit());
+    },
+  },
+  computed: {
+    panel_width() {
+      const count = this.mode === "side" ? Math.max(1, this.sources.length) : 1;
+      return (this.view_width - 4 * (count - 1)) / count;
+    },
+    level() {
+      return Math.max(0, Math.floor(Math.log2(1.0 / this.current_scale)));
+    },
+    panels() {
+      // In wipe mode the second image is shown on top of the first one, right of the wipe position.
+      // In all other modes each image is shown in its own panel.
+      if (this.mode === "wipe" && this.sources.length >= 2) {
+        return [
+          {
+            label: `${this.labels[0]} | ${this.labels[1]}`,
+            layers: [
+              { key: this.sources[0].src, tiles: this.source_tiles(this.sources[0]), clip: "none" },
+              {
+                key: this.sources[1].src,
+                tiles: this.source_tiles(this.sources[1]),
+                clip: `inset(0px 0px 0px ${this.wipe * 100}%)`,
+              },
+            ],
+          },
+        ];
+      }
+      return this.sources.map((source, index) => ({
+        label: this.labels[index],
+        layers: [{ key: source.src, tiles: this.source_tiles(source), clip: "none" }],
+      }));
+    },
+    marker_style() {
+      const size = Math.max(8, this.current_scale);
+      return {
+        position: "absolute",
+        left: this.offset_x + (this.marker.x + 0.5) * this.current_scale - size / 2 + "px",
+        top: this.offset_y + (this.marker.y + 0.5) * this.current_scale - size / 2 + "px",
+        width: size + "px",
+        height: size + "px",
+        border: "2px solid red",
+        zIndex: 2,
+        pointerEvents: "none",
+      };
+    },
+  },
+  methods: {
+    source_tiles(source) {
+      // The single tile of the top level is always shown below the tiles of the current level,
+      // so that the image is visible while the tiles are loaded.
+      const level = Math.min(source.max_level, this.level);
+      const tiles = this.level_tiles(source, source.max_level, 0);
+      if (level < source.max_level) {
+        tiles.push(...this.level_tiles(source, level, 1));
+      }
+      return tiles;
+    },
+    level_tiles(source, level, z) {
+      const scale = this.current_scale;
+      const prefix = (source.src.startsWith("/") ? window.path_prefix : "") + source.src;
+      const source_size = source.tile_size * Math.pow(2, level);
+      const columns = Math.ceil(source.width / source_size);
+      const rows = Math.ceil(source.height / source_size);
+      const x0 = Math.max(0, Math.floor(-this.offset_x / scale / source_size));
+      const y0 = Math.max(0, Math.floor(-this.offset_y / scale / source_size));
+      const x1 = Math.min(columns - 1, Math.floor((this.panel_width - this.offset_x) / scale / source_size));
+      const y1 = Math.min(rows - 1, Math.floor((this.view_height - this.offset_y) / scale / source_size));
+      const tiles = [];
+      for (let y = y0; y <= y1; y++) {
+        for (let x = x0; x <= x1; x++) {
+          const source_width = Math.min(source_size, source.width - x * source_size);
+          const source_height = Math.min(source_size, source.height - y * source_size);
+          tiles.push({
+            key: `${source.src}/${level}/${x}/${y}`,
+            src: `${prefix}/${level}/${x}/${y}`,
+            left: this.offset_x + x * source_size * scale,
+            top: this.offset_y + y * source_size * scale,
+            width: source_width * scale,
+            height: source_height * scale,
+            z: z,
+          });
+        }
+      }
+      return tiles;
+    },
+    // Scales the first image to fit into a panel and centers it
+    fit() {
+      if (this.sources.length === 0 || this.panel_width <= 0 || this.view_height <= 0) return;
+      const source = this.sources[0];
+      this.current_scale = Math.min(8.0, this.panel_width / source.width, this.view_height / source.height);
+      this.offset_x = (this.panel_width - source.width * this.current_scale) / 2;
+      this.offset_y = (this.view_height - source.height * this.current_scale) / 2;
+    },
+    // Sets the scale and keeps the image point at the given panel position fixed
+    zoom_at(scale, view_x, view_y) {
+      const factor = scale / this.current_scale;
+      this.offset_x = view_x - (view_x - this.offset_x) * factor;
+      this.offset_y = view_y - (view_y - this.offset_y) * factor;
+      this.current_scale = scale;
+    },
+    set_scale(scale) {
+      this.zoom_at(scale, this.panel_width / 2, this.view_height / 2);
+    },
+    on_wheel(event) {
+      const scale = Math.min(32.0, Math.max(0.01, this.current_scale * Math.pow(1.2, -event.deltaY / 100)));
+      const rect = event.currentTarget.getBoundingClientRect();
+      this.zoom_at(scale, event.clientX - rect.left, event.clientY - rect.top);
+    },
+    on_pointer_down(event) {
+      this.drag = { x: event.clientX, y: event.clientY, moved: false };
+      event.currentTarget.setPointerCapture(event.pointerId);
+    },
+    on_pointer_move(event) {
+      if (!this.drag) return;
+      const dx = event.clientX - this.drag.x;
+      const dy = event.clientY - this.drag.y;
+      if (!this.drag.moved && Math.abs(dx) + Math.abs(dy) < 4) return;
+      this.offset_x += dx;
+      this.offset_y += dy;
+      this.drag = { x: event.clientX, y: event.clientY, moved: true };
+    },
+    on_pointer_up(event) {
+      // A click without dragging selects the pixel below the pointer
+      if (this.drag && !this.drag.moved) {
+        const rect = event.currentTarget.getBoundingClientRect();
+        this.$emit("pixel", {
+          x: Math.floor((event.clientX - rect.left - this.offset_x) / this.current_scale),
+          y: Math.floor((event.clientY - rect.top - this.offset_y) / this.current_scale),
+        });
+      }
+      this.drag = null;
+    },
+    on_pointer_cancel(event) {
+      this.drag = null;
+    },
+  },
+};
@@ -0,0 +1,125 @@
+export default {
+  template: `
+    <div ref="container" v-bind="$attrs" style="position: relative; width: 100%">
+      <canvas
+        ref="canvas"
+        style="display: block"
+        :title="hover_text"
+        @click="on_click"
+        @mousemove="on_mouse_move"
+      ></canvas>
+    </div>
+  `,
+  props: {
+    count: { type: Number, default: 0 },
+    status: { type: String, default: "" },
+    cell_size: { type: Number, default: 12 },
+    colors: { type: Array, default: () => [] },
+    status_names: { type: Array, default: () => [] },
+    labels: { type: Array, default: () => [] },
+    selected: { type: Number, default: -1 },
+  },
+  data: function () {
+    return {
+      hover_text: "",
+    };
+  },
+  created() {
+    // The status values are not reactive. They are only changed via the methods below
+    // and drawn directly to the canvas.
+    this.values = new Uint8Array(0);
+    this.selected_index = this.selected;
+    this.columns = 1;
+  },
+  mounted() {
+    this.set_all(this.status);
+    this.resize_observer = new ResizeObserver(() => this.layout());
+    this.resize_observer.observe(this.$refs.container);
+  },
+  unmounted() {
+    this.resize_observer.disconnect();
+  },
+  watch: {
+    status(status) {
+      this.set_all(status);
+    },
+  },
+  methods: {
+    // Sets the status of all jobs from a base64 encoded byte array
+    set_all(status) {
+      const bin = atob(status);
+      this.values = new Uint8Array(this.count);
+      for (let i = 0; i < Math.min(bin.length, this.count); i++) {
+        this.values[i] = bin.charCodeAt(i);
+      }
+      this.layout();
+    },
+    // Each run is [start index, length, status]
+    update_runs(runs) {
+      for (const [start, length, value] of runs) {
+        const end = Math.min(start + length, this.values.length);
+        this.values.fill(value, start, end);
+        for (let i = start; i < end; i++) {
+          this.draw_cell(i);
+        }
+      }
+    },
+    select(index) {
+      const previous = this.selected_index;
+      this.selected_index = index;
+      if (previous >= 0) this.draw_cell(previous);
+      if (index >= 0) this.draw_cell(index);
+    },
+    layout() {
+      const canvas = this.$refs.canvas;
+      const width = Math.max(this.cell_size, this.$refs.container.clientWidth);
+      this.columns = Math.max(1, Math.floor(width / this.cell_size));
+      const rows = Math.max(1, Math.ceil(this.values.length / this.columns));
+      const ratio = window.devicePixelRatio || 1;
+      canvas.style.width = this.columns * this.cell_size + "px";
+      canvas.style.height = rows * this.cell_size + "px";
+      canvas.width = Math.round(this.columns * this.cell_size * ratio);
+      canvas.height = Math.round(rows * this.cell_size * ratio);
+      this.context = canvas.getContext("2d");
+      this.context.setTransform(ratio, 0, 0, ratio, 0, 0);
+      for (let i = 0; i < this.values.length; i++) {
+        this.draw_cell(i);
+      }
+    },
+    draw_cell(index) {
+      if (!this.context) return;
+      const ctx = this.context;
+      const size = this.cell_size;
+      const x = (index % this.columns) * size;
+      const y = Math.floor(index / this.columns) * size;
+      ctx.clearRect(x, y, size, size);
+      ctx.fillStyle = this.colors[this.values[index]] || "grey";
+      ctx.fillRect(x + 1, y + 1, size - 2, size - 2);
+      if (index === this.selected_index) {
+        ctx.strokeStyle = "black";
+        ctx.lineWidth = 2;
+        ctx.strokeRect(x + 1, y + 1, size - 2, size - 2);
+      }
+    },
+    index_at(event) {
+      const column = Math.floor(event.offsetX / this.cell_size);
+      const row = Math.floor(event.offsetY / this.cell_size);
+      if (column < 0 || column >= this.columns) return -1;
+      const index = row * this.columns + column;
+      return index < this.values.length ? index : -1;
+    },
+    on_click(event) {
+      const index = this.index_at(event);
+      if (index >= 0) this.$emit("select", { index: index });
+    },
+    on_mouse_move(event) {
+      const index = this.index_at(event);
+      if (index < 0) {
+        this.hover_text = "";
+        return;
+      }
+      const label = index < this.labels.length ? this.labels[index] : `${index}`;
+      this.hover_text = `${label}: ${this.status_names[this.values[index]] || ""}`;
+    },
+  },
+};
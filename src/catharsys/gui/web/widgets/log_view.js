@@ -0,0 +1,104 @@
+export default {
+  template: `
+    <div
+      ref="scroller"
+      v-bind="$attrs"
+      style="overflow-y: auto; font-family: monospace; white-space: pre"
+      @scroll="on_scroll"
+    >
+      <div v-if="line_count === 0" :style="line_style">{{ empty_text }}</div>
+      <div v-else :style="{ position: 'relative', height: line_count * line_height + 'px' }">
+        <div :style="{ position: 'absolute', top: first_index * line_height + 'px', left: 0, right: 0 }">
+          <div v-for="(line, i) in visible_lines" :key="first_index + i" :style="line_style">{{ line }}</div>
+        </div>
+      </div>
+    </div>
+  `,
+  props: {
+    max_lines: { type: Number, default: 100000 },
+    line_height: { type: Number, default: 18 },
+    empty_text: { type: String, default: "" },
+    tail: { type: String, default: "" },
+    tail_end: { type: Number, default: 0 },
+  },
+  data: function () {
+    return {
+      version: 0,
+      scroll_top: 0,
+      view_height: 0,
+    };
+  },
+  created() {
+    // The lines are not reactive, so that pushing text does not make Vue track large arrays.
+    // The last entry is the current, not yet terminated line.
+    this.lines = [""];
+    this.follow = true;
+    // Number of characters pushed on the server up to the end of the shown text
+    this.text_end = 0;
+  },
+  mounted() {
+    // Show the text that has been pushed before the element was mounted
+    this.push(this.tail, this.tail_end);
+    this.resize_observer = new ResizeObserver(() => {
+      this.view_height = this.$refs.scroller.clientHeight;
+    });
+    this.resize_observer.observe(this.$refs.scroller);
+  },
+  unmounted() {
+    this.resize_observer.disconnect();
+  },
+  computed: {
+    line_style() {
+      return { height: this.line_height + "px", lineHeight: this.line_height + "px" };
+    },
+    line_count() {
+      this.version;
+      const count = this.lines.length;
+      return this.lines[count - 1] === "" ? count - 1 : count;
+    },
+    first_index() {
+      return Math.max(0, Math.floor(this.scroll_top / this.line_height) - 20);
+    },
+    visible_lines() {
+      this.version;
+      const last = Math.ceil((this.scroll_top + this.view_height) / this.line_height) + 20;
+      return this.lines.slice(this.first_index, Math.min(last, this.line_count));
+    },
+  },
+  methods: {
+    push(text, end) {
+      // Skip text that is already shown, e.g. if it has been sent with the properties on mount
+      if (end <= this.text_end) return;
+      text = text.slice(Math.max(0, text.length - (end - this.text_end)));
+      this.text_end = end;
+      const parts = text.split("\n");
+      this.lines[this.lines.length - 1] += parts[0];
+      for (let i = 1; i < parts.length; i++) {
+        this.lines.push(parts[i]);
+      }
+      if (this.lines.length > this.max_lines) {
+        this.lines.splice(0, this.lines.length - this.max_lines);
+      }
+      this.version++;
+      if (this.follow) {
+        this.$nextTick(() => this.scroll_to_end());
+      }
+    },
+    clear() {
+      this.lines = [""];
+      this.follow = true;
+      this.version++;
+      this.$nextTick(() => this.scroll_to_end());
+    },
+    scroll_to_end() {
+      const scroller = this.$refs.scroller;
+      scroller.scrollTop = scroller.scrollHeight;
+      this.scroll_top = scroller.scrollTop;
+    },
+    on_scroll() {
+      const scroller = this.$refs.scroller;
+      this.scroll_top = scroller.scrollTop;
+      this.follow = scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 2 * this.line_height;
+    },
+  },
+};
@@ -0,0 +1,149 @@
+export default {
+  template: `
+    <div
+      ref="view"
+      v-bind="$attrs"
+      style="position: relative; overflow: hidden; cursor: grab; touch-action: none; user-select: none"
+      @pointerdown="on_pointer_down"
+      @pointermove="on_pointer_move"
+      @pointerup="on_pointer_up"
+      @pointercancel="on_pointer_up"
+      @wheel.prevent="on_wheel"
+    >
+      <img
+        v-for="tile in tiles"
+        :key="tile.key"
+        :src="tile.src"
+        draggable="false"
+        :style="{
+          position: 'absolute',
+          left: tile.left + 'px',
+          top: tile.top + 'px',
+          width: tile.width + 'px',
+          height: tile.height + 'px',
+          zIndex: tile.z,
+          imageRendering: current_scale > 1 ? 'pixelated' : 'auto',
+        }"
+      />
+    </div>
+  `,
+  props: {
+    src: String,
+    width: Number,
+    height: Number,
+    tile_size: { type: Number, default: 256 },
+    max_level: { type: Number, default: 0 },
+    scale: { type: Number, default: 1.0 },
+    min_scale: { type: Number, default: 0.01 },
+    max_scale: { type: Number, default: 8.0 },
+  },
+  data: function () {
+    return {
+      current_scale: this.scale,
+      offset_x: 0,
+      offset_y: 0,
+      view_width: 0,
+      view_height: 0,
+    };
+  },
+  mounted() {
+    this.resize_observer = new ResizeObserver(() => {
+      this.view_width = this.$refs.view.clientWidth;
+      this.view_height = this.$refs.view.clientHeight;
+    });
+    this.resize_observer.observe(this.$refs.view);
+  },
+  unmounted() {
+    this.resize_observer.disconnect();
+    clearTimeout(this.scale_timer);
+  },
+  watch: {
+    src() {
+      this.offset_x = 0;
+      this.offset_y = 0;
+    },
+  },
+  computed: {
+    prefix() {
+      return (this.src.startsWith("/") ? window.path_prefix : "") + this.src;
+    },
+    level() {
+      const level = Math.floor(Math.log2(1.0 / this.current_scale));
+      return Math.min(this.max_level, Math.max(0, level));
+    },
+    tiles() {
+      // The single tile of the top level is always shown below the tiles of the current level,
+      // so that the image is visible while the tiles are loaded.
+      const tiles = this.level_tiles(this.max_level, 0);
+      if (this.level < this.max_level) {
+        tiles.push(...this.level_tiles(this.level, 1));
+      }
+      return tiles;
+    },
+  },
+  methods: {
+    level_tiles(level, z) {
+      const scale = this.current_scale;
+      const source_size = this.tile_size * Math.pow(2, level);
+      const columns = Math.ceil(this.width / source_size);
+      const rows = Math.ceil(this.height / source_size);
+      const x0 = Math.max(0, Math.floor(-this.offset_x / scale / source_size));
+      const y0 = Math.max(0, Math.floor(-this.offset_y / scale / source_size));
+      const x1 = Math.min(columns - 1, Math.floor((this.view_width - this.offset_x) / scale / source_size));
+      const y1 = Math.min(rows - 1, Math.floor((this.view_height - this.offset_y) / scale / source_size));
+      const tiles = [];
+      for (let y = y0; y <= y1; y++) {
+        for (let x = x0; x <= x1; x++) {
+          const source_width = Math.min(source_size, this.width - x * source_size);
+          const source_height = Math.min(source_size, this.height - y * source_size);
+          tiles.push({
+            key: `${this.src}/${level}/${x}/${y}`,
+            src: `${this.prefix}/${level}/${x}/${y}`,
+            left: this.offset_x + x * source_size * scale,
+            top: this.offset_y + y * source_size * scale,
+            width: source_width * scale,
+            height: source_height * scale,
+            z: z,
+          });
+        }
+      }
+      return tiles;
+    },
+    // Sets the scale and keeps the image point at the given view position fixed
+    zoom_at(scale, view_x, view_y) {
+      const factor = scale / this.current_scale;
+      this.offset_x = view_x - (view_x - this.offset_x) * factor;
+      this.offset_y = view_y - (view_y - this.offset_y) * factor;
+      this.current_scale = scale;
+    },
+    set_scale(scale) {
+      if (Math.abs(scale - this.current_scale) > 1e-6) {
+        this.zoom_at(scale, this.view_width / 2, this.view_height / 2);
+      }
+    },
+    on_wheel(event) {
+      const scale = Math.min(
+        this.max_scale,
+        Math.max(this.min_scale, this.current_scale * Math.pow(1.2, -event.deltaY / 100))
+      );
+      const rect = this.$refs.view.getBoundingClientRect();
+      this.zoom_at(scale, event.clientX - rect.left, event.clientY - rect.top);
+      // Report the new scale once the wheel has stopped
+      clearTimeout(this.scale_timer);
+      this.scale_timer = setTimeout(() => this.$emit("scale", { scale: this.current_scale }), 200);
+    },
+    on_pointer_down(event) {
+      this.drag = { x: event.clientX, y: event.clientY };
+      this.$refs.view.setPointerCapture(event.pointerId);
+    },
+    on_pointer_move(event) {
+      if (!this.drag) return;
+      this.offset_x += event.clientX - this.drag.x;
+      this.offset_y += event.clientY - this.drag.y;
+      this.drag = { x: event.clientX, y: event.clientY };
+    },
+    on_pointer_up(event) {
+      this.drag = null;
+    },
+  },
+};